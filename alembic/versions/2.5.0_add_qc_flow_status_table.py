@@ -0,0 +1,48 @@
+"""add_qc_flow_status_table
+
+Revision ID: 2.5.0
+Revises: 2.1.0
+Create Date: 2026-10-17 10:12:41.208533
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "2.5.0"
+down_revision = "2.1.0"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Create a table for denormalised QC flow statuses of sequencing QC
+    states. The table is created empty so that the migration does not
+    lock the qc_state table for the time it takes to copy all QC states.
+    Populate it by running misc/reconcile_qc_flow_statuses.py after the
+    migration and before the server version, which uses the table, is
+    deployed.
+    """
+
+    op.execute(
+        """
+    CREATE TABLE `qc_flow_status` (
+      `id_qc_flow_status` BIGINT NOT NULL AUTO_INCREMENT,
+      `id_qc_state` BIGINT NOT NULL,
+      `qc_flow_status` VARCHAR(20) NOT NULL
+        COMMENT 'The value of the QC flow status',
+      `date_updated` DATETIME NOT NULL
+        COMMENT 'Datetime the QC state was created or changed',
+      PRIMARY KEY (`id_qc_flow_status`),
+      UNIQUE KEY `id_qc_state` (`id_qc_state`),
+      KEY `qc_flow_status_date_index`
+        (`qc_flow_status`, `date_updated`, `id_qc_state`),
+      CONSTRAINT `fk_qc_flow_status_state` FOREIGN KEY (`id_qc_state`)
+        REFERENCES `qc_state` (`id_qc_state`) ON DELETE CASCADE
+    )
+    """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE `qc_flow_status`")
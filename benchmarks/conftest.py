@@ -0,0 +1,277 @@
+"""
+Fixtures for benchmarks of database queries and models.
+
+The ml warehouse and LangQC databases are seeded with synthetic data,
+see `benchmarks.synthetic_data`. The databases and the scale of the
+data set are configured by environment variables:
+
+    BENCHMARK_MLWH_URL - the ml warehouse database URL
+    BENCHMARK_QCDB_URL - the LangQC database URL
+    BENCHMARK_NUM_WELLS - the number of wells, defaults to 1000
+    BENCHMARK_NUM_QC_STATES - the maximum number of QC states, defaults to 2000
+    BENCHMARK_PLEX - the number of libraries in a pooled well, defaults to 384
+    BENCHMARK_PAGE_SIZE - the page size for paged lists of wells,
+        defaults to 100
+
+Existing tables in the databases are dropped. If the URLs are not set,
+temporary SQLite databases are used. The number of SQL statements, which
+are executed by each benchmarked function, is reported at the end of the
+run and is saved to the `queries` field of the `extra_info` dictionary of
+the benchmark.
+"""
+
+import zlib
+from contextlib import contextmanager
+
+import pytest
+from pydantic import Field
+from pydantic_settings import SettingsConfigDict
+from sqlalchemy import MetaData, create_engine, event, text
+from sqlalchemy.dialects.mysql import BIGINT, TINYINT
+from sqlalchemy.dialects.mysql.dml import OnDuplicateClause
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.synthetic_data import SyntheticData, SyntheticDataScale
+from lang_qc.db.mlwh_schema import Base as MlwhBase
+from lang_qc.db.qc_schema import Base as QcBase
+
+"""
+Statement counts for benchmarks, which have been run, keyed by test ID.
+"""
+QUERY_COUNTS = {}
+
+
+class BenchmarkSettings(SyntheticDataScale):
+
+    model_config = SettingsConfigDict(env_prefix="BENCHMARK_")
+
+    mlwh_url: str | None = Field(default=None, title="ml warehouse database URL")
+    qcdb_url: str | None = Field(default=None, title="LangQC database URL")
+    page_size: int = Field(default=100, gt=0, title="Page size for lists of wells")
+
+
+class QueryCounter:
+    """Counts SQL statements, which are executed by the given engines."""
+
+    def __init__(self, engines: dict):
+
+        self.counts = None
+        for (database, engine) in engines.items():
+            self._listen(engine, database)
+
+    @contextmanager
+    def counting(self):
+        """
+        Starts counting. Yields a dictionary of statement counts per
+        database, which is updated until the context is exited.
+        """
+
+        self.counts = {}
+        try:
+            yield self.counts
+        finally:
+            self.counts = None
+
+    def _listen(self, engine, database: str):
+        @event.listens_for(engine, "before_cursor_execute")
+        def count(conn, cursor, statement, parameters, context, executemany):
+            if self.counts is not None:
+                self.counts[database] = self.counts.get(database, 0) + 1
+
+
+# SQLite generates primary key values only for INTEGER PRIMARY KEY
+# columns and does not have TINYINT type.
+@compiles(BIGINT, "sqlite")
+@compiles(TINYINT, "sqlite")
+def _sqlite_integer(type_, compiler, **kw):
+    return "INTEGER"
+
+
+@compiles(OnDuplicateClause, "sqlite")
+def _sqlite_on_conflict(clause, compiler, **kw):
+    """
+    Renders MySQL `ON DUPLICATE KEY UPDATE` clause, which is used by the
+    LangQC code to assign QC states, as SQLite `ON CONFLICT DO UPDATE`
+    clause. In the update clause references to the inserted row or to the
+    columns of `INSERT ... SELECT` are replaced by the columns of the
+    `excluded` table. A column of `INSERT ... SELECT` is assumed to be
+    inserted into the column, which it updates, as it is done by
+    `lang_qc.db.helper.qc._upsert`.
+    """
+
+    statement = compiler.statement
+    selected = []
+    if statement.select is not None:
+        selected = list(statement.select.selected_columns)
+
+    clauses = []
+    for (name, value) in clause.update.items():
+        name = getattr(name, "key", name)
+        if any(value is column for column in selected):
+            value_text = f"excluded.{compiler.preparer.quote(name)}"
+        elif getattr(value, "table", None) is clause.inserted_alias:
+            value_text = f"excluded.{compiler.preparer.quote(value.name)}"
+        else:
+            value_text = compiler.process(value.self_group(), **kw)
+        clauses.append(f"{compiler.preparer.quote(name)} = {value_text}")
+
+    return f"ON CONFLICT DO UPDATE SET {', '.join(clauses)}"
+
+
+def _crc32(value) -> int | None:
+    return None if value is None else zlib.crc32(str(value).encode())
+
+
+def _concat_ws(separator, *values) -> str | None:
+    if separator is None:
+        return None
+    return separator.join(str(value) for value in values if value is not None)
+
+
+class _BitXor:
+    """MySQL `BIT_XOR` aggregate function."""
+
+    def __init__(self):
+        self.value = 0
+
+    def step(self, value):
+        if value is not None:
+            self.value ^= value
+
+    def finalize(self) -> int:
+        return self.value
+
+
+def _schema(metadata: MetaData, engine) -> MetaData:
+    """
+    Returns a copy of the metadata, which is suitable for the database
+    of the engine.
+    """
+
+    if engine.dialect.name != "sqlite":
+        return metadata
+
+    sqlite_metadata = MetaData()
+    for table in metadata.sorted_tables:
+        table = table.to_metadata(sqlite_metadata)
+        for column in table.columns:
+            default = getattr(column.server_default, "arg", None)
+            # Not supported by SQLite.
+            if default is not None and "ON UPDATE" in str(default):
+                column.server_default.arg = text("CURRENT_TIMESTAMP")
+
+    return sqlite_metadata
+
+
+def _create_engine(url: str, metadata: MetaData):
+
+    engine = create_engine(url)
+    if engine.dialect.name == "sqlite":
+
+        @event.listens_for(engine, "connect")
+        def create_collation(dbapi_connection, connection_record):
+            dbapi_connection.create_collation(
+                "utf8_unicode_ci",
+                lambda a, b: (a.lower() > b.lower()) - (a.lower() < b.lower()),
+            )
+            # MySQL functions, which are used to compute well versions.
+            dbapi_connection.create_function("crc32", 1, _crc32, deterministic=True)
+            dbapi_connection.create_function(
+                "concat_ws", -1, _concat_ws, deterministic=True
+            )
+            dbapi_connection.create_aggregate("bit_xor", 1, _BitXor)
+
+    else:
+        with engine.connect() as conn:
+            # Workaround for invalid default values for dates.
+            conn.execute(text("SET sql_mode = '';"))
+            conn.commit()
+
+    schema = _schema(metadata, engine)
+    schema.drop_all(bind=engine)
+    schema.create_all(bind=engine)
+
+    return engine
+
+
+@pytest.fixture(scope="session")
+def benchmark_settings() -> BenchmarkSettings:
+    return BenchmarkSettings()
+
+
+@pytest.fixture(scope="session")
+def synthetic_data(benchmark_settings) -> SyntheticData:
+    return SyntheticData(benchmark_settings)
+
+
+@pytest.fixture(scope="session")
+def engines(benchmark_settings, synthetic_data, tmp_path_factory) -> dict:
+    """
+    Returns a dictionary of engines for the seeded ml warehouse and LangQC
+    databases, the keys are "mlwh" and "qcdb".
+    """
+
+    tmp_dir = tmp_path_factory.mktemp("benchmark_db")
+    mlwh_engine = _create_engine(
+        benchmark_settings.mlwh_url or f"sqlite:///{tmp_dir}/mlwh.sqlite",
+        MlwhBase.metadata,
+    )
+    qcdb_engine = _create_engine(
+        benchmark_settings.qcdb_url or f"sqlite:///{tmp_dir}/qcdb.sqlite",
+        QcBase.metadata,
+    )
+    with sessionmaker(bind=mlwh_engine)() as session:
+        synthetic_data.load_mlwh(session)
+    with sessionmaker(bind=qcdb_engine)() as session:
+        synthetic_data.load_qcdb(session)
+
+    yield {"mlwh": mlwh_engine, "qcdb": qcdb_engine}
+
+    mlwh_engine.dispose()
+    qcdb_engine.dispose()
+
+
+@pytest.fixture(scope="session")
+def mlwh_sessionfactory(engines):
+    return sessionmaker(bind=engines["mlwh"])
+
+
+@pytest.fixture(scope="session")
+def qcdb_sessionfactory(engines):
+    return sessionmaker(bind=engines["qcdb"])
+
+
+@pytest.fixture(scope="session")
+def query_counter(engines) -> QueryCounter:
+    return QueryCounter(engines)
+
+
+@pytest.fixture
+def measure(benchmark, request, query_counter):
+    """
+    Returns a function, which takes a function without arguments, counts
+    the SQL statements it executes, benchmarks it and returns its return
+    value.
+    """
+
+    def _measure(function):
+        with query_counter.counting() as counts:
+            function()
+        QUERY_COUNTS[request.node.nodeid] = dict(counts)
+        benchmark.extra_info["queries"] = dict(counts)
+        return benchmark(function)
+
+    return _measure
+
+
+def pytest_terminal_summary(terminalreporter):
+
+    if len(QUERY_COUNTS) == 0:
+        return
+    terminalreporter.section("SQL statements per call")
+    for (test_id, counts) in QUERY_COUNTS.items():
+        summary = ", ".join(
+            f"{database}: {count}" for (database, count) in sorted(counts.items())
+        )
+        terminalreporter.write_line(f"{test_id} - {summary or 'none'}")
@@ -0,0 +1,746 @@
+"""
+Synthetic ml warehouse and LangQC database data for benchmarks and
+scale testing.
+
+PacBio Revio runs with four wells on each of two plates are generated.
+The runs are spaced evenly over two years, the most recent runs are still
+in progress. Most wells have a single library, pooled wells have `plex`
+tagged libraries. Each library is linked to LIMS, sample and study data.
+Product IDs are generated by `npg_id_generation`.
+
+Sequencing QC states are assigned to complete wells. Most wells, which
+completed within the last two weeks, do not have a QC state and are in
+the inbox. Library QC states are assigned to the libraries of the pooled
+wells. The number of QC states of either type is limited by the scale
+of the data set. Each product with a QC state has a sub-product and a
+history of QC states as if the QC states were assigned by LangQC.
+
+For a given scale and reference time the data is always the same. The
+data is generated and loaded in batches so that data sets with millions
+of rows can be loaded. The module can be run as a script, for example,
+
+    python -m benchmarks.synthetic_data --num-wells 1000000 \\
+        --num-qc-states 2000000 --mlwh-url "$DB_URL" --qcdb-url "$QCDB_URL"
+
+Run it with the `--help` option for details.
+"""
+
+import argparse
+import logging
+import math
+import os
+import uuid
+from collections.abc import Iterator
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timedelta
+
+from npg_id_generation.pac_bio import PacBioEntity
+from pydantic import Field
+from pydantic_settings import BaseSettings
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session
+
+from lang_qc.db.helper.qc import qc_flow_status_for_qc_state
+from lang_qc.db.mlwh_schema import Base as MlwhBase
+from lang_qc.db.mlwh_schema import (
+    PacBioProductMetrics,
+    PacBioRun,
+    PacBioRunWellMetrics,
+    Sample,
+    Study,
+)
+from lang_qc.db.qc_schema import Base as QcBase
+from lang_qc.db.qc_schema import (
+    ProductLayout,
+    QcFlowStatus,
+    QcState,
+    QcStateDict,
+    QcStateHist,
+    QcType,
+    SeqPlatform,
+    SeqProduct,
+    SubProduct,
+    SubProductAttr,
+    User,
+)
+from tests.fixtures.well_data import (
+    ATTRIBUTE_NAMES,
+    PLATFORMS,
+    QC_STATES,
+    QC_TYPES,
+    USERS,
+)
+
+# Plate numbers and labels of the wells of a run.
+RUN_WELLS = [(plate, f"{row}1") for plate in (1, 2) for row in "ABCD"]
+TIME_SPAN = timedelta(weeks=104)
+RUN_DURATION = timedelta(hours=30)
+RECENT_PERIOD = timedelta(weeks=2)
+# QC state descriptions and preliminary flags, which are assigned in turn.
+SEQ_QC_OUTCOMES = [
+    ("Passed", 0),
+    ("Passed", 0),
+    ("Failed", 0),
+    ("Passed", 1),
+    ("On hold", 1),
+    ("Passed", 0),
+    ("Claimed", 1),
+    ("Failed, SMRT cell", 0),
+    ("On hold external", 1),
+    ("Failed, Instrument", 0),
+]
+LIBRARY_QC_OUTCOMES = [("Passed", 0)] * 9 + [("Failed", 0)]
+# Sequencing QC starts with claiming a well.
+CLAIMED_QC_OUTCOME = ("Claimed", 1)
+CLAIM_INTERVAL = timedelta(hours=2)
+LOAD_BATCH_SIZE = 10000
+UUID_NAMESPACE = uuid.UUID("9a3f0d6e-2c1b-4f5e-8a7d-6b5c4d3e2f10")
+
+
+class SyntheticDataScale(BaseSettings):
+    """
+    The size of a synthetic data set. Can be set by environment variables
+    with a prefix given by the `_env_prefix` constructor argument.
+    """
+
+    num_wells: int = Field(default=1000, gt=0, title="Number of wells")
+    num_qc_states: int = Field(
+        default=2000,
+        ge=0,
+        title="Maximum number of QC states",
+        description="""
+        The maximum number of sequencing and library QC states. Sequencing
+        QC states are created first.
+        """,
+    )
+    plex: int = Field(default=384, gt=1, title="Number of libraries in a pooled well")
+
+
+@dataclass(frozen=True)
+class SyntheticLibrary:
+
+    id_product: str
+    tag_sequence: str | None = None
+    tag_identifier: str | None = None
+    qc_state: tuple[str, int] | None = None
+
+
+@dataclass(frozen=True)
+class SyntheticWell:
+
+    index: int
+    run_name: str
+    plate_number: int
+    well_label: str
+    id_product: str
+    run_start: datetime
+    run_complete: datetime | None
+    well_status: str
+    qc_state: tuple[str, int] | None = None
+    qc_date: datetime | None = None
+    libraries: list[SyntheticLibrary] = field(default_factory=list)
+
+    def is_pooled(self) -> bool:
+        return len(self.libraries) > 1
+
+
+class BatchLoader:
+    """
+    Accumulates rows for a number of tables and inserts them with bulk
+    INSERT statements. The tables should be given in the order, in which
+    they can be loaded without violating foreign key constraints. When
+    the number of rows for one of the tables reaches the batch size, rows
+    for all tables are inserted and the transaction is committed.
+    """
+
+    def __init__(
+        self, session: Session, table_classes: list, batch_size: int = LOAD_BATCH_SIZE
+    ):
+
+        self.session = session
+        self.batch_size = batch_size
+        self.rows = {table_class: [] for table_class in table_classes}
+        self.counts = {table_class.__tablename__: 0 for table_class in table_classes}
+
+    def add(self, table_class, row: dict):
+
+        rows = self.rows[table_class]
+        rows.append(row)
+        if len(rows) == self.batch_size:
+            self.flush()
+
+    def flush(self):
+
+        for (table_class, rows) in self.rows.items():
+            if rows:
+                self.session.execute(insert(table_class), rows)
+                self.counts[table_class.__tablename__] += len(rows)
+                rows.clear()
+        self.session.commit()
+        logging.info(
+            "Loaded "
+            + ", ".join(f"{count} {name} rows" for (name, count) in self.counts.items())
+        )
+
+
+class SyntheticData:
+    """
+    A synthetic data set of the given scale. The timestamps are relative
+    to the `now` argument, which defaults to the current local time.
+    """
+
+    def __init__(self, scale: SyntheticDataScale, now: datetime | None = None):
+
+        self.scale = scale
+        self.now = now or datetime.now().replace(microsecond=0)
+
+        num_runs = math.ceil(scale.num_wells / len(RUN_WELLS))
+        self.run_interval = TIME_SPAN / num_runs
+
+        num_seq_qc_states = 0
+        for index in range(scale.num_wells):
+            if self._seq_qc_outcome(index) is not None:
+                num_seq_qc_states += 1
+        self.num_seq_qc_states = min(num_seq_qc_states, scale.num_qc_states)
+        self.num_library_qc_states = scale.num_qc_states - self.num_seq_qc_states
+        # At least one pool is created even if there are no library QC states.
+        self.num_pools = max(math.ceil(self.num_library_qc_states / scale.plex), 1)
+
+    def wells(self) -> Iterator[SyntheticWell]:
+        """
+        Generates the wells, the most recent run first. The first wells
+        with sequencing QC states are pooled.
+        """
+
+        num_seq_qc_states = 0
+        num_pools = 0
+        for index in range(self.scale.num_wells):
+            qc_outcome = self._seq_qc_outcome(index)
+            if qc_outcome is not None:
+                if num_seq_qc_states == self.num_seq_qc_states:
+                    qc_outcome = None
+                else:
+                    num_seq_qc_states += 1
+            well = self._well(index, qc_outcome)
+            if qc_outcome is not None and num_pools < self.num_pools:
+                well = self._pool(
+                    well, self.num_library_qc_states - num_pools * self.scale.plex
+                )
+                num_pools += 1
+            yield well
+
+    def pooled_wells(self) -> list[SyntheticWell]:
+        """Returns a list of wells with multiple libraries."""
+
+        pools = []
+        for well in self.wells():
+            if well.is_pooled():
+                pools.append(well)
+                if len(pools) == self.num_pools:
+                    break
+        return pools
+
+    def load_mlwh(self, session: Session) -> dict[str, int]:
+        """
+        Loads ml warehouse data to the database. The database tables
+        should exist and be empty. The data is committed in batches.
+        Returns the number of loaded rows for each table.
+        """
+
+        loader = BatchLoader(
+            session,
+            [Study, Sample, PacBioRun, PacBioRunWellMetrics, PacBioProductMetrics],
+        )
+        loader.add(Study, _study())
+        for index in range(self.scale.plex):
+            loader.add(Sample, _sample(index))
+
+        id_lims = 0
+        for well in self.wells():
+            id_well = well.index + 1
+            loader.add(PacBioRunWellMetrics, self._well_metrics_row(well))
+            for (library_index, library) in enumerate(well.libraries):
+                id_lims += 1
+                loader.add(
+                    PacBioRun, self._lims_row(well, library, library_index, id_lims)
+                )
+                loader.add(
+                    PacBioProductMetrics,
+                    _product_metrics_row(well, library, id_well, id_lims),
+                )
+        loader.flush()
+
+        return loader.counts
+
+    def load_qcdb(self, session: Session) -> dict[str, int]:
+        """
+        Loads dictionaries, products, sub-products, QC states, their history
+        and QC flow statuses to the LangQC database. The database tables
+        should exist and be empty. The data is committed in batches.
+        Returns the number of loaded rows for each table.
+        """
+
+        # Table classes, rows, primary and natural key column names.
+        dictionaries = [
+            (QcType, QC_TYPES, "id_qc_type", "qc_type"),
+            (QcStateDict, QC_STATES, "id_qc_state_dict", "state"),
+            (SeqPlatform, PLATFORMS, "id_seq_platform", "name"),
+            (SubProductAttr, ATTRIBUTE_NAMES, "id_attr", "attr_name"),
+            (User, USERS, "id_user", "username"),
+        ]
+        loader = BatchLoader(
+            session,
+            [table_class for (table_class, _, _, _) in dictionaries]
+            + [
+                SeqProduct,
+                SubProduct,
+                ProductLayout,
+                QcState,
+                QcStateHist,
+                QcFlowStatus,
+            ],
+        )
+        ids = {}
+        for (table_class, rows, id_name, key_name) in dictionaries:
+            ids[table_class] = {row[key_name]: i + 1 for (i, row) in enumerate(rows)}
+            for (i, row) in enumerate(rows):
+                loader.add(table_class, {id_name: i + 1, **row})
+        attr_ids = ids[SubProductAttr]
+        id_users = list(ids[User].values())
+
+        def add_product(well: SyntheticWell, library: SyntheticLibrary | None) -> int:
+            id_product = well.id_product if library is None else library.id_product
+            id_seq_product = (
+                loader.counts["seq_product"] + len(loader.rows[SeqProduct]) + 1
+            )
+            loader.add(
+                SeqProduct,
+                {
+                    "id_seq_product": id_seq_product,
+                    "id_product": id_product,
+                    "id_seq_platform": ids[SeqPlatform]["PacBio"],
+                },
+            )
+            # One sub-product for each product, the same IDs can be used.
+            loader.add(
+                SubProduct,
+                {
+                    "id_sub_product": id_seq_product,
+                    "id_attr_one": attr_ids["run_name"],
+                    "value_attr_one": well.run_name,
+                    "id_attr_two": attr_ids["well_label"],
+                    "value_attr_two": well.well_label,
+                    "id_attr_three": attr_ids["plate_number"],
+                    "value_attr_three": str(well.plate_number),
+                    "properties_digest": id_product,
+                    "tags": None if library is None else library.tag_sequence,
+                },
+            )
+            loader.add(
+                ProductLayout,
+                {
+                    "id_product_layout": id_seq_product,
+                    "id_seq_product": id_seq_product,
+                    "id_sub_product": id_seq_product,
+                },
+            )
+            return id_seq_product
+
+        def add_qc_state(id_seq_product: int, qc_type: str, history: list):
+            # The history is a list of (qc_state, date_updated) tuples,
+            # the last one is the current QC state.
+            date_created = history[0][1]
+            values = {
+                "id_seq_product": id_seq_product,
+                "id_user": id_users[id_seq_product % len(id_users)],
+                "id_qc_type": ids[QcType][qc_type],
+                "created_by": "LangQC",
+                "date_created": date_created,
+            }
+            for ((state, is_preliminary), date_updated) in history:
+                loader.add(
+                    QcStateHist,
+                    {
+                        "id_qc_state_dict": ids[QcStateDict][state],
+                        "is_preliminary": is_preliminary,
+                        "date_updated": date_updated,
+                        **values,
+                    },
+                )
+            (state, is_preliminary) = history[-1][0]
+            date_updated = history[-1][1]
+            id_qc_state = loader.counts["qc_state"] + len(loader.rows[QcState]) + 1
+            loader.add(
+                QcState,
+                {
+                    "id_qc_state": id_qc_state,
+                    "id_qc_state_dict": ids[QcStateDict][state],
+                    "is_preliminary": is_preliminary,
+                    "date_updated": date_updated,
+                    **values,
+                },
+            )
+            if qc_type == "sequencing":
+                loader.add(
+                    QcFlowStatus,
+                    {
+                        "id_qc_state": id_qc_state,
+                        "qc_flow_status": qc_flow_status_for_qc_state(
+                            state, is_preliminary
+                        ).value,
+                        "date_updated": date_updated,
+                    },
+                )
+
+        for well in self.wells():
+            if well.qc_state is None:
+                continue
+            history = [(well.qc_state, well.qc_date)]
+            if well.qc_state != CLAIMED_QC_OUTCOME:
+                history.insert(0, (CLAIMED_QC_OUTCOME, well.qc_date - CLAIM_INTERVAL))
+            add_qc_state(add_product(well, None), "sequencing", history)
+            if well.is_pooled():
+                for library in well.libraries:
+                    if library.qc_state is not None:
+                        add_qc_state(
+                            add_product(well, library),
+                            "library",
+                            [(library.qc_state, well.qc_date)],
+                        )
+        loader.flush()
+
+        return loader.counts
+
+    def _well_status(self, index: int) -> tuple[timedelta, str]:
+        """Returns the age of the well's run and the well status."""
+
+        age = self.run_interval * (index // len(RUN_WELLS))
+        if age < RUN_DURATION:
+            return (age, "Running")
+        if index % 53 == 7:
+            return (age, "Aborted")
+        if index % 97 == 11:
+            return (age, "Unknown")
+        return (age, "Complete")
+
+    def _seq_qc_outcome(self, index: int) -> tuple[str, int] | None:
+
+        (age, well_status) = self._well_status(index)
+        if well_status != "Complete":
+            return None
+        if age > RECENT_PERIOD:
+            return SEQ_QC_OUTCOMES[index % len(SEQ_QC_OUTCOMES)]
+        if index % 4 == 0:
+            return CLAIMED_QC_OUTCOME
+        return None
+
+    def _well(self, index: int, qc_outcome: tuple[str, int] | None) -> SyntheticWell:
+
+        run_index = index // len(RUN_WELLS)
+        (plate_number, well_label) = RUN_WELLS[index % len(RUN_WELLS)]
+        run_name = f"SYNTHETIC-RUN-{run_index + 1}"
+        id_product = PacBioEntity(
+            run_name=run_name, well_label=well_label, plate_number=plate_number
+        ).hash_product_id()
+
+        (age, well_status) = self._well_status(index)
+        run_complete = None if well_status == "Running" else self.now - age
+        qc_date = None
+        if qc_outcome is not None:
+            qc_date = min(run_complete + timedelta(hours=3 + index % 47), self.now)
+
+        return SyntheticWell(
+            index=index,
+            run_name=run_name,
+            plate_number=plate_number,
+            well_label=well_label,
+            id_product=id_product,
+            run_start=self.now - age - RUN_DURATION,
+            run_complete=run_complete,
+            well_status=well_status,
+            qc_state=qc_outcome,
+            qc_date=qc_date,
+            libraries=[SyntheticLibrary(id_product=id_product)],
+        )
+
+    def _pool(self, well: SyntheticWell, num_qc_states: int) -> SyntheticWell:
+
+        libraries = []
+        for library_index in range(self.scale.plex):
+            tag_sequence = _tag_sequence(library_index)
+            libraries.append(
+                SyntheticLibrary(
+                    id_product=PacBioEntity(
+                        run_name=well.run_name,
+                        well_label=well.well_label,
+                        plate_number=well.plate_number,
+                        tags=tag_sequence,
+                    ).hash_product_id(),
+                    tag_sequence=tag_sequence,
+                    tag_identifier=f"bc{1001 + library_index}",
+                    qc_state=(
+                        LIBRARY_QC_OUTCOMES[library_index % len(LIBRARY_QC_OUTCOMES)]
+                        if library_index < num_qc_states
+                        else None
+                    ),
+                )
+            )
+
+        return replace(well, libraries=libraries)
+
+    def _well_metrics_row(self, well: SyntheticWell) -> dict:
+
+        index = well.index
+        is_complete = well.well_status == "Complete"
+        hifi_num_reads = 4000000 + (index * 7919) % 3000000
+        row = {
+            "id_pac_bio_rw_metrics_tmp": index + 1,
+            "id_pac_bio_product": well.id_product,
+            "pac_bio_run_name": well.run_name,
+            "well_label": well.well_label,
+            "plate_number": well.plate_number,
+            "instrument_type": "Revio",
+            "instrument_name": "84047",
+            "chip_type": "25mChip",
+            "sl_hostname": "pacbio01.example.com",
+            "sl_run_uuid": _uuid(well.run_name),
+            "sl_ccs_uuid": _uuid(f"{well.id_product}-ccs"),
+            "ts_run_name": f"r84047_{well.run_start:%Y%m%d_%H%M%S}",
+            "movie_name": f"m84047_{well.run_start:%y%m%d_%H%M%S}_s{index % 8 + 1}",
+            "movie_minutes": 1440,
+            "ccs_execution_mode": "OnInstrument",
+            "demultiplex_mode": "OnInstrument" if well.is_pooled() else None,
+            "include_kinetics": 0,
+            "hifi_only_reads": 1,
+            "heteroduplex_analysis": 0,
+            "run_start": well.run_start,
+            "run_complete": well.run_complete,
+            "run_status": "Running" if well.run_complete is None else "Complete",
+            "well_start": well.run_start,
+            "well_complete": well.run_complete,
+            "well_status": well.well_status,
+            "chemistry_sw_version": "13.0.0.212033",
+            "instrument_sw_version": "13.0.0.212033",
+            "primary_analysis_sw_version": "13.0.0.212033",
+        }
+        if is_complete:
+            row.update(
+                {
+                    "polymerase_read_bases": 1000000000000 + index,
+                    "polymerase_num_reads": 18000000 + index % 1000000,
+                    "polymerase_read_length_mean": 70000,
+                    "polymerase_read_length_n50": 130000,
+                    "insert_length_mean": 15000,
+                    "insert_length_n50": 20000,
+                    "unique_molecular_bases": 250000000000,
+                    "productive_zmws_num": 25165824,
+                    "p0_num": 5846918,
+                    "p1_num": 18762463,
+                    "p2_num": 556443,
+                    "local_base_rate": 2.2,
+                    "control_num_reads": 2724,
+                    "control_concordance_mean": 0.899633,
+                    "control_concordance_mode": 0.91,
+                    "control_read_length_mean": 59917,
+                    "hifi_read_bases": hifi_num_reads * 11000,
+                    "hifi_num_reads": hifi_num_reads,
+                    "hifi_read_length_mean": 11000,
+                    "hifi_read_quality_median": 34,
+                    "hifi_number_passes_mean": 14,
+                    "hifi_barcoded_reads": hifi_num_reads - 1000,
+                    "hifi_bases_in_barcoded_reads": (hifi_num_reads - 1000) * 11000,
+                }
+            )
+        if well.qc_state is not None:
+            (state, is_preliminary) = well.qc_state
+            row.update(
+                {
+                    "qc_seq_state": state,
+                    "qc_seq_state_is_final": 1 - is_preliminary,
+                    "qc_seq_date": well.qc_date,
+                    "qc_seq": 1 if state == "Passed" else 0,
+                }
+            )
+
+        return row
+
+    def _lims_row(
+        self,
+        well: SyntheticWell,
+        library: SyntheticLibrary,
+        library_index: int,
+        id_lims: int,
+    ) -> dict:
+
+        tube_name = f"SYNTHETIC-TUBE-{well.index + 1}"
+        return {
+            "id_pac_bio_tmp": id_lims,
+            "last_updated": well.run_start,
+            "recorded_at": well.run_start,
+            "id_sample_tmp": (well.index + library_index) % self.scale.plex + 1,
+            "id_study_tmp": 1,
+            "id_pac_bio_run_lims": well.run_name,
+            "pac_bio_run_name": well.run_name,
+            "pac_bio_run_uuid": _uuid(well.run_name),
+            "cost_code": "S0001",
+            "id_lims": "Traction",
+            "plate_barcode": f"{well.run_name}-{well.plate_number}",
+            "plate_number": well.plate_number,
+            "plate_uuid_lims": _uuid(f"{well.run_name}-{well.plate_number}"),
+            "well_label": well.well_label,
+            "well_uuid_lims": _uuid(well.id_product),
+            "pac_bio_library_tube_id_lims": str(well.index + 1),
+            "pac_bio_library_tube_uuid": _uuid(tube_name),
+            "pac_bio_library_tube_name": tube_name,
+            "pac_bio_library_tube_barcode": tube_name,
+            "tag_identifier": library.tag_identifier,
+            "tag_sequence": library.tag_sequence,
+            "tag_set_id_lims": None if library.tag_sequence is None else "9",
+            "tag_set_name": (
+                None if library.tag_sequence is None else "Synthetic_384_barcodes"
+            ),
+            "pipeline_id_lims": "PacBio_HiFi",
+            "library_created_at": well.run_start - timedelta(days=1),
+        }
+
+
+def _product_metrics_row(
+    well: SyntheticWell, library: SyntheticLibrary, id_well: int, id_lims: int
+) -> dict:
+
+    # One product metrics row for each LIMS row, the same IDs can be used.
+    row = {
+        "id_pac_bio_pr_metrics_tmp": id_lims,
+        "id_pac_bio_rw_metrics_tmp": id_well,
+        "id_pac_bio_tmp": id_lims,
+        "id_pac_bio_product": library.id_product,
+    }
+    if well.is_pooled() and well.well_status == "Complete":
+        hifi_num_reads = 10000 + (id_lims * 104729) % 20000
+        row.update(
+            {
+                "hifi_num_reads": hifi_num_reads,
+                "hifi_read_bases": hifi_num_reads * 11000,
+                "hifi_read_length_mean": 11000,
+                "barcode4deplexing": f"{library.tag_identifier}--"
+                f"{library.tag_identifier}",
+                "barcode_quality_score_mean": 80,
+                "hifi_bases_percent": round(100 / len(well.libraries), 3),
+            }
+        )
+    if library.qc_state is not None:
+        row["qc"] = 1 if library.qc_state[0] == "Passed" else 0
+
+    return row
+
+
+def _study() -> dict:
+
+    return {
+        "id_study_tmp": 1,
+        "id_lims": "SQSCP",
+        "id_study_lims": "1",
+        "uuid_study_lims": _uuid("study"),
+        "name": "Synthetic study",
+        "study_title": "Synthetic study",
+        "study_visibility": "Public",
+        "remove_x_and_autosomes": 0,
+        "aligned": 1,
+        "separate_y_chromosome_data": 0,
+    }
+
+
+def _sample(index: int) -> dict:
+
+    name = f"SYNTHETIC_SAMPLE_{index + 1}"
+    return {
+        "id_sample_tmp": index + 1,
+        "id_lims": "SQSCP",
+        "id_sample_lims": str(index + 1),
+        "uuid_sample_lims": _uuid(name),
+        "name": name,
+        "sanger_sample_id": name,
+        "supplier_name": f"SUPPLIER_{index + 1}",
+        "public_name": f"synthetic{index + 1}",
+        "consent_withdrawn": 0,
+        "control": 0,
+    }
+
+
+def _tag_sequence(index: int) -> str:
+    """Returns a unique 16 base long sequence for an index."""
+
+    return "".join("ACGT"[(index >> (2 * position)) & 3] for position in range(16))
+
+
+def _uuid(name: str) -> str:
+
+    return str(uuid.uuid5(UUID_NAMESPACE, name))
+
+
+def _is_empty(session: Session, table_class) -> bool:
+
+    return session.execute(select(table_class).limit(1)).first() is None
+
+
+def main():
+
+    defaults = SyntheticDataScale.model_fields
+    parser = argparse.ArgumentParser(
+        description="Loads synthetic PacBio data to empty ml warehouse "
+        "and LangQC databases."
+    )
+    parser.add_argument(
+        "--mlwh-url",
+        default=os.environ.get("DB_URL"),
+        help="ml warehouse database URL, defaults to DB_URL environment variable",
+    )
+    parser.add_argument(
+        "--qcdb-url",
+        default=os.environ.get("QCDB_URL"),
+        help="LangQC database URL, defaults to QCDB_URL environment variable",
+    )
+    parser.add_argument("--num-wells", type=int, default=defaults["num_wells"].default)
+    parser.add_argument(
+        "--num-qc-states",
+        type=int,
+        default=defaults["num_qc_states"].default,
+        help="maximum number of sequencing and library QC states",
+    )
+    parser.add_argument("--plex", type=int, default=defaults["plex"].default)
+    parser.add_argument(
+        "--create-tables",
+        action="store_true",
+        help="create missing tables, existing tables are not changed",
+    )
+    args = parser.parse_args()
+    if args.mlwh_url is None and args.qcdb_url is None:
+        parser.error("At least one of the database URLs should be given")
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    data = SyntheticData(
+        SyntheticDataScale(
+            num_wells=args.num_wells,
+            num_qc_states=args.num_qc_states,
+            plex=args.plex,
+        )
+    )
+    databases = [
+        (args.mlwh_url, MlwhBase.metadata, PacBioRunWellMetrics, data.load_mlwh),
+        (args.qcdb_url, QcBase.metadata, SeqProduct, data.load_qcdb),
+    ]
+    for (url, metadata, table_class, load) in databases:
+        if url is None:
+            continue
+        engine = create_engine(url)
+        if args.create_tables:
+            metadata.create_all(bind=engine)
+        with Session(engine) as session:
+            if not _is_empty(session, table_class):
+                parser.error(f"Table {table_class.__tablename__} is not empty")
+            load(session)
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
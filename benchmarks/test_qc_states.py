@@ -0,0 +1,120 @@
+import itertools
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+
+from lang_qc.db.helper.qc import (
+    assign_qc_states_to_products,
+    get_qc_states,
+    get_qc_states_by_id_product_list,
+)
+from lang_qc.db.qc_schema import SeqProduct, User
+from lang_qc.models.qc_state import QcStateBasic
+
+
+def _products_with_qc_states(
+    synthetic_data, num_weeks: int, sequencing_outcomes_only: bool = False
+) -> set[str]:
+    """
+    Returns the IDs of the synthetic products, which have QC states assigned
+    within the look-back period of `get_qc_states`.
+    """
+
+    start = date.today() - timedelta(weeks=num_weeks)
+    since = datetime(start.year, start.month, start.day)
+    ids = set()
+    for well in synthetic_data.wells():
+        if well.qc_state is None or well.qc_date <= since:
+            continue
+        ids.add(well.id_product)
+        if not sequencing_outcomes_only and well.is_pooled():
+            ids.update(
+                library.id_product
+                for library in well.libraries
+                if library.qc_state is not None
+            )
+    return ids
+
+
+def test_get_qc_states(measure, qcdb_sessionfactory, synthetic_data):
+
+    expected_ids = _products_with_qc_states(synthetic_data, num_weeks=104)
+    if len(expected_ids) == 0:
+        pytest.skip("No QC states within 104 weeks in the synthetic data")
+
+    def get():
+        with qcdb_sessionfactory() as session:
+            return get_qc_states(session, num_weeks=104)
+
+    assert set(measure(get)) == expected_ids
+
+
+def test_get_sequencing_qc_states(measure, qcdb_sessionfactory, synthetic_data):
+
+    expected_ids = _products_with_qc_states(
+        synthetic_data, num_weeks=4, sequencing_outcomes_only=True
+    )
+    if len(expected_ids) == 0:
+        pytest.skip("No sequencing QC states within 4 weeks in the synthetic data")
+
+    def get():
+        with qcdb_sessionfactory() as session:
+            return get_qc_states(session, num_weeks=4, sequencing_outcomes_only=True)
+
+    assert set(measure(get)) == expected_ids
+
+
+def test_bulk_qc_fetch(measure, qcdb_sessionfactory, synthetic_data):
+    """
+    Retrieves QC states for the wells and libraries of the pooled wells,
+    as the `POST /products/qc` endpoint does.
+    """
+
+    products = [
+        product
+        for well in synthetic_data.pooled_wells()
+        for product in [well] + well.libraries
+    ]
+    ids = [product.id_product for product in products]
+
+    def get():
+        with qcdb_sessionfactory() as session:
+            return get_qc_states_by_id_product_list(session, ids)
+
+    assert set(measure(get)) == {
+        product.id_product for product in products if product.qc_state is not None
+    }
+
+
+def test_assign_qc_states(
+    measure, qcdb_sessionfactory, synthetic_data, benchmark_settings
+):
+    """
+    Assigns final sequencing QC states to a page of wells, as the
+    `PUT /pacbio/products/qc_assign` endpoint does. The outcome of the
+    wells alternates between passed and failed, their QC flow status
+    does not change.
+    """
+
+    ids = [
+        well.id_product
+        for well in synthetic_data.wells()
+        if well.qc_state is not None and well.qc_state[1] == 0
+    ][: benchmark_settings.page_size]
+    outcomes = itertools.cycle(["Failed", "Passed"])
+
+    def assign():
+        qc_state = QcStateBasic(
+            qc_state=next(outcomes), is_preliminary=False, qc_type="sequencing"
+        )
+        with qcdb_sessionfactory() as session:
+            user = session.execute(select(User)).scalars().first()
+            products = session.execute(
+                select(SeqProduct).where(SeqProduct.id_product.in_(ids))
+            ).scalars()
+            return assign_qc_states_to_products(
+                session, [(product, qc_state) for product in products], user
+            )
+
+    assert len(measure(assign)) == len(ids)
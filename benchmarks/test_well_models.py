@@ -0,0 +1,94 @@
+import pytest
+
+from lang_qc.db.helper.qc import get_qc_state_for_product
+from lang_qc.db.helper.wells import WellWh
+from lang_qc.models.pacbio.qc_data import (
+    QCDataWell,
+    QCPoolMetrics,
+    dispatch,
+    get_ids_for_smrtlink_url,
+)
+from lang_qc.models.pacbio.well import PacBioWellFull
+from lang_qc.models.qc_state import QcState
+
+
+def test_pool_metrics(measure, mlwh_sessionfactory, synthetic_data):
+    """
+    Creates deplexing metrics for the largest pool, as the
+    `GET /products/{id_product}/seq_level/pool` endpoint does.
+    """
+
+    well = synthetic_data.pooled_wells()[0]
+
+    def create():
+        with mlwh_sessionfactory() as session:
+            db_well = WellWh(session=session).get_mlwh_well_by_product_id(
+                well.id_product, with_lims_data=True
+            )
+            return QCPoolMetrics(db_well=db_well)
+
+    assert len(measure(create).products) == len(well.libraries)
+
+
+def test_well_full(measure, mlwh_sessionfactory, qcdb_sessionfactory, synthetic_data):
+    """
+    Creates a model for a pooled well with its QC state, as the
+    `GET /products/{id_product}/seq_level` endpoint does.
+    """
+
+    well = synthetic_data.pooled_wells()[0]
+
+    def create():
+        with mlwh_sessionfactory() as mlwh_session:
+            with qcdb_sessionfactory() as qcdb_session:
+                db_well = WellWh(session=mlwh_session).get_mlwh_well_by_product_id(
+                    well.id_product, with_lims_data=True
+                )
+                qc_state = QcState.from_orm(
+                    get_qc_state_for_product(qcdb_session, well.id_product)
+                )
+                return PacBioWellFull(db_well=db_well, qc_state=qc_state)
+
+    assert measure(create).qc_state is not None
+
+
+def _qc_data_from_json_schema(obj):
+    """
+    The previous implementation of `QCDataWell.from_orm`, which enumerated
+    the fields and their labels by generating the JSON schema of the model
+    for every well. Kept as a baseline for the `test_qc_data_well` benchmark.
+    """
+
+    attrs = QCDataWell.model_json_schema()["properties"]
+    qc_data = {}
+    for name in attrs:
+        if name == "smrt_link":
+            qc_data[name] = get_ids_for_smrtlink_url(obj)
+        else:
+            qc_data[name] = {"value": None, "label": attrs[name]["title"]}
+            if name in dispatch:
+                callable, obj_keys = dispatch[name]
+                if all(getattr(obj, key, None) for key in obj_keys):
+                    qc_data[name]["value"] = callable(obj, name)
+            else:
+                qc_data[name]["value"] = getattr(obj, name, None)
+
+    return QCDataWell.model_validate(qc_data)
+
+
+@pytest.mark.parametrize(
+    "create",
+    [QCDataWell.from_orm, _qc_data_from_json_schema],
+    ids=["field_plan", "json_schema"],
+)
+def test_qc_data_well(benchmark, mlwh_sessionfactory, synthetic_data, create):
+    """
+    Creates QC data for a well, which is already retrieved from the database.
+    The `json_schema` case shows the cost of the previous implementation.
+    """
+
+    well = synthetic_data.pooled_wells()[0]
+    with mlwh_sessionfactory() as session:
+        db_well = WellWh(session=session).get_mlwh_well_by_product_id(well.id_product)
+        benchmark.group = "QCDataWell.from_orm"
+        assert benchmark(create, db_well) == _qc_data_from_json_schema(db_well)
@@ -0,0 +1,89 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from lang_qc.db.helper.qc import qc_flow_status_for_qc_state
+from lang_qc.db.helper.wells import INBOX_LOOK_BACK_NUM_WEEKS, PacBioPagedWellsFactory
+from lang_qc.models.qc_flow_status import QcFlowStatusEnum
+
+
+def _num_wells(synthetic_data, qc_flow_status: QcFlowStatusEnum) -> int:
+    """
+    Returns the number of synthetic wells, which are listed for the QC flow
+    status by `PacBioPagedWellsFactory`. Only the well statuses and QC
+    states, which occur in the synthetic data, are considered.
+    """
+
+    start = date.today() - timedelta(weeks=INBOX_LOOK_BACK_NUM_WEEKS)
+    look_back_min_date = datetime(start.year, start.month, start.day)
+
+    def well_qc_flow_status(well) -> QcFlowStatusEnum | None:
+        if well.well_status == "Aborted":
+            return QcFlowStatusEnum.ABORTED
+        if well.well_status == "Unknown":
+            return QcFlowStatusEnum.UNKNOWN
+        if well.qc_state is not None:
+            return qc_flow_status_for_qc_state(*well.qc_state)
+        if well.well_status == "Complete" and well.run_complete > look_back_min_date:
+            return QcFlowStatusEnum.INBOX
+        if well.run_start > look_back_min_date:
+            return QcFlowStatusEnum.UPCOMING
+        return None
+
+    return sum(
+        1
+        for well in synthetic_data.wells()
+        if well_qc_flow_status(well) == qc_flow_status
+    )
+
+
+@pytest.mark.parametrize("qc_flow_status", list(QcFlowStatusEnum))
+def test_create_for_qc_status(
+    measure,
+    mlwh_sessionfactory,
+    qcdb_sessionfactory,
+    benchmark_settings,
+    synthetic_data,
+    qc_flow_status,
+):
+
+    num_wells = _num_wells(synthetic_data, qc_flow_status)
+    if num_wells == 0:
+        pytest.skip(f"No {qc_flow_status.value} wells in the synthetic data")
+
+    def create():
+        with mlwh_sessionfactory() as mlwh_session:
+            with qcdb_sessionfactory() as qcdb_session:
+                return PacBioPagedWellsFactory(
+                    session=mlwh_session,
+                    qcdb_session=qcdb_session,
+                    page_size=benchmark_settings.page_size,
+                    page_number=1,
+                ).create_for_qc_status(qc_flow_status)
+
+    paged_wells = measure(create)
+    assert paged_wells.total_number_of_items == num_wells
+    assert len(paged_wells.wells) == min(num_wells, benchmark_settings.page_size)
+
+
+def test_create_for_run(
+    measure,
+    mlwh_sessionfactory,
+    qcdb_sessionfactory,
+    benchmark_settings,
+    synthetic_data,
+):
+    well = synthetic_data.pooled_wells()[0]
+
+    def create():
+        with mlwh_sessionfactory() as mlwh_session:
+            with qcdb_sessionfactory() as qcdb_session:
+                return PacBioPagedWellsFactory(
+                    session=mlwh_session,
+                    qcdb_session=qcdb_session,
+                    page_size=benchmark_settings.page_size,
+                    page_number=1,
+                ).create_for_run(well.run_name)
+
+    paged_wells = measure(create)
+    assert well.id_product in [w.id_product for w in paged_wells.wells]
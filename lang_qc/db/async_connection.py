@@ -0,0 +1,61 @@
+# Copyright (c) 2026 Genome Research Ltd.
+#
+# This file is part of npg_langqc.
+#
+# npg_langqc is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation; either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program. If not, see <http://www.gnu.org/licenses/>.
+
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+"""
+Utilities for creating asynchronous database engines.
+
+The same database URLs are used for both synchronous and asynchronous
+engines. For the asynchronous engines the database driver is replaced
+by its asynchronous counterpart.
+"""
+
+"""
+Asynchronous drivers for database backends. For MySQL, the `aiomysql`
+driver is a drop-in replacement for the `pymysql` driver, which is used
+by the synchronous engines. Only MySQL is supported by the application.
+"""
+ASYNC_DRIVERS = {
+    "mysql": "mysql+aiomysql",
+}
+
+
+def async_url(url: str | URL) -> URL:
+    """
+    Given a database URL, returns the URL for the same database with an
+    asynchronous driver. The URL is returned unchanged if its driver is
+    already asynchronous or the backend is not listed in `ASYNC_DRIVERS`.
+    """
+
+    url = make_url(url)
+    if url.drivername not in ASYNC_DRIVERS.values():
+        drivername = ASYNC_DRIVERS.get(url.get_backend_name())
+        if drivername is not None:
+            url = url.set(drivername=drivername)
+
+    return url
+
+
+def create_async_db_engine(url: str | URL, **kwargs) -> AsyncEngine:
+    """
+    Returns an asynchronous engine for the database given by the URL.
+    Any keyword arguments are passed to the engine constructor.
+    """
+
+    return create_async_engine(async_url(url), **kwargs)
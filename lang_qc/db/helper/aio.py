@@ -0,0 +1,123 @@
+# Copyright (c) 2026 Genome Research Ltd.
+#
+# This file is part of npg_langqc.
+#
+# npg_langqc is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation; either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program. If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+from typing import Any, Callable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+"""
+Running the helper functions, which are defined in other modules of this
+package, with asynchronous sessions.
+
+The helper functions do not have asynchronous counterparts. The only way
+to call them with asynchronous sessions is `run_sync` or, for independent
+calls, `gather`. Both use the `sqlalchemy.ext.asyncio.AsyncSession.run_sync`
+method, which makes the database I/O of the synchronous code non-blocking.
+Lazy loading of related ORM objects is possible within the synchronous
+code, but not outside of it. Therefore, ORM objects returned by the
+functions of this module should only be used for accessing the attributes
+that have already been loaded. Any further processing of ORM objects, for
+example, building response models, should be done by a synchronous
+function, which is run by `run_sync`.
+
+Example:
+
+    qc_states = await run_sync(
+        get_qc_states_by_id_product_list, qcdb_session, ids=ids
+    )
+
+The synchronous code is run in the event loop's thread and blocks the
+event loop while it is not waiting for the database. This is accepted in
+order not to hold a threadpool worker for the duration of the database
+I/O. Most of this time is taken by SQLAlchemy creating ORM objects from
+the result rows, which cannot be moved off the event loop while using
+asynchronous sessions. Building the response models takes a smaller
+part; running it in the threadpool would not shorten the blocking
+significantly, but would add a thread handoff for each request.
+"""
+
+
+async def run_sync(function: Callable, *sessions: AsyncSession, **kwargs) -> Any:
+    """
+    Runs a synchronous function, which takes one or more synchronous sessions
+    as its first positional arguments, with the synchronous counterparts of
+    the given asynchronous sessions. Returns the return value of the function.
+
+    Any keyword arguments are passed to the function.
+
+    Example:
+
+        wells = await run_sync(
+            lambda qcdb_session, mlwh_session: PacBioPagedWellsFactory(
+                qcdb_session=qcdb_session, mlwh_session=mlwh_session, ...
+            ).create_for_qc_status(qc_status),
+            qcdb_session,
+            mlwh_session,
+        )
+    """
+
+    (session, *other_sessions) = sessions
+    # Database I/O of any of the sessions can be performed by the
+    # synchronous code, which is run by any of the sessions.
+    other_sync_sessions = [s.sync_session for s in other_sessions]
+
+    return await session.run_sync(
+        lambda sync_session: function(sync_session, *other_sync_sessions, **kwargs)
+    )
+
+
+async def gather(*calls: tuple) -> list:
+    """
+    Runs synchronous functions concurrently. Each call is a tuple of a
+    function and one or more asynchronous sessions, which are passed to
+    the function as in `run_sync`. Returns a list of the return values of
+    the functions in the order of the calls.
+
+    Database I/O of different calls overlaps, so, for example, independent
+    queries to the ml warehouse and the LangQC database take as long as
+    the slowest of them rather than the sum of both. A session cannot be
+    used by more than one call, ValueError is raised otherwise. If any of
+    the functions raises an exception, the first of these exceptions is
+    re-raised once all functions have finished.
+
+    Example:
+
+        (mlwh_well, qc_state) = await gather(
+            (find_well, mlwh_session),
+            (find_qc_state, qcdb_session),
+        )
+    """
+
+    sessions = [session for (_, *call_sessions) in calls for session in call_sessions]
+    if len({id(session) for session in sessions}) != len(sessions):
+        raise ValueError("Concurrent calls cannot share a session")
+
+    return _results(
+        await asyncio.gather(
+            *[run_sync(function, *sessions) for (function, *sessions) in calls],
+            return_exceptions=True,
+        )
+    )
+
+
+def _results(results: list) -> list:
+
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+    return list(results)
@@ -0,0 +1,158 @@
+# Copyright (c) 2026 Genome Research Ltd.
+#
+# This file is part of npg_langqc.
+#
+# npg_langqc is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation; either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program. If not, see <http://www.gnu.org/licenses/>.
+
+import threading
+import time
+from typing import Any, Callable
+from weakref import WeakKeyDictionary
+
+from sqlalchemy import Engine, select
+from sqlalchemy.orm import Session
+
+from lang_qc.db.qc_schema import QcStateDict, QcType, SeqPlatform, SubProductAttr
+
+"""
+A process-wide cache for the dictionary tables of the LangQC database.
+
+The dictionaries are small and change only when a database migration is
+applied. The cache maps the natural key of each dictionary row, for
+example, the name of the QC type, to the primary key of the row. Only
+the primary keys are cached, ORM objects are never shared between
+sessions. The callers should compare and assign dictionary values by
+the primary key.
+
+Values that are derived from the dictionaries, for example, responses
+of the server endpoints, can be cached alongside the dictionaries, see
+`cached_value`.
+
+The cached values are kept separately for each database engine and
+expire after DICTIONARY_CACHE_TTL seconds. The cache can be invalidated
+explicitly by calling `invalidate_dictionary_cache`.
+"""
+
+DICTIONARY_CACHE_TTL = 600
+
+"""
+For each dictionary table, the column that holds the natural key and
+the primary key column.
+"""
+DICTIONARIES = {
+    QcType: (QcType.qc_type, QcType.id_qc_type),
+    QcStateDict: (QcStateDict.state, QcStateDict.id_qc_state_dict),
+    SeqPlatform: (SeqPlatform.name, SeqPlatform.id_seq_platform),
+    SubProductAttr: (SubProductAttr.attr_name, SubProductAttr.id_attr),
+}
+
+_cache = WeakKeyDictionary()
+_lock = threading.Lock()
+
+
+def dictionary_ids(session: Session, dictionary) -> dict[str, int]:
+    """
+    Returns a dictionary where the keys are the natural keys of the rows
+    of the given dictionary table and the values are the primary keys of
+    these rows. The return value should not be modified by the caller.
+
+    Arguments:
+        `session` - `sqlalchemy.orm.Session`, a connection for LangQC database.
+        `dictionary` - one of the ORM classes listed in `DICTIONARIES`.
+    """
+
+    return cached_value(session, dictionary, lambda session: _load(session, dictionary))
+
+
+def dictionary_id(session: Session, dictionary, value: str) -> int | None:
+    """
+    Returns the primary key of the row of the dictionary table with the
+    given natural key, None if no such row exists. If the value is not
+    found in the cache, the dictionary is reloaded from the database
+    before giving up.
+
+    Arguments:
+        `session` - `sqlalchemy.orm.Session`, a connection for LangQC database.
+        `dictionary` - one of the ORM classes listed in `DICTIONARIES`.
+        `value` - the natural key of the dictionary row.
+    """
+
+    id = dictionary_ids(session, dictionary).get(value)
+    if id is None:
+        ids = _load(session, dictionary)
+        _store(_engine(session), dictionary, ids)
+        id = ids.get(value)
+
+    return id
+
+
+def cached_value(session: Session, key, load: Callable[[Session], Any]) -> Any:
+    """
+    Returns a cached value for the given key. If the value is not in
+    the cache or has expired, it is computed by calling the `load`
+    function with the session as an argument and cached. The value
+    should be derived from the dictionary tables only and should not
+    be modified by the caller.
+
+    Arguments:
+        `session` - `sqlalchemy.orm.Session`, a connection for LangQC database.
+        `key` - a hashable key, which identifies the value.
+        `load` - a function that computes the value.
+    """
+
+    engine = _engine(session)
+    with _lock:
+        cached = _cache.get(engine, {}).get(key)
+    if cached is not None and cached[0] > time.monotonic():
+        return cached[1]
+
+    value = load(session)
+    _store(engine, key, value)
+
+    return value
+
+
+def invalidate_dictionary_cache(engine: Engine = None):
+    """
+    Discards the cached dictionaries either for the given engine or,
+    if the engine is not given, for all engines.
+    """
+
+    with _lock:
+        if engine is None:
+            _cache.clear()
+        else:
+            _cache.pop(engine, None)
+
+
+def _engine(session: Session) -> Engine:
+    # The session might be bound to a connection, in which case
+    # the engine is available as an attribute of the connection.
+    # For an engine this attribute is the engine itself.
+    return session.get_bind().engine
+
+
+def _load(session: Session, dictionary) -> dict[str, int]:
+
+    (key_column, id_column) = DICTIONARIES[dictionary]
+    return {row[0]: row[1] for row in session.execute(select(key_column, id_column))}
+
+
+def _store(engine: Engine, key, value):
+
+    with _lock:
+        _cache.setdefault(engine, {})[key] = (
+            time.monotonic() + DICTIONARY_CACHE_TTL,
+            value,
+        )
@@ -20,14 +20,18 @@
 # this program. If not, see <http://www.gnu.org/licenses/>.
 
 from collections import defaultdict
+from collections.abc import Iterator
 from datetime import date, datetime, timedelta
 
-from sqlalchemy import and_, func, select
-from sqlalchemy.exc import NoResultFound
+from sqlalchemy import and_, case, delete, func, insert, select, tuple_
+from sqlalchemy.dialects.mysql import insert as mysql_insert
 from sqlalchemy.orm import Session, selectinload
 
+from lang_qc.db.helper.dictionary import dictionary_id
+from lang_qc.db.qc_schema import QcFlowStatus
 from lang_qc.db.qc_schema import QcState as QcStateDb
 from lang_qc.db.qc_schema import QcStateDict, QcStateHist, QcType, SeqProduct, User
+from lang_qc.models.qc_flow_status import QcFlowStatusEnum
 from lang_qc.models.qc_state import QcState, QcStateBasic
 from lang_qc.util.errors import InconsistentInputError, InvalidDictValueError
 from lang_qc.util.type_checksum import ChecksumSHA256
@@ -45,6 +49,9 @@ SEQUENCING_QC_TYPE = DEFAULT_QC_TYPE
 CLAIMED_QC_STATE = "Claimed"
 DEFAULT_FINALITY = False
 ONLY_PRELIM_STATES = (CLAIMED_QC_STATE, "On hold")
+ON_HOLD_QC_STATE_PREFIX = "On hold"
+QC_STATE_STREAM_BATCH_SIZE = 1000
+ID_LIST_BATCH_SIZE = 1000
 
 
 def qc_state_dict(session: Session) -> dict:
@@ -88,7 +95,8 @@ def get_qc_states_by_id_product_list(
 
     To remain efficient for large lists of product IDs, no input
     validation is performed. The input should be validated by the
-    caller.
+    caller. Long lists of product IDs are queried in batches, see
+    `in_batches`.
 
     Arguments:
         `session` - `sqlalchemy.orm.Session`, a connection for LangQC database.
@@ -96,15 +104,72 @@ def get_qc_states_by_id_product_list(
         `sequencing_outcomes_only`- a boolean flag, False by default.
     """
 
-    qc_states = _get_qc_state_by_id_list(session, ids, sequencing_outcomes_only)
-
     response = defaultdict(list)
-    for state in qc_states:
-        response[state.seq_product.id_product].append(QcState.from_orm(state))
+    for ids_batch in in_batches(ids):
+        qc_states = _get_qc_state_by_id_list(
+            session, ids_batch, sequencing_outcomes_only
+        )
+        for state in qc_states:
+            response[state.seq_product.id_product].append(QcState.from_orm(state))
 
     return dict(response)
 
 
+def stream_qc_states_by_id_product_list(
+    session: Session,
+    ids: list[ChecksumSHA256],
+    sequencing_outcomes_only: bool = False,
+) -> Iterator[QcState]:
+    """
+    A streaming counterpart of the `get_qc_states_by_id_product_list`
+    function. Returns an iterator over QcState records of any type for
+    the given product IDs. The records for the same product are not
+    guaranteed to be consecutive.
+
+    Long lists of product IDs are queried in batches, see `in_batches`.
+    The database rows are fetched in batches of QC_STATE_STREAM_BATCH_SIZE
+    rows using a server-side cursor where the database driver supports it.
+    No ORM objects are created and the records are not accumulated, so the
+    memory footprint does not depend on the number of returned records.
+    The session should not be used for other queries while the iterator
+    is being consumed.
+
+    Arguments:
+        `session` - `sqlalchemy.orm.Session`, a connection for LangQC database.
+        `ids` - a list of string product ID.
+        `sequencing_outcomes_only`- a boolean flag, False by default.
+    """
+
+    # Select all values needed for the QcState model in one query,
+    # lazy loading of related rows is not possible while the rows
+    # are streamed.
+    query = (
+        select(
+            SeqProduct.id_product,
+            User.username.label("user"),
+            QcStateDb.date_created,
+            QcStateDb.date_updated,
+            QcType.qc_type,
+            QcStateDict.state.label("qc_state"),
+            QcStateDict.outcome,
+            QcStateDb.is_preliminary,
+            QcStateDb.created_by,
+        )
+        .select_from(QcStateDb)
+        .join(QcStateDb.seq_product)
+        .join(QcType)
+        .join(QcStateDict)
+        .join(User)
+        .execution_options(yield_per=QC_STATE_STREAM_BATCH_SIZE)
+    )
+    if sequencing_outcomes_only is True:
+        query = query.where(QcType.qc_type == SEQUENCING_QC_TYPE)
+
+    for ids_batch in in_batches(ids):
+        for row in session.execute(query.where(SeqProduct.id_product.in_(ids_batch))):
+            yield QcState(**row._mapping)
+
+
 def get_qc_states(
     session: Session,
     num_weeks: int,
@@ -187,7 +252,7 @@ def product_has_qc_state(
     )
     if qc_type is not None:
         query = query.join(SeqProduct.qc_state).where(
-            QcStateDb.qc_type == _get_qc_type_row(session, qc_type)
+            QcStateDb.id_qc_type == _get_qc_type_id(session, qc_type)
         )
 
     return bool(session.execute(query).scalar_one())
@@ -203,6 +268,8 @@ def products_have_qc_state(
     boolean flag is true, the product must have sequencing QC state associated
     with it; `library` QC state is excluded.
 
+    Long lists of product IDs are queried in batches, see `in_batches`.
+
     Arguments:
         `session` - `sqlalchemy.orm.Session`, a connection for LangQC database.
         `ids` - a list of string product IDs.
@@ -210,17 +277,50 @@ def products_have_qc_state(
         is interested in `sequencing` QC states only
     """
 
-    query = select(SeqProduct.id_product).where(SeqProduct.id_product.in_(ids))
+    query = select(SeqProduct.id_product)
     if sequencing_outcomes_only is True:
         query = query.join(SeqProduct.qc_state).where(
-            QcStateDb.qc_type == _get_qc_type_row(session, SEQUENCING_QC_TYPE)
+            QcStateDb.id_qc_type == _get_qc_type_id(session, SEQUENCING_QC_TYPE)
+        )
+
+    product_ids = set()
+    for ids_batch in in_batches(ids):
+        product_ids.update(
+            session.execute(query.where(SeqProduct.id_product.in_(ids_batch)))
+            .scalars()
+            .all()
         )
 
-    # We asked to retrieve data for one column only. The return value for
-    # each row is an array with a single value from this column.
-    product_ids = [row[0] for row in session.execute(query).all()]
+    return product_ids
+
+
+def in_batches(ids: list, batch_size: int = None) -> Iterator[list]:
+    """
+    Splits a list of IDs into batches, which are suitable for use in the SQL
+    `IN (...)` clause. Long lists of IDs might exceed the maximum packet size
+    of the database server and result in poor query plans. Duplicate IDs are
+    dropped so that the same ID does not appear in two batches, the order of
+    the IDs is otherwise preserved.
+
+    Querying the database for each batch and merging the results is left to
+    the caller. The batches should be queried one after another using the
+    same session.
+
+    Arguments:
+        `ids` - a list of IDs.
+        `batch_size` - an optional maximum size of a batch, defaults to
+        ID_LIST_BATCH_SIZE.
+    """
+
+    if batch_size is None:
+        batch_size = ID_LIST_BATCH_SIZE
+    if batch_size < 1:
+        raise ValueError("batch_size should be a positive number")
 
-    return set(product_ids)
+    unique_ids = list(dict.fromkeys(ids))
+    for start in range(0, len(unique_ids), batch_size):
+        end = start + batch_size
+        yield unique_ids[start:end]
 
 
 def get_seq_product(session: Session, id_product: ChecksumSHA256) -> SeqProduct:
@@ -260,20 +360,54 @@ def get_qc_state_for_product(
         `qc_type`- a string QC type.
     """
 
-    qc_type_row = _get_qc_type_row(session, qc_type)
+    id_qc_type = _get_qc_type_id(session, qc_type)
     query = (
         select(QcStateDb)
         .join(QcStateDb.seq_product)
         .where(
             and_(
                 SeqProduct.id_product == id_product,
-                QcStateDb.qc_type == qc_type_row,
+                QcStateDb.id_qc_type == id_qc_type,
             )
         )
     )
     return session.execute(query).scalars().one_or_none()
 
 
+def get_qc_state_version(
+    session: Session, id_product: ChecksumSHA256, qc_type: str = DEFAULT_QC_TYPE
+) -> str | None:
+    """
+    Returns a string, which changes whenever the QC state of the `qc_type`
+    type for the product with the argument product ID changes. None is
+    returned if the product has no QC state of this type.
+
+    The string is derived from the date the QC state was last updated and
+    a few other columns of the QC state row. Unlike
+    `get_qc_state_for_product`, a single column-only query is used, the rows
+    related to the QC state are not retrieved.
+    """
+
+    id_qc_type = _get_qc_type_id(session, qc_type)
+    query = (
+        select(
+            QcStateDb.date_updated,
+            QcStateDb.id_qc_state_dict,
+            QcStateDb.is_preliminary,
+            QcStateDb.id_user,
+        )
+        .join(QcStateDb.seq_product)
+        .where(
+            and_(
+                SeqProduct.id_product == id_product,
+                QcStateDb.id_qc_type == id_qc_type,
+            )
+        )
+    )
+    row = session.execute(query).one_or_none()
+    return None if row is None else ":".join([str(value) for value in row])
+
+
 def claim_qc_for_product(
     session: Session, seq_product: SeqProduct, user: User
 ) -> QcStateDb:
@@ -345,7 +479,9 @@ def assign_qc_state_to_product(
 
     For each new or updated record in the `qc_state` table a new record is
     created in the `qc_state_hist` table, thereby preserving a history of all
-    changes.
+    changes. For the `sequencing` QC type the corresponding row in the
+    `qc_flow_status` table is created or updated. The QC state, its history
+    record and the QC flow status are saved in a single transaction.
 
     Arguments:
         `session` - `sqlalchemy.orm.Session`, a connection for LangQC database.
@@ -369,80 +505,221 @@ def assign_qc_state_to_product(
         created, the value of this argument is used for the `date_created` column as well.
     """
 
-    qc_type = qc_state.qc_type
-    qc_state_description = qc_state.qc_state
-    # The following two function call will validate the request.
-    qc_type_row = _get_qc_type_row(session, qc_type)
-    qc_state_dict_row = _get_qc_state_dict_row(session, qc_state_description)
-
-    # 'Claimed' and 'On hold' states cannot be final.
-    # By enforcing this we simplify rules for assigning QC states
-    # to QC flow statuses.
-    is_preliminary = 1 if qc_state.is_preliminary is True else 0
-    if (is_preliminary == 0) and (qc_state_description in ONLY_PRELIM_STATES):
-        raise InconsistentInputError(
-            f"QC state '{qc_state_description}' cannot be final"
-        )
-
-    # 'Claimed' state is only applicable for 'sequencing' QC type.
-    if qc_state_description == CLAIMED_QC_STATE and qc_type != DEFAULT_QC_TYPE:
-        raise InconsistentInputError(
-            f"QC state '{CLAIMED_QC_STATE}' is incompatible with QC type '{qc_type}'"
-        )
+    (id_qc_type, id_qc_state_dict, is_preliminary) = _validate_qc_state(
+        session, qc_state
+    )
 
-    qc_state_db = None
     # Because of the way the unique constraint is set for the qc_state
     # table (see unique_qc_state index), there cannot be more than one
     # record of a given QC type.
     for s in seq_product.qc_state:
-        if s.qc_type.qc_type == qc_type:
-            qc_state_db = s
+        if s.id_qc_type == id_qc_type:
             if (
-                s.qc_state_dict.state == qc_state_description
+                s.id_qc_state_dict == id_qc_state_dict
                 and s.is_preliminary == is_preliminary
             ):
                 return s  # No need to update the record.
-            qc_state_db = s
             break
 
+    # Dictionary values are assigned by their primary keys.
     values = {
-        "qc_state_dict": qc_state_dict_row,
+        "id_seq_product": seq_product.id_seq_product,
+        "id_qc_type": id_qc_type,
+        "id_qc_state_dict": id_qc_state_dict,
         "is_preliminary": is_preliminary,
-        "user": user,
+        "id_user": user.id_user,
         "created_by": application,
-        "qc_type": qc_type_row,
-        "seq_product": seq_product,
     }
+    _save_qc_states(session, [values], date_updated)
+    session.commit()
 
-    if qc_state_db is not None:
-        # Update some of the values of the existing record.
-        # No need to update the QC type, it stays the same.
-        qc_state_db.qc_state_dict = values["qc_state_dict"]
-        qc_state_db.is_preliminary = values["is_preliminary"]
-        qc_state_db.user = values["user"]
-        qc_state_db.created_by = values["created_by"]
-        if date_updated:
-            qc_state_db.date_updated = date_updated
-    else:
-        # Create a new record, date_updated=None is accepted by the ORM as
-        # deferring to the schema defaults
-        qc_state_db = QcStateDb(
-            date_created=date_updated, date_updated=date_updated, **values
+    # The objects in the session have been expired by the commit,
+    # the attributes of the returned object are loaded afresh.
+    return session.execute(
+        select(QcStateDb).where(
+            QcStateDb.id_seq_product == values["id_seq_product"],
+            QcStateDb.id_qc_type == id_qc_type,
         )
+    ).scalar_one()
+
+
+def assign_qc_states_to_products(
+    session: Session,
+    qc_states: list[tuple[SeqProduct, QcStateBasic]],
+    user: User,
+    application: str = APPLICATION_NAME,
+    date_updated: datetime = None,
+) -> list[QcStateDb]:
+    """
+    A bulk version of the `assign_qc_state_to_product` function. Assigns
+    QC states to a number of products in a single transaction. Returns a
+    list of QcState objects representing new, updated or existing rows in
+    the `qc_state` table in the order of the `qc_states` argument.
+
+    The rules for assigning the QC states and the errors are the same as
+    for the `assign_qc_state_to_product` function. All QC states are
+    validated before any changes are made, an error for one of the QC states
+    means that none of them is assigned. The `InconsistentInputError` is
+    also raised if more than one QC state of the same type is given for
+    the same product.
+
+    Arguments:
+        `session` - `sqlalchemy.orm.Session`, a connection for LangQC database.
 
-    session.add(qc_state_db)
-    session.commit()  # This will generate and propagate timestamps.
+        `qc_states` - a list of pairs of an existing `lang_qc.db.qc_schema.SeqProduct`
+        object and a `QcStateBasic` type object, which wraps around attributes of
+        the QC state that has to be assigned to this product.
 
-    qc_state_hist = QcStateHist(
-        # Clone timestamps whether from the argument or generated by the DB.
-        date_created=qc_state_db.date_created,
-        date_updated=qc_state_db.date_updated,
-        **values,
+        `user`, `application`, `date_updated` - see `assign_qc_state_to_product`,
+        the values apply to all QC states.
+    """
+
+    new_states = {}
+    for (seq_product, qc_state) in qc_states:
+        (id_qc_type, id_qc_state_dict, is_preliminary) = _validate_qc_state(
+            session, qc_state
+        )
+        key = (seq_product.id_seq_product, id_qc_type)
+        if key in new_states:
+            raise InconsistentInputError(
+                f"Multiple QC states of type '{qc_state.qc_type}' "
+                f"for product {seq_product.id_product}"
+            )
+        new_states[key] = {
+            "id_seq_product": seq_product.id_seq_product,
+            "id_qc_type": id_qc_type,
+            "id_qc_state_dict": id_qc_state_dict,
+            "is_preliminary": is_preliminary,
+            "id_user": user.id_user,
+            "created_by": application,
+        }
+
+    if len(new_states) == 0:
+        return []
+
+    query = select(QcStateDb).where(
+        tuple_(QcStateDb.id_seq_product, QcStateDb.id_qc_type).in_(
+            list(new_states.keys())
+        )
     )
-    session.add(qc_state_hist)
+    # QC states, which are the same as the current ones, are not updated.
+    unchanged = set()
+    for s in session.execute(query).scalars():
+        key = (s.id_seq_product, s.id_qc_type)
+        if (
+            s.id_qc_state_dict == new_states[key]["id_qc_state_dict"]
+            and s.is_preliminary == new_states[key]["is_preliminary"]
+        ):
+            unchanged.add(key)
+    changed_states = [v for (k, v) in new_states.items() if k not in unchanged]
+
+    if len(changed_states) != 0:
+        _save_qc_states(session, changed_states, date_updated)
+        session.commit()
+
+    saved_states = {
+        (s.id_seq_product, s.id_qc_type): s
+        for s in session.execute(
+            query.options(
+                selectinload(QcStateDb.seq_product),
+                selectinload(QcStateDb.qc_type),
+                selectinload(QcStateDb.user),
+                selectinload(QcStateDb.qc_state_dict),
+            )
+        ).scalars()
+    }
+
+    return [saved_states[key] for key in new_states]
+
+
+def qc_flow_status_for_qc_state(
+    qc_state: str, is_preliminary: bool | int
+) -> QcFlowStatusEnum:
+    """
+    Returns the QC flow status that corresponds to the sequencing QC state
+    with the given description and finality.
+
+    Only the statuses which are fully defined by the QC state are considered,
+    i.e. `in_progress`, `on_hold` and `qc_complete`. The statuses that depend
+    on the MLWH data are not returned.
+
+    Arguments:
+        `qc_state` - a string description of the QC state.
+        `is_preliminary` - a boolean or an integer preliminary flag.
+    """
+
+    if is_preliminary == 0:
+        return QcFlowStatusEnum.QC_COMPLETE
+    if qc_state.lower().startswith(ON_HOLD_QC_STATE_PREFIX.lower()):
+        return QcFlowStatusEnum.ON_HOLD
+    return QcFlowStatusEnum.IN_PROGRESS
+
+
+def reconcile_qc_flow_statuses(session: Session) -> int:
+    """
+    Brings the `qc_flow_status` table in line with the current sequencing
+    QC states. The table is maintained by `assign_qc_state_to_product` and
+    `assign_qc_states_to_products`, this function corrects it after the QC
+    states have been changed by other means, for example, by direct database
+    updates or changes to the dictionary of QC states.
+
+    Stale rows are deleted, missing rows are created. Returns the number of
+    deleted and created rows. The changes are committed.
+
+    Arguments:
+        `session` - `sqlalchemy.orm.Session`, a connection for LangQC database.
+    """
+
+    expected = (
+        select(
+            QcStateDb.id_qc_state,
+            _qc_flow_status_expression().label("qc_flow_status"),
+            QcStateDb.date_updated,
+        )
+        .join(QcType)
+        .join(QcStateDict)
+        .where(QcType.qc_type == SEQUENCING_QC_TYPE)
+        .subquery()
+    )
+
+    stale_ids = (
+        session.execute(
+            select(QcFlowStatus.id_qc_flow_status)
+            .outerjoin(
+                expected,
+                and_(
+                    expected.c.id_qc_state == QcFlowStatus.id_qc_state,
+                    expected.c.qc_flow_status == QcFlowStatus.qc_flow_status,
+                    expected.c.date_updated == QcFlowStatus.date_updated,
+                ),
+            )
+            .where(expected.c.id_qc_state.is_(None))
+        )
+        .scalars()
+        .all()
+    )
+    if stale_ids:
+        session.execute(
+            delete(QcFlowStatus).where(QcFlowStatus.id_qc_flow_status.in_(stale_ids))
+        )
+
+    missing = (
+        select(
+            expected.c.id_qc_state,
+            expected.c.qc_flow_status,
+            expected.c.date_updated,
+        )
+        .outerjoin(QcFlowStatus, QcFlowStatus.id_qc_state == expected.c.id_qc_state)
+        .where(QcFlowStatus.id_qc_flow_status.is_(None))
+    )
+    num_created = session.execute(
+        insert(QcFlowStatus).from_select(
+            ["id_qc_state", "qc_flow_status", "date_updated"], missing
+        )
+    ).rowcount
     session.commit()
 
-    return qc_state_db
+    return len(stale_ids) + num_created
 
 
 def _get_qc_state_by_id_list(
@@ -472,31 +749,177 @@ def _get_qc_state_by_id_list(
     return session.execute(query).scalars().all()
 
 
-def _get_qc_type_row(session: Session, qc_type: str) -> QcType:
+def _get_qc_type_id(session: Session, qc_type: str) -> int:
 
-    qc_type_row = None
-    try:
-        qc_type_row = (
-            session.execute(select(QcType).where(QcType.qc_type == qc_type))
-            .scalars()
-            .one()
-        )
-    except NoResultFound:
+    id_qc_type = dictionary_id(session, QcType, qc_type)
+    if id_qc_type is None:
         raise InvalidDictValueError(f"QC type '{qc_type}' is invalid")
 
-    return qc_type_row
+    return id_qc_type
 
 
-def _get_qc_state_dict_row(session: Session, qc_state: str) -> QcStateDict:
+def _get_qc_state_dict_id(session: Session, qc_state: str) -> int:
 
-    qc_state_dict_row = None
-    try:
-        qc_state_dict_row = (
-            session.execute(select(QcStateDict).where(QcStateDict.state == qc_state))
-            .scalars()
-            .one()
-        )
-    except NoResultFound:
+    id_qc_state_dict = dictionary_id(session, QcStateDict, qc_state)
+    if id_qc_state_dict is None:
         raise InvalidDictValueError(f"QC state '{qc_state}' is invalid")
 
-    return qc_state_dict_row
+    return id_qc_state_dict
+
+
+def _qc_flow_status_expression():
+    """
+    A SQL counterpart of the `qc_flow_status_for_qc_state` function.
+    """
+    return case(
+        (QcStateDb.is_preliminary == 0, QcFlowStatusEnum.QC_COMPLETE.value),
+        (
+            QcStateDict.state.ilike(f"{ON_HOLD_QC_STATE_PREFIX}%"),
+            QcFlowStatusEnum.ON_HOLD.value,
+        ),
+        else_=QcFlowStatusEnum.IN_PROGRESS.value,
+    )
+
+
+def _validate_qc_state(session: Session, qc_state: QcStateBasic) -> tuple:
+    """
+    Validates the attributes of the QC state, which should be assigned,
+    see `assign_qc_state_to_product`. Returns a tuple of the QC type ID,
+    the QC state dictionary ID and an integer preliminary flag.
+    """
+
+    qc_type = qc_state.qc_type
+    qc_state_description = qc_state.qc_state
+    # The following two function call will validate the request.
+    id_qc_type = _get_qc_type_id(session, qc_type)
+    id_qc_state_dict = _get_qc_state_dict_id(session, qc_state_description)
+
+    # 'Claimed' and 'On hold' states cannot be final.
+    # By enforcing this we simplify rules for assigning QC states
+    # to QC flow statuses.
+    is_preliminary = 1 if qc_state.is_preliminary is True else 0
+    if (is_preliminary == 0) and (qc_state_description in ONLY_PRELIM_STATES):
+        raise InconsistentInputError(
+            f"QC state '{qc_state_description}' cannot be final"
+        )
+
+    # 'Claimed' state is only applicable for 'sequencing' QC type.
+    if qc_state_description == CLAIMED_QC_STATE and qc_type != DEFAULT_QC_TYPE:
+        raise InconsistentInputError(
+            f"QC state '{CLAIMED_QC_STATE}' is incompatible with QC type '{qc_type}'"
+        )
+
+    return (id_qc_type, id_qc_state_dict, is_preliminary)
+
+
+def _save_qc_states(session: Session, rows: list[dict], date_updated: datetime):
+    """
+    Creates or updates rows in the `qc_state` table, creates the history
+    records and creates or updates the QC flow statuses for the sequencing
+    QC states. A fixed number of statements is executed regardless of the
+    number of rows. The changes are not committed.
+
+    Each row is a dictionary of values for the `qc_state` table columns
+    apart from the timestamps, see `assign_qc_state_to_product` for the
+    `date_updated` argument.
+    """
+
+    if date_updated:
+        rows = [
+            row | {"date_created": date_updated, "date_updated": date_updated}
+            for row in rows
+        ]
+    # No need to update the QC type and the product of an existing record,
+    # they stay the same. Without a preset value, the database sets the
+    # timestamps, a new record gets the schema defaults.
+    _upsert(
+        session,
+        QcStateDb,
+        update_columns=["id_qc_state_dict", "is_preliminary", "id_user", "created_by"],
+        values=rows,
+        date_updated=date_updated or func.current_timestamp(),
+    )
+
+    # MySQL does not support the RETURNING clause. The history records and
+    # the QC flow statuses are created from the new state of the qc_state
+    # rows by the database, thus cloning the timestamps, whether preset or
+    # generated by the database, without fetching them.
+    saved_states = tuple_(QcStateDb.id_seq_product, QcStateDb.id_qc_type).in_(
+        [(row["id_seq_product"], row["id_qc_type"]) for row in rows]
+    )
+    hist_columns = [
+        "id_seq_product",
+        "id_user",
+        "id_qc_state_dict",
+        "id_qc_type",
+        "created_by",
+        "date_created",
+        "date_updated",
+        "is_preliminary",
+    ]
+    session.execute(
+        insert(QcStateHist).from_select(
+            hist_columns,
+            select(*[getattr(QcStateDb, name) for name in hist_columns]).where(
+                saved_states
+            ),
+        )
+    )
+    id_seq_qc_type = _get_qc_type_id(session, SEQUENCING_QC_TYPE)
+    if all(row["id_qc_type"] != id_seq_qc_type for row in rows):
+        return
+    _upsert(
+        session,
+        QcFlowStatus,
+        update_columns=["qc_flow_status", "date_updated"],
+        from_select=(
+            ["id_qc_state", "qc_flow_status", "date_updated"],
+            select(
+                QcStateDb.id_qc_state,
+                _qc_flow_status_expression(),
+                QcStateDb.date_updated,
+            )
+            .join(QcStateDict)
+            .where(
+                saved_states,
+                QcStateDb.id_qc_type == id_seq_qc_type,
+            ),
+        ),
+    )
+
+
+def _upsert(
+    session: Session,
+    table_class,
+    update_columns: list[str],
+    values: list[dict] = None,
+    from_select: tuple = None,
+    **update,
+):
+    """
+    Inserts rows, either given as a list of dictionaries of `values` or as
+    a pair of a list of column names and a select statement, see
+    `Insert.from_select`. If a row conflicts with an existing row on
+    a unique key, the existing row is updated instead with the inserted
+    values of the `update_columns` and with the values given as keyword
+    arguments. The change is not committed.
+
+    MySQL `INSERT ... ON DUPLICATE KEY UPDATE` statement is used. The
+    deprecated `VALUES()` function is not used. For a list of values
+    SQLAlchemy refers to the inserted values by a row alias (MySQL 8.0.20
+    and later). For a select statement the update clause refers to the
+    expressions of the select statement, which MySQL allows for
+    `INSERT ... SELECT`.
+    """
+
+    statement = mysql_insert(table_class)
+    if from_select is None:
+        statement = statement.values(values)
+        inserted = {name: statement.inserted[name] for name in update_columns}
+    else:
+        (names, query) = from_select
+        statement = statement.from_select(names, query)
+        selected = dict(zip(names, query.selected_columns))
+        inserted = {name: selected[name] for name in update_columns}
+
+    session.execute(statement.on_duplicate_key_update(inserted | update))
@@ -27,7 +27,8 @@ for interaction with the LangQC database.
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
-from lang_qc.db.helper.qc import get_seq_product
+from lang_qc.db.helper.dictionary import dictionary_ids
+from lang_qc.db.helper.qc import get_seq_product, in_batches
 from lang_qc.db.mlwh_schema import PacBioRunWellMetrics
 from lang_qc.db.qc_schema import SeqPlatform, SeqProduct, SubProduct, SubProductAttr
 
@@ -63,6 +64,56 @@ def well_seq_product_find_or_create(
     return well_product
 
 
+def wells_seq_products_find_or_create(
+    session: Session, mlwh_wells: list[PacBioRunWellMetrics]
+) -> dict[str, SeqProduct]:
+    """
+    A bulk version of the `well_seq_product_find_or_create` function.
+    Returns a dictionary of pre-existing or new `lang_qc.db.qc_schema.SeqProduct`
+    objects for PacBio wells with product IDs as keys.
+
+    Existing products are retrieved in batches, see
+    `lang_qc.db.helper.qc.in_batches`. New products are added to the
+    session and flushed, but not committed. Therefore, they can be
+    committed together with the QC states, which are assigned to them.
+
+    Arguments:
+        `session` - `sqlalchemy.orm.Session`, a connection for LangQC database.
+        `mlwh_wells` - a list of `lang_qc.db.mlwh_schema.PacBioRunWellMetrics`
+        row objects for the wells.
+    """
+
+    ids = [w.id_pac_bio_product for w in mlwh_wells]
+    well_products = {}
+    for ids_batch in in_batches(ids):
+        well_products.update(
+            {
+                p.id_product: p
+                for p in session.execute(
+                    select(SeqProduct).where(SeqProduct.id_product.in_(ids_batch))
+                ).scalars()
+            }
+        )
+
+    new_products = []
+    for mlwh_well in mlwh_wells:
+        id_product = mlwh_well.id_pac_bio_product
+        if id_product not in well_products:
+            well_products[id_product] = _new_well(
+                session,
+                id_product,
+                mlwh_well.pac_bio_run_name,
+                mlwh_well.well_label,
+                mlwh_well.plate_number,
+            )
+            new_products.append(well_products[id_product])
+    if len(new_products) != 0:
+        session.add_all(new_products)
+        session.flush()
+
+    return well_products
+
+
 def _create_well(
     session: Session,
     id_product: str,
@@ -71,31 +122,37 @@ def _create_well(
     plate_number: int = None,
 ) -> SeqProduct:
 
-    seq_platform = session.execute(
-        select(SeqPlatform).where(SeqPlatform.name == "PacBio")
-    ).scalar_one()
-    product_attr_rn = session.execute(
-        select(SubProductAttr).where(SubProductAttr.attr_name == "run_name")
-    ).scalar_one()
-    product_attr_wl = session.execute(
-        select(SubProductAttr).where(SubProductAttr.attr_name == "well_label")
-    ).scalar_one()
-    product_attr_pn = session.execute(
-        select(SubProductAttr).where(SubProductAttr.attr_name == "plate_number")
-    ).scalar_one()
+    well_product = _new_well(session, id_product, run_name, well_label, plate_number)
+    session.add(well_product)
+    session.commit()
+
+    return well_product
+
+
+def _new_well(
+    session: Session,
+    id_product: str,
+    run_name: str,
+    well_label: str,
+    plate_number: int = None,
+) -> SeqProduct:
+
+    # Dictionary values are assigned by their primary keys.
+    id_seq_platform = dictionary_ids(session, SeqPlatform)["PacBio"]
+    attr_ids = dictionary_ids(session, SubProductAttr)
 
     # TODO: in future for composite products we have to check whether any of
     # the `sub_product` table entries we are linking to already exist.
-    well_product = SeqProduct(
+    return SeqProduct(
         id_product=id_product,
-        seq_platform=seq_platform,
+        id_seq_platform=id_seq_platform,
         sub_products=[
             SubProduct(
-                sub_product_attr=product_attr_rn,
+                id_attr_one=attr_ids["run_name"],
                 value_attr_one=run_name,
-                sub_product_attr_=product_attr_wl,
+                id_attr_two=attr_ids["well_label"],
                 value_attr_two=well_label,
-                sub_product_attr__=product_attr_pn,
+                id_attr_three=attr_ids["plate_number"],
                 value_attr_three=str(plate_number)
                 if plate_number is not None
                 else None,
@@ -103,7 +160,3 @@ def _create_well(
             )
         ],
     )
-    session.add(well_product)
-    session.commit()
-
-    return well_product
@@ -19,25 +19,43 @@
 # You should have received a copy of the GNU General Public License along with
 # this program. If not, see <http://www.gnu.org/licenses/>.
 
+import hashlib
 import logging
 from datetime import date, datetime, timedelta
 from typing import ClassVar, List
 
 from pydantic import BaseModel, ConfigDict, Field
-from sqlalchemy import and_, or_, select
-from sqlalchemy.orm import Session
+from sqlalchemy import Column, ColumnElement, and_, false, func, or_, select
+from sqlalchemy.orm import Session, joinedload, selectinload
 
 from lang_qc.db.helper.qc import (
     get_qc_states_by_id_product_list,
     products_have_qc_state,
 )
-from lang_qc.db.mlwh_schema import PacBioRunWellMetrics
-from lang_qc.db.qc_schema import QcState, QcStateDict, QcType
-from lang_qc.models.pacbio.well import PacBioPagedWells, PacBioWellSummary
-from lang_qc.models.pager import PagedResponse
+from lang_qc.db.mlwh_schema import (
+    PacBioProductMetrics,
+    PacBioRun,
+    PacBioRunWellMetrics,
+    Sample,
+    Study,
+)
+from lang_qc.db.qc_schema import QcFlowStatus, QcState
+from lang_qc.models.pacbio.qc_data import QCDataWell
+from lang_qc.models.pacbio.well import (
+    PacBioPagedWells,
+    PacBioWellFull,
+    PacBioWellSummary,
+    get_column_mapping,
+)
+from lang_qc.models.pager import PagedResponse, decode_cursor, encode_cursor
 from lang_qc.models.qc_flow_status import QcFlowStatusEnum
 from lang_qc.models.qc_state import QcState as QcStateModel
-from lang_qc.util.errors import EmptyListOfRunNamesError, RunNotFoundError
+from lang_qc.util.cache import Cache, cached_models
+from lang_qc.util.errors import (
+    EmptyListOfRunNamesError,
+    InvalidCursorError,
+    RunNotFoundError,
+)
 from lang_qc.util.type_checksum import PacBioWellSHA256
 
 """
@@ -48,6 +66,179 @@ Here this type is used to mark a purely internal to the class variables.
 
 INBOX_LOOK_BACK_NUM_WEEKS = 12
 
+"""
+Sort keys for paged lists. Each sort key is a tuple of (column, descending)
+pairs, which is used both to order the rows and, for pages that are located
+by a cursor, to seek to the first row of the page. The last column of each
+sort key is the primary key, which guarantees that the order is total.
+
+QC states are sorted by the denormalised copies of their columns in the
+`qc_flow_status` table, the names of these columns are the same as in the
+`qc_state` table.
+"""
+QC_STATE_SORT_KEY = (
+    (QcFlowStatus.date_updated, True),
+    (QcFlowStatus.id_qc_state, True),
+)
+WELL_SORT_KEY = (
+    (PacBioRunWellMetrics.pac_bio_run_name, False),
+    (PacBioRunWellMetrics.plate_number, False),
+    (PacBioRunWellMetrics.well_label, False),
+    (PacBioRunWellMetrics.id_pac_bio_rw_metrics_tmp, False),
+)
+INBOX_WELL_SORT_KEY = ((PacBioRunWellMetrics.run_complete, False),) + WELL_SORT_KEY
+UPCOMING_WELL_SORT_KEY = ((PacBioRunWellMetrics.run_start, False),) + WELL_SORT_KEY
+
+
+"""
+Loader options for the well rows, which are used to create `PacBioWellSummary`
+objects. The product metrics rows for all wells are retrieved by one query,
+the LIMS and study rows are joined to it, thus avoiding a query per well.
+"""
+WELL_SUMMARY_LOADER_OPTIONS = (
+    selectinload(PacBioRunWellMetrics.pac_bio_product_metrics)
+    .joinedload(PacBioProductMetrics.pac_bio_run)
+    .joinedload(PacBioRun.study),
+)
+"""
+Loader options for the well rows, which are used to create models with full
+LIMS data for all libraries in the well, for example, `PacBioWellFull`,
+`PacBioWellLibraries` or `QCPoolMetrics`. The whole graph of the product
+metrics, LIMS, study and sample rows is retrieved by one query regardless
+of the number of libraries in the well.
+"""
+WELL_LIMS_LOADER_OPTIONS = (
+    selectinload(PacBioRunWellMetrics.pac_bio_product_metrics)
+    .joinedload(PacBioProductMetrics.pac_bio_run)
+    .options(joinedload(PacBioRun.study), joinedload(PacBioRun.sample)),
+)
+
+
+def order_by_clauses(sort_key: tuple) -> list:
+    """Returns a list of ORDER BY clauses for a sort key."""
+
+    return [column.desc() if desc else column.asc() for (column, desc) in sort_key]
+
+
+def seek_condition(sort_key: tuple, values: list):
+    """
+    Returns a condition that selects the rows, which follow the row with the
+    `values` of the `sort_key` columns in the order defined by the sort key.
+
+    The condition is expanded into a disjunction of conjunctions rather than
+    relying on a row value comparison so that mixed sort directions and NULL
+    values are handled correctly. In line with MySQL, NULL values are assumed
+    to come first in the ascending order and last in the descending order.
+    """
+
+    def _after(column, desc, value):
+        if value is None:
+            return false() if desc else column.is_not(None)
+        if desc:
+            return or_(column < value, column.is_(None))
+        return column > value
+
+    def _equal(column, value):
+        return column.is_(None) if value is None else column == value
+
+    conditions = []
+    for i, (column, desc) in enumerate(sort_key):
+        conditions.append(
+            and_(
+                *[_equal(c, values[j]) for j, (c, _) in enumerate(sort_key[:i])],
+                _after(column, desc, values[i]),
+            )
+        )
+    return or_(*conditions)
+
+
+def _row_checksum(*columns) -> ColumnElement:
+    """
+    Returns an expression for a checksum of the values of the columns in
+    a row. NULL values are replaced by empty strings, so that the position
+    of each value is preserved. `CRC32` and `CONCAT_WS` are MySQL functions.
+    """
+
+    return func.crc32(func.concat_ws("|", *[func.coalesce(c, "") for c in columns]))
+
+
+def _well_model_columns() -> tuple[Column, ...]:
+    """
+    Returns the columns of the well metrics table, from which the well
+    models are built, see `lang_qc.models.pacbio.well` and
+    `lang_qc.models.pacbio.qc_data`.
+    """
+
+    names = {attribute for (_, attribute) in get_column_mapping(PacBioWellFull)}
+    for plan in QCDataWell.field_plan():
+        names.update((plan.name,) + plan.columns)
+    # Columns, which are used by QCDataWell and QCPoolMetrics directly.
+    names.update(
+        (
+            "sl_hostname",
+            "sl_run_uuid",
+            "sl_ccs_uuid",
+            "demultiplex_mode",
+            "hifi_num_reads",
+        )
+    )
+    columns = PacBioRunWellMetrics.__table__.columns
+
+    return tuple(columns[name] for name in sorted(names) if name in columns)
+
+
+"""
+Columns, which are used to compute version tokens for wells, see
+`WellWh.get_mlwh_well_versions`. The well metrics, product metrics, study
+and sample tables do not record when their rows change, therefore changes
+are detected by checksums of the values, from which the models are built.
+The well row is represented by a checksum of its columns. Each product
+metrics row of the well, joined with its LIMS, study and sample rows, is
+represented by a checksum of a single row, so values, which move between
+products, change the token. The checksums of the products are combined
+by `BIT_XOR`, a MySQL aggregate function. Changes to the LIMS rows are
+detected by their timestamps.
+"""
+WELL_VERSION_COLUMNS = (
+    PacBioRunWellMetrics.id_pac_bio_product,
+    _row_checksum(*_well_model_columns()),
+    func.count(PacBioProductMetrics.id_pac_bio_pr_metrics_tmp),
+    func.bit_xor(
+        _row_checksum(
+            PacBioProductMetrics.id_pac_bio_product,
+            PacBioProductMetrics.id_pac_bio_tmp,
+            PacBioProductMetrics.qc,
+            PacBioProductMetrics.hifi_read_bases,
+            PacBioProductMetrics.hifi_num_reads,
+            PacBioProductMetrics.hifi_read_length_mean,
+            PacBioProductMetrics.barcode4deplexing,
+            PacBioProductMetrics.barcode_quality_score_mean,
+            PacBioProductMetrics.hifi_bases_percent,
+            PacBioRun.last_updated,
+            PacBioRun.recorded_at,
+            Study.id_study_lims,
+            Study.name,
+            Sample.id_sample_lims,
+            Sample.name,
+        )
+    ),
+)
+
+
+def well_version(mlwh_version: str, qc_state: QcStateModel | None = None) -> str:
+    """
+    Returns a version string for the models, which are built from the well
+    data and, optionally, the QC state of the well. The `mlwh_version`
+    argument is the version token of the well data, see
+    `WellWh.get_mlwh_well_versions`.
+    """
+
+    if qc_state is None:
+        return mlwh_version
+    digest = hashlib.sha256(qc_state.model_dump_json().encode()).hexdigest()
+
+    return f"{mlwh_version}:{digest[:32]}"
+
 
 class WellWh(BaseModel):
     """
@@ -65,18 +256,89 @@ class WellWh(BaseModel):
     # The TestClient seems to be keeping these instances alive and changing them.
 
     def get_mlwh_well_by_product_id(
-        self, id_product: PacBioWellSHA256
+        self, id_product: PacBioWellSHA256, with_lims_data: bool = False
     ) -> PacBioRunWellMetrics | None:
         """
         Returns a well row record from the well metrics table or
         None if the record does not exist.
+
+        If the optional `with_lims_data` argument is set to True, the
+        product metrics, LIMS, study and sample data for the well are
+        eagerly loaded, see `WELL_LIMS_LOADER_OPTIONS`.
         """
 
-        return self.session.execute(
-            select(PacBioRunWellMetrics).where(
-                PacBioRunWellMetrics.id_pac_bio_product == id_product,
-            )
-        ).scalar_one_or_none()
+        query = select(PacBioRunWellMetrics).where(
+            PacBioRunWellMetrics.id_pac_bio_product == id_product,
+        )
+        if with_lims_data is True:
+            query = query.options(*WELL_LIMS_LOADER_OPTIONS)
+
+        return self.session.execute(query).scalar_one_or_none()
+
+    def get_mlwh_wells_by_product_ids(
+        self, ids: List[PacBioWellSHA256], with_lims_data: bool = True
+    ) -> dict[PacBioWellSHA256, PacBioRunWellMetrics]:
+        """
+        Returns a dictionary of well row records from the well metrics table
+        with product IDs as keys. Product IDs, for which the records do not
+        exist, are omitted from the response. The response may be an empty
+        dictionary.
+
+        All records are retrieved by a single query. Unless the optional
+        `with_lims_data` argument is set to False, the product metrics,
+        LIMS and study data for the wells are eagerly loaded, see
+        `WELL_SUMMARY_LOADER_OPTIONS`.
+        """
+
+        if len(ids) == 0:
+            return {}
+
+        query = select(PacBioRunWellMetrics).where(
+            PacBioRunWellMetrics.id_pac_bio_product.in_(ids)
+        )
+        if with_lims_data is True:
+            query = query.options(*WELL_SUMMARY_LOADER_OPTIONS)
+        wells = self.session.execute(query).scalars().all()
+
+        return {w.id_pac_bio_product: w for w in wells}
+
+    def get_mlwh_well_versions(
+        self, ids: List[PacBioWellSHA256]
+    ) -> dict[PacBioWellSHA256, str]:
+        """
+        Returns a dictionary of version tokens for the wells with product IDs
+        as keys. Product IDs, for which the wells do not exist, are omitted
+        from the response.
+
+        The token changes when the columns of the well row, from which the
+        models are built, any of the product metrics rows of the well, the
+        LIMS rows linked to them or the names and LIMS IDs of the studies
+        and samples of these LIMS rows change, see `WELL_VERSION_COLUMNS`.
+        All tokens are computed by a single aggregate query, which returns
+        a few checksums per well. The query is much cheaper than retrieving
+        the wells with their LIMS data and can be used to check whether
+        models, which were built from these data, are up to date.
+        """
+
+        if len(ids) == 0:
+            return {}
+
+        query = (
+            select(*WELL_VERSION_COLUMNS)
+            .outerjoin(PacBioRunWellMetrics.pac_bio_product_metrics)
+            .outerjoin(PacBioProductMetrics.pac_bio_run)
+            .outerjoin(PacBioRun.study)
+            .outerjoin(PacBioRun.sample)
+            .where(PacBioRunWellMetrics.id_pac_bio_product.in_(ids))
+            .group_by(PacBioRunWellMetrics.id_pac_bio_rw_metrics_tmp)
+        )
+
+        return {
+            row.id_pac_bio_product: hashlib.sha256(
+                repr(tuple(row)).encode()
+            ).hexdigest()[:32]
+            for row in self.session.execute(query)
+        }
 
     def recent_completed_wells(self) -> List[PacBioRunWellMetrics]:
         """
@@ -85,6 +347,23 @@ class WellWh(BaseModel):
         last 12 weeks.
         """
 
+        return (
+            self.session.execute(self._recent_completed_wells_query()).scalars().all()
+        )
+
+    def get_wells_in_runs(self, run_names: List[str]) -> List[PacBioRunWellMetrics]:
+        """
+        Returns a potentially empty list of well records for runs with names
+        given by the run_names argument. Errors if the argument run_name is empty
+        or undefined.
+        """
+
+        return (
+            self.session.execute(self._wells_in_runs_query(run_names)).scalars().all()
+        )
+
+    def _recent_completed_wells_query(self):
+
         ######
         # It is important not to show aborted wells in the inbox.
         #
@@ -105,7 +384,7 @@ class WellWh(BaseModel):
 
         # TODO: fall back to run_complete when well_complete is undefined
 
-        query = (
+        return (
             select(PacBioRunWellMetrics)
             .where(PacBioRunWellMetrics.well_status == "Complete")
             .where(PacBioRunWellMetrics.qc_seq_state.is_(None))
@@ -122,36 +401,19 @@ class WellWh(BaseModel):
                     PacBioRunWellMetrics.ccs_execution_mode == "None",
                 )
             )
-            .order_by(
-                PacBioRunWellMetrics.run_complete,
-                PacBioRunWellMetrics.pac_bio_run_name,
-                PacBioRunWellMetrics.plate_number,
-                PacBioRunWellMetrics.well_label,
-            )
+            .order_by(*order_by_clauses(INBOX_WELL_SORT_KEY))
         )
 
-        return self.session.execute(query).scalars().all()
-
-    def get_wells_in_runs(self, run_names: List[str]) -> List[PacBioRunWellMetrics]:
-        """
-        Returns a potentially empty list of well records for runs with names
-        given by the run_names argument. Errors if the argument run_name is empty
-        or undefined.
-        """
+    def _wells_in_runs_query(self, run_names: List[str]):
 
         if len(run_names) == 0:
             raise EmptyListOfRunNamesError("List of run names cannot be empty.")
 
-        query = (
+        return (
             select(PacBioRunWellMetrics)
             .where(PacBioRunWellMetrics.pac_bio_run_name.in_(run_names))
-            .order_by(
-                PacBioRunWellMetrics.pac_bio_run_name,
-                PacBioRunWellMetrics.plate_number,
-                PacBioRunWellMetrics.well_label,
-            )
+            .order_by(*order_by_clauses(WELL_SORT_KEY))
         )
-        return self.session.execute(query).scalars().all()
 
 
 class PacBioPagedWellsFactory(WellWh, PagedResponse):
@@ -166,15 +428,22 @@ class PacBioPagedWellsFactory(WellWh, PagedResponse):
         title="SQLAlchemy Session",
         description="A SQLAlchemy Session for the LangQC database",
     )
+    cache: Cache | None = Field(
+        default=None,
+        title="Cache for well summaries",
+        description="""
+        An optional cache for `PacBioWellSummary` objects, see
+        `lang_qc.util.cache`. If set, the LIMS and study data are retrieved
+        from the ml warehouse only for the wells, which summaries are not
+        cached.
+        """,
+    )
 
     # For MySQL it's OK to use case-sensitive comparison operators since
     # its string comparisons for the collation we use are case-insensitive.
+    # Filters for the statuses, which are derived from the QC state, are
+    # not needed, these statuses are looked up in the qc_flow_status table.
     FILTERS: ClassVar = {
-        QcFlowStatusEnum.ON_HOLD.name: (QcStateDict.state.ilike("On hold%")),
-        QcFlowStatusEnum.QC_COMPLETE.name: (QcState.is_preliminary == 0),
-        QcFlowStatusEnum.IN_PROGRESS.name: and_(
-            QcState.is_preliminary == 1, QcStateDict.state.notilike("On hold%")
-        ),
         QcFlowStatusEnum.ABORTED.name: or_(
             PacBioRunWellMetrics.well_status.like("Abort%"),
             PacBioRunWellMetrics.well_status.like("Terminat%"),
@@ -193,8 +462,8 @@ class PacBioPagedWellsFactory(WellWh, PagedResponse):
     ) -> PacBioPagedWells:
         """
         Returns `PacBioPagedWells` object that corresponds to the criteria
-        specified by the `page_size`, `page_number` object's attributes and
-        `qc_flow_status` argument of this function..
+        specified by the `page_size`, `page_number` or `cursor` object's
+        attributes and `qc_flow_status` argument of this function..
 
         The `PacBioWellPacBioWell` objects in `wells` attribute of the returned object
         are sorted in a way appropriate for the requested `qc_flow_status`.
@@ -204,12 +473,14 @@ class PacBioPagedWellsFactory(WellWh, PagedResponse):
         inbox wells looks at runs which completed within the last four weeks.
         For the 'aborted' and 'unknown' queries the wells are sorted in the
         run name alphabetical order.
+
+        `InvalidCursorError` is raised if the `cursor` attribute is set, but
+        does not correspond to the requested `qc_flow_status`.
         """
 
         wells = []
         if qc_flow_status == QcFlowStatusEnum.INBOX:
-            recent_wells = self.recent_completed_wells()
-            wells = self._recent_inbox_wells(recent_wells)
+            wells = self._recent_inbox_wells()
         elif qc_flow_status in [
             QcFlowStatusEnum.ABORTED,
             QcFlowStatusEnum.UNKNOWN,
@@ -220,65 +491,63 @@ class PacBioPagedWellsFactory(WellWh, PagedResponse):
         else:
             wells = self._get_wells_for_status(qc_flow_status)
 
-        return PacBioPagedWells(
-            page_number=self.page_number,
-            page_size=self.page_size,
-            total_number_of_items=self.total_number_of_items,
-            wells=wells,
-        )
+        return self._paged_wells(wells)
 
     def create_for_run(self, run_name: str) -> PacBioPagedWells:
         """
         Returns `PacBioPagedWells` object that corresponds to the criteria
-        specified by the `page_size` and `page_number` attributes.
+        specified by the `page_size` and `page_number` or `cursor` attributes.
         The `PacBioWellSummary` objects in `wells` attribute of the returned object
         belong to runs specified by the `run_name` argument and are sorted
         by the run name and well label.
         """
 
-        wells = self.get_wells_in_runs([run_name])
-        total_number_of_wells = len(wells)
-        if total_number_of_wells == 0:
+        query = self._wells_in_runs_query([run_name]).options(
+            *self._summary_loader_options()
+        )
+        wells = self._fetch_page(self.session, query, WELL_SORT_KEY, f"run:{run_name}")
+        self.total_number_of_items = self._count(self.session, query)
+        qc_states = self._seq_qc_states(wells)
+        if self.total_number_of_items == 0:
             raise RunNotFoundError(f"Metrics data for run '{run_name}' is not found")
 
-        wells = self.slice_data(wells)
+        return self._paged_wells(self._well_models(wells, qc_states))
+
+    def _paged_wells(self, wells: List[PacBioWellSummary]) -> PacBioPagedWells:
+
         return PacBioPagedWells(
-            page_number=self.page_number,
+            # The page number is not used if the page is located by the cursor.
+            page_number=None if self.cursor is not None else self.page_number,
             page_size=self.page_size,
-            total_number_of_items=total_number_of_wells,
-            wells=self._well_models(wells),
+            total_number_of_items=self.total_number_of_items,
+            cursor=self.cursor,
+            next_cursor=self.next_cursor,
+            wells=wells,
         )
 
     def _build_query4status(self, qc_flow_status: QcFlowStatusEnum):
 
         # TODO: add filtering by the seq platform
 
-        # Build the common part of the query.
+        # The qc_flow_status table has a row for each sequencing QC state.
+        # The rows for a particular status are selected by a range scan of
+        # the index on the status and the date the QC state was assigned.
         # Sort by the date the current QC state was assigned, latest first.
-        query = (
+        # The primary key is used as a tie-breaker so that the order is
+        # deterministic and pages, which are selected by the database,
+        # do not overlap.
+        return (
             select(QcState)
-            .join(QcType)
-            .join(QcStateDict)
-            .where(QcType.qc_type == "sequencing")
-            .order_by(QcState.date_updated.desc())
-        )
-        # Add status-specific part of the query.
-        return query.where(self.FILTERS[qc_flow_status.name])
-
-    def _retrieve_paged_qc_states(
-        self, qc_flow_status: QcFlowStatusEnum
-    ) -> List[QcState]:
-
-        states = (
-            self.qcdb_session.execute(self._build_query4status(qc_flow_status))
-            .scalars()
-            .all()
+            .join(QcState.qc_flow_status)
+            .where(QcFlowStatus.qc_flow_status == qc_flow_status.value)
+            .order_by(*order_by_clauses(QC_STATE_SORT_KEY))
+            .options(
+                selectinload(QcState.seq_product),
+                selectinload(QcState.qc_type),
+                selectinload(QcState.user),
+                selectinload(QcState.qc_state_dict),
+            )
         )
-        # Save the number of retrieved rows - needed to page correctly,
-        # also needed by the client to correctly set up the paging widget.
-        self.total_number_of_items = len(states)
-        # Return the states for the wells we were asked to fetch, max - page_size, min - 0.
-        return self.slice_data(states)
 
     def _get_wells_for_status(
         self, qc_flow_status: QcFlowStatusEnum
@@ -286,13 +555,29 @@ class PacBioPagedWellsFactory(WellWh, PagedResponse):
 
         wells = []
 
-        for qc_state_db in self._retrieve_paged_qc_states(qc_flow_status):
-            qc_state_model = QcStateModel.from_orm(qc_state_db)
+        query = self._build_query4status(qc_flow_status)
+        # Retrieve the states for the wells we were asked to fetch, max - page_size,
+        # min - 0. Only the rows for the requested page are retrieved from the
+        # database.
+        qc_states = [
+            QcStateModel.from_orm(qc_state_db)
+            for qc_state_db in self._fetch_page(
+                self.qcdb_session, query, QC_STATE_SORT_KEY, qc_flow_status.name
+            )
+        ]
+        # Save the number of matching rows - needed by the client to correctly
+        # set up the paging widget. Retrieve all wells for this page in one go.
+        self.total_number_of_items = self._count(self.qcdb_session, query)
+        mlwh_wells = self.get_mlwh_wells_by_product_ids(
+            [qc_state_model.id_product for qc_state_model in qc_states],
+            with_lims_data=self.cache is None,
+        )
+
+        for qc_state_model in qc_states:
             id_product = qc_state_model.id_product
-            mlwh_well = self.get_mlwh_well_by_product_id(id_product=id_product)
+            mlwh_well = mlwh_wells.get(id_product)
             if mlwh_well is not None:
-                pbw = PacBioWellSummary(db_well=mlwh_well, qc_state=qc_state_model)
-                wells.append(pbw)
+                wells.append(mlwh_well)
             else:
                 """
                 Cannot display this QC state. In production we are unlikely to
@@ -302,7 +587,13 @@ class PacBioPagedWellsFactory(WellWh, PagedResponse):
                 """
                 logging.warning(f"No mlwh record for product ID '{id_product}'")
 
-        return wells
+        return self._well_models(
+            wells,
+            {
+                qc_state_model.id_product: [qc_state_model]
+                for qc_state_model in qc_states
+            },
+        )
 
     def _upcoming_wells(self):
         """
@@ -311,9 +602,13 @@ class PacBioPagedWellsFactory(WellWh, PagedResponse):
         as wells that belong to runs that started within the last 12 weeks.
         """
 
-        recent_completed_product_ids = [
-            w.id_pac_bio_product for w in self.recent_completed_wells()
-        ]
+        # Product IDs of recent completed wells are selected by a subquery,
+        # the wells themselves are not retrieved.
+        recent_completed_product_ids = (
+            self._recent_completed_wells_query()
+            .with_only_columns(PacBioRunWellMetrics.id_pac_bio_product)
+            .order_by(None)
+        )
 
         my_date = date.today() - timedelta(weeks=INBOX_LOOK_BACK_NUM_WEEKS)
         look_back_min_date = datetime(my_date.year, my_date.month, my_date.day)
@@ -336,80 +631,266 @@ class PacBioPagedWellsFactory(WellWh, PagedResponse):
             .where(PacBioRunWellMetrics.well_status.not_like("Fail%"))
             .where(PacBioRunWellMetrics.well_status.not_like("Error%"))
             .where(PacBioRunWellMetrics.well_status.not_in(["Unknown", "On hold"]))
-            .order_by(
-                PacBioRunWellMetrics.run_start,
-                PacBioRunWellMetrics.pac_bio_run_name,
-                PacBioRunWellMetrics.plate_number,
-                PacBioRunWellMetrics.well_label,
+            .order_by(*order_by_clauses(UPCOMING_WELL_SORT_KEY))
+        )
+
+        return self._page_wells_without_seq_qc_state(
+            query, UPCOMING_WELL_SORT_KEY, QcFlowStatusEnum.UPCOMING.name
+        )
+
+    def _recent_inbox_wells(self):
+
+        return self._page_wells_without_seq_qc_state(
+            self._recent_completed_wells_query(),
+            INBOX_WELL_SORT_KEY,
+            QcFlowStatusEnum.INBOX.name,
+        )
+
+    def _aborted_and_unknown_wells(self, qc_flow_status: QcFlowStatusEnum):
+
+        query = (
+            select(PacBioRunWellMetrics)
+            .where(self.FILTERS[qc_flow_status.name])
+            .order_by(*order_by_clauses(WELL_SORT_KEY))
+            .options(*self._summary_loader_options())
+        )
+
+        if qc_flow_status == QcFlowStatusEnum.UNKNOWN:
+            return self._page_wells_without_seq_qc_state(
+                query, WELL_SORT_KEY, qc_flow_status.name
             )
+
+        wells = self._fetch_page(
+            self.session, query, WELL_SORT_KEY, qc_flow_status.name
         )
+        self.total_number_of_items = self._count(self.session, query)
+        qc_states = self._seq_qc_states(wells)
 
-        recent_wells = self.session.execute(query).scalars().all()
-        wells = self._wells_without_seq_qc_state(recent_wells)
-        self.total_number_of_items = len(wells)  # Save the number of retrieved wells.
+        return self._well_models(wells, qc_states)
 
-        return self._well_models(self.slice_data(wells))
+    def _count(self, session: Session, query) -> int:
+        """
+        Returns the number of rows the query would have returned.
+        """
 
-    def _recent_inbox_wells(self, recent_wells):
+        # Ordering is irrelevant for counting.
+        return session.execute(
+            select(func.count()).select_from(query.order_by(None).subquery())
+        ).scalar_one()
 
-        wells = self._wells_without_seq_qc_state(recent_wells)
-        self.total_number_of_items = len(wells)
+    def _fetch_page(self, session: Session, query, sort_key: tuple, name: str):
+        """
+        Retrieves from the database and returns a list of rows for the page
+        specified by either the `cursor` or `page_number` attribute. Sets
+        the `next_cursor` attribute.
 
-        return self._well_models(self.slice_data(wells))
+        The `query` should be ordered according to the `sort_key`. The `name`
+        argument identifies the list that is being paged, it is embedded into
+        the cursor so that a cursor for one list cannot be used for another.
+        """
 
-    def _aborted_and_unknown_wells(self, qc_flow_status: QcFlowStatusEnum):
+        if self.cursor is not None:
+            query = query.where(
+                seek_condition(sort_key, self._cursor_values(sort_key, name))
+            )
+        else:
+            query = query.offset(self.offset())
+        # Retrieve one extra row to find out whether the next page exists.
+        rows = session.execute(query.limit(self.page_size + 1)).scalars().all()
+        self._set_next_cursor(rows, sort_key, name)
+
+        page_size = self.page_size
+        return rows[:page_size]
+
+    def _page_wells_without_seq_qc_state(self, query, sort_key: tuple, name: str):
+        """
+        Returns a list of well summaries for the page specified by either
+        the `cursor` or `page_number` attribute. Wells, which have sequencing QC state in
+        the LangQC database, are excluded. Sets the `total_number_of_items`
+        and `next_cursor` attributes.
+
+        Since the wells are filtered using data from a different database,
+        all wells selected by the query have to be examined. To keep memory
+        footprint and data transfer low, only the product IDs and sort key
+        values are retrieved for all wells. The LangQC database is queried in
+        batches of product IDs. Full well records are retrieved only for
+        the wells on the requested page, the QC states of these wells are
+        retrieved at the same time.
+        """
 
-        wells = (
-            self.session.execute(
-                select(PacBioRunWellMetrics)
-                .where(self.FILTERS[qc_flow_status.name])
-                .order_by(
-                    PacBioRunWellMetrics.pac_bio_run_name,
-                    PacBioRunWellMetrics.plate_number,
-                    PacBioRunWellMetrics.well_label,
+        key_columns = [PacBioRunWellMetrics.id_pac_bio_product] + [
+            column for (column, _) in sort_key
+        ]
+        if self.cursor is not None:
+            # Let the database find out which wells follow the cursor.
+            key_columns.append(
+                seek_condition(sort_key, self._cursor_values(sort_key, name)).label(
+                    "following"
                 )
             )
-            .scalars()
-            .all()
+        keys = self.session.execute(query.with_only_columns(*key_columns)).all()
+
+        ids_with_qc_state = self._products_with_seq_qc_state(
+            [k.id_pac_bio_product for k in keys]
         )
+        keys = [k for k in keys if k.id_pac_bio_product not in ids_with_qc_state]
+        # Save the number of retrieved wells.
+        self.total_number_of_items = len(keys)
 
-        if qc_flow_status == QcFlowStatusEnum.UNKNOWN:
-            wells = self._wells_without_seq_qc_state(wells)
-        self.total_number_of_items = len(wells)
+        if self.cursor is None:
+            page_start = self.offset()
+        else:
+            page_start = next(
+                (i for (i, k) in enumerate(keys) if k.following), len(keys)
+            )
 
-        return self._well_models(self.slice_data(wells))
+        page_size = self.page_size
+        # Include one extra well, if available, to find out whether the next
+        # page exists.
+        page_end = page_start + page_size + 1
+        page_keys = keys[page_start:page_end]
+        self._set_next_cursor(page_keys, sort_key, name)
+        page_ids = [k.id_pac_bio_product for k in page_keys[:page_size]]
 
-    def _well_models(
-        self,
-        db_wells_list: List[PacBioRunWellMetrics],
-    ):
+        wells = self.get_mlwh_wells_by_product_ids(
+            page_ids, with_lims_data=self.cache is None
+        )
+        qc_states = get_qc_states_by_id_product_list(
+            session=self.qcdb_session, ids=page_ids, sequencing_outcomes_only=True
+        )
+        return self._well_models(
+            [wells[id] for id in page_ids if id in wells], qc_states
+        )
+
+    def _cursor_values(self, sort_key: tuple, name: str) -> list:
+        """
+        Decodes the `cursor` attribute and returns a list of values for
+        the sort key columns. Raises `InvalidCursorError` if the cursor
+        does not match the list identified by the `name` argument or if
+        any of the values does not match the type of its column. NULL
+        values are only accepted for nullable columns.
+        """
+
+        def _value(column, value):
+            if value is None:
+                if not column.nullable:
+                    raise ValueError(f"NULL value for {column.key}")
+                return None
+            python_type = column.type.python_type
+            if python_type is datetime and isinstance(value, str):
+                value = datetime.fromisoformat(value)
+            # JSON booleans are Python integers.
+            if not isinstance(value, python_type) or (
+                isinstance(value, bool) and python_type is not bool
+            ):
+                raise TypeError(f"Invalid value for {column.key}")
+            return value
+
+        values = decode_cursor(self.cursor)
+        if len(values) != len(sort_key) + 1 or values[0] != name:
+            raise InvalidCursorError(f"Cursor '{self.cursor}' does not match the data")
+        try:
+            return [
+                _value(column, value)
+                for ((column, _), value) in zip(sort_key, values[1:])
+            ]
+        except (TypeError, ValueError):
+            raise InvalidCursorError(f"Cursor '{self.cursor}' does not match the data")
+
+    def _set_next_cursor(self, rows: list, sort_key: tuple, name: str):
+        """
+        Given a list of rows, which might contain one row more than the page
+        size, sets the `next_cursor` attribute to point to the position after
+        the last row of the page. If the list has no extra row, the next page
+        does not exist and the `next_cursor` attribute is set to None.
+        """
+
+        self.next_cursor = None
+        if len(rows) > self.page_size:
+            last_row = rows[self.page_size - 1]
+            self.next_cursor = encode_cursor(
+                [name] + [getattr(last_row, column.key) for (column, _) in sort_key]
+            )
+
+    def _seq_qc_states(
+        self, db_wells_list: List[PacBioRunWellMetrics]
+    ) -> dict[PacBioWellSHA256, list[QcStateModel]]:
+        """
+        Returns sequencing QC states for the wells, see
+        `get_qc_states_by_id_product_list`.
+        """
 
-        qced_products = get_qc_states_by_id_product_list(
+        return get_qc_states_by_id_product_list(
             session=self.qcdb_session,
             ids=[db_well.id_pac_bio_product for db_well in db_wells_list],
             sequencing_outcomes_only=True,
         )
-        pb_wells = []
-        for db_well in db_wells_list:
-            id_product = db_well.id_pac_bio_product
-            qc_state = None
-            if id_product in qced_products:
-                qc_state = qced_products[id_product][0]
-            pb_well = PacBioWellSummary(db_well=db_well, qc_state=qc_state)
-            pb_wells.append(pb_well)
-
-        return pb_wells
-
-    def _wells_without_seq_qc_state(
+
+    def _well_models(
         self,
         db_wells_list: List[PacBioRunWellMetrics],
+        qced_products: dict[PacBioWellSHA256, list[QcStateModel]],
     ):
+        def qc_state(id_product):
+            qc_states = qced_products.get(id_product)
+            return None if qc_states is None else qc_states[0]
+
+        if self.cache is None:
+            return [
+                PacBioWellSummary(
+                    db_well=db_well, qc_state=qc_state(db_well.id_pac_bio_product)
+                )
+                for db_well in db_wells_list
+            ]
 
-        ids_with_qc_state = products_have_qc_state(
-            session=self.qcdb_session,
-            ids=[w.id_pac_bio_product for w in db_wells_list],
-            sequencing_outcomes_only=True,
+        db_wells = {db_well.id_pac_bio_product: db_well for db_well in db_wells_list}
+
+        def build(ids: List[PacBioWellSHA256]) -> dict:
+            # The wells were retrieved without LIMS data.
+            self.get_mlwh_wells_by_product_ids(ids)
+            return {
+                id_product: PacBioWellSummary(
+                    db_well=db_wells[id_product], qc_state=qc_state(id_product)
+                )
+                for id_product in ids
+            }
+
+        summaries = cached_models(
+            self.cache,
+            PacBioWellSummary,
+            {
+                id_product: well_version(version, qc_state(id_product))
+                for (id_product, version) in self.get_mlwh_well_versions(
+                    list(db_wells)
+                ).items()
+            },
+            build,
         )
+
         return [
-            w for w in db_wells_list if w.id_pac_bio_product not in ids_with_qc_state
+            summaries[db_well.id_pac_bio_product]
+            for db_well in db_wells_list
+            if db_well.id_pac_bio_product in summaries
         ]
+
+    def _summary_loader_options(self) -> tuple:
+        """
+        Returns loader options for the well rows, which are used to create
+        well summaries. If the summaries are cached, the LIMS and study data
+        are not loaded with the wells, see `_well_models`.
+        """
+
+        return WELL_SUMMARY_LOADER_OPTIONS if self.cache is None else ()
+
+    def _products_with_seq_qc_state(
+        self, ids: List[PacBioWellSHA256]
+    ) -> set[PacBioWellSHA256]:
+        """
+        Returns a subset of the argument product IDs, which have sequencing
+        QC state assigned. The LangQC database is queried in batches of
+        product IDs.
+        """
+
+        return products_have_qc_state(
+            session=self.qcdb_session, ids=ids, sequencing_outcomes_only=True
+        )
@@ -19,30 +19,106 @@
 # You should have received a copy of the GNU General Public License along with
 # this program. If not, see <http://www.gnu.org/licenses/>.
 
-import os
-
-from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from sqlalchemy.orm import Session, sessionmaker
 
+from lang_qc.db.pool import create_engines
+from lang_qc.db.replicas import (
+    EngineRouter,
+    ReplicatedConnectionSettings,
+    routed_session,
+)
+from lang_qc.util.metrics import instrument_engine
+from lang_qc.util.query_log import track_queries
+
 engine = None
 session_factory = None
+async_engine = None
+async_session_factory = None
+router = None
+async_router = None
+
+
+def init_engines():
+    """
+    Creates synchronous and asynchronous engines and session factories for
+    the ml warehouse database. Connection and pool settings are read from the
+    environment variables with the DB_ prefix, see `lang_qc.db.pool`.
+
+    If the DB_REPLICA_URLS environment variable is set, engines are also
+    created for each of the read replicas listed in it. Sessions are routed
+    to the replicas, see `lang_qc.db.replicas`.
+
+    Called when the application starts. Otherwise, the engines are created
+    when a session is requested for the first time.
+    """
+
+    global engine, session_factory, async_engine, async_session_factory
+    global router, async_router
+
+    settings = ReplicatedConnectionSettings(_env_prefix="DB_")
+    if settings.url is None or settings.url == "":
+        raise Exception("ENV['DB_URL'] must be set with a database URL")
+    (engine, async_engine) = create_engines("mlwh", settings)
+
+    replicas = []
+    async_replicas = []
+    for (i, url) in enumerate(settings.replica_url_list(), start=1):
+        name = f"mlwh_replica{i}"
+        (replica, async_replica) = create_engines(
+            name, settings.model_copy(update={"url": url})
+        )
+        replicas.append((name, replica))
+        async_replicas.append((f"{name}_async", async_replica))
+
+    for (_, mlwh_engine) in [("mlwh", engine)] + replicas:
+        instrument_engine(mlwh_engine, "mlwh")
+        track_queries(mlwh_engine, "mlwh")
+    for (_, mlwh_engine) in [("mlwh_async", async_engine)] + async_replicas:
+        instrument_engine(mlwh_engine.sync_engine, "mlwh")
+        track_queries(mlwh_engine.sync_engine, "mlwh")
+
+    router = EngineRouter(("mlwh", engine), replicas, settings.replica_routing)
+    async_router = EngineRouter(
+        ("mlwh_async", async_engine), async_replicas, settings.replica_routing
+    )
+    session_factory = sessionmaker(engine)
+    async_session_factory = async_sessionmaker(async_engine)
+
+
+async def dispose_engines():
+    """Closes all pooled connections of the ml warehouse database engines"""
+
+    global engine, session_factory, async_engine, async_session_factory
+    global router, async_router
+
+    if engine is not None:
+        for (_, sync_engine) in [router.primary] + router.replicas:
+            sync_engine.dispose()
+        for (_, an_async_engine) in [async_router.primary] + async_router.replicas:
+            await an_async_engine.dispose()
+    engine = session_factory = async_engine = async_session_factory = None
+    router = async_router = None
 
 
 def get_mlwh_db() -> Session:
     """Get MLWH DB connection"""
 
-    global engine, session_factory
-    if engine is None:
-        url = os.environ.get("DB_URL")
-        if url is None or url == "":
-            raise Exception("ENV['DB_URL'] must be set with a database URL")
-        engine = create_engine(url, pool_recycle=3600)
-
     if session_factory is None:
-        session_factory = sessionmaker(engine)
+        init_engines()
 
-    db = session_factory()
+    db = routed_session(router, session_factory)
     try:
         yield db
     finally:
         db.close()
+
+
+async def get_async_mlwh_db() -> AsyncSession:
+    """Get MLWH DB connection for asynchronous operations"""
+
+    if async_session_factory is None:
+        init_engines()
+
+    async with routed_session(async_router, async_session_factory) as db:
+        yield db
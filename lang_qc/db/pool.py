@@ -0,0 +1,266 @@
+# Copyright (c) 2026 Genome Research Ltd.
+#
+# This file is part of npg_langqc.
+#
+# npg_langqc is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation; either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program. If not, see <http://www.gnu.org/licenses/>.
+
+import functools
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from pydantic import Field
+from pydantic_settings import BaseSettings
+from sqlalchemy import Engine, create_engine, event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from lang_qc.db.async_connection import create_async_db_engine
+
+"""
+Database engines with configurable connection pools and metrics for these
+pools.
+
+Connection settings are read from the environment. Each database has its
+own prefix for the names of environment variables, for example, DB_ for
+the ml warehouse and QCDB_ for the LangQC database. With the DB_ prefix,
+the database URL is set by the DB_URL variable, the pool size - by the
+DB_POOL_SIZE variable, etc., see `ConnectionSettings` for the full list.
+The same settings apply to both the synchronous and the asynchronous
+engine for a database.
+"""
+
+
+class ConnectionSettings(BaseSettings):
+    """
+    Database connection and connection pool settings. The environment
+    variable prefix should be given when creating an instance of this
+    class, for example, `ConnectionSettings(_env_prefix="QCDB_")`.
+    """
+
+    url: str | None = Field(default=None, title="Database URL")
+    pool_size: int = Field(
+        default=5,
+        ge=1,
+        title="The number of connections to keep open in the pool",
+    )
+    pool_max_overflow: int = Field(
+        default=10,
+        ge=0,
+        title="The number of connections that can be opened above the pool size",
+    )
+    pool_timeout: float = Field(
+        default=30,
+        gt=0,
+        title="The number of seconds to wait for a connection from the pool",
+        description="""
+        The number of seconds to wait for a connection to become available
+        when all connections are in use, after which an error is raised.
+        """,
+    )
+    pool_recycle: int = Field(
+        default=3600,
+        title="The number of seconds after which a connection is replaced",
+    )
+    pool_pre_ping: bool = Field(
+        default=False,
+        title="Test connections for liveness when they are checked out",
+    )
+    pool_wait_warning: float = Field(
+        default=1,
+        ge=0,
+        title="Checkout time in seconds, above which a warning is logged",
+    )
+    statement_timeout: int | None = Field(
+        default=None,
+        gt=0,
+        title="Statement timeout in milliseconds",
+        description="""
+        Maximum execution time in milliseconds for SELECT statements. Only
+        MySQL databases are supported. By default, no timeout is set.
+        """,
+    )
+
+
+class PoolMetrics:
+    """
+    Collects checkout metrics for a connection pool of a database engine.
+
+    The time it takes to check out a connection from the pool is measured
+    by wrapping the `connect` method of the pool. Connections are checked
+    out when a session is first used rather than when it is created.
+    Checkouts, which take longer than `pool_wait_warning` seconds or fail
+    because the pool is exhausted, are logged.
+    """
+
+    def __init__(self, name: str, engine: Engine, settings: ConnectionSettings):
+
+        self.name = name
+        self.pool = engine.pool
+        self.wait_warning = settings.pool_wait_warning
+
+        self.checkouts = 0
+        self.connections = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self._lock = threading.Lock()
+
+        event.listen(self.pool, "connect", self._on_connect)
+        event.listen(self.pool, "checkout", self._on_checkout)
+        event.listen(self.pool, "invalidate", self._on_invalidate)
+
+        connect = self.pool.connect
+
+        @functools.wraps(connect)
+        def timed_connect():
+            with self._timed_checkout():
+                return connect()
+
+        self.pool.connect = timed_connect
+
+    @contextmanager
+    def _timed_checkout(self):
+        """
+        A context manager for acquiring a connection from the pool. Records
+        the time it took to acquire the connection.
+        """
+
+        start = time.perf_counter()
+        try:
+            yield
+        except PoolTimeoutError:
+            with self._lock:
+                self.timeouts += 1
+            logging.warning(
+                f"Connection pool for {self.name} is exhausted: {self.status()}"
+            )
+            raise
+
+        wait = time.perf_counter() - start
+        with self._lock:
+            self.wait_seconds_total += wait
+            self.wait_seconds_max = max(self.wait_seconds_max, wait)
+        if wait > self.wait_warning:
+            logging.warning(
+                f"Connection checkout for {self.name} took {wait:.3f} seconds: "
+                f"{self.status()}"
+            )
+
+    def status(self) -> dict[str, int | float]:
+        """
+        Returns a dictionary with the current state of the pool and
+        the cumulative checkout metrics.
+        """
+
+        status = {}
+        # Pools, which do not keep connections, for example, NullPool,
+        # do not report their state.
+        for attr in ("size", "checkedin", "checkedout", "overflow"):
+            if hasattr(self.pool, attr):
+                status[attr] = getattr(self.pool, attr)()
+        with self._lock:
+            status.update(
+                {
+                    "checkouts": self.checkouts,
+                    "connections": self.connections,
+                    "invalidations": self.invalidations,
+                    "timeouts": self.timeouts,
+                    "wait_seconds_total": self.wait_seconds_total,
+                    "wait_seconds_max": self.wait_seconds_max,
+                }
+            )
+
+        return status
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.connections += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        with self._lock:
+            self.checkouts += 1
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception):
+        with self._lock:
+            self.invalidations += 1
+
+
+"""
+Metrics for the connection pools of all engines created by this module,
+keyed by the name of the engine.
+"""
+POOL_METRICS: dict[str, PoolMetrics] = {}
+
+
+def engine_options(settings: ConnectionSettings) -> dict:
+    """
+    Returns the keyword arguments for creating an engine with the connection
+    pool configured according to the settings.
+    """
+
+    return {
+        "pool_size": settings.pool_size,
+        "max_overflow": settings.pool_max_overflow,
+        "pool_timeout": settings.pool_timeout,
+        "pool_recycle": settings.pool_recycle,
+        "pool_pre_ping": settings.pool_pre_ping,
+    }
+
+
+def create_engines(
+    name: str, settings: ConnectionSettings
+) -> tuple[Engine, AsyncEngine]:
+    """
+    Creates and returns a synchronous and an asynchronous engine for the
+    database. Registers metrics for the connection pools of the engines
+    under the given name and the name with the `_async` suffix.
+    """
+
+    options = engine_options(settings)
+    engine = create_engine(settings.url, **options)
+    _configure(name, engine, settings)
+    async_engine = create_async_db_engine(settings.url, **options)
+    _configure(f"{name}_async", async_engine.sync_engine, settings)
+
+    return (engine, async_engine)
+
+
+def pool_status() -> dict[str, dict[str, int | float]]:
+    """
+    Returns the state and checkout metrics of all connection pools.
+    """
+
+    return {name: metrics.status() for (name, metrics) in POOL_METRICS.items()}
+
+
+def _configure(name: str, engine: Engine, settings: ConnectionSettings):
+
+    POOL_METRICS[name] = PoolMetrics(name, engine, settings)
+
+    if settings.statement_timeout is not None:
+        if engine.dialect.name != "mysql":
+            logging.warning(
+                f"Statement timeout is not supported for {engine.dialect.name}"
+            )
+        else:
+            timeout = settings.statement_timeout
+
+            @event.listens_for(engine, "connect")
+            def set_statement_timeout(dbapi_connection, connection_record):
+                cursor = dbapi_connection.cursor()
+                cursor.execute(f"SET SESSION max_execution_time = {timeout}")
+                cursor.close()
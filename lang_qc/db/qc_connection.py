@@ -19,31 +19,85 @@
 # You should have received a copy of the GNU General Public License along with
 # this program. If not, see <http://www.gnu.org/licenses/>.
 
-import os
+from contextlib import AbstractContextManager, contextmanager
+from typing import Callable
 
-from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from sqlalchemy.orm import Session, sessionmaker
 
+from lang_qc.db.pool import ConnectionSettings, create_engines
+from lang_qc.util.metrics import instrument_engine
+from lang_qc.util.query_log import track_queries
+
 engine = None
 session_factory = None
+async_engine = None
+async_session_factory = None
 
 
-def get_qc_db() -> Session:
-    """Get QC DB connection"""
+def init_engines():
+    """
+    Creates synchronous and asynchronous engines and session factories for
+    the LangQC database. Connection and pool settings are read from the
+    environment variables with the QCDB_ prefix, see `lang_qc.db.pool`.
+
+    Called when the application starts. Otherwise, the engines are created
+    when a session is requested for the first time.
+    """
+
+    global engine, session_factory, async_engine, async_session_factory
+
+    settings = ConnectionSettings(_env_prefix="QCDB_")
+    if settings.url is None or settings.url == "":
+        raise Exception("ENV['QCDB_URL'] must be set with a database URL")
+    (engine, async_engine) = create_engines("qcdb", settings)
+    for qcdb_engine in (engine, async_engine.sync_engine):
+        instrument_engine(qcdb_engine, "qcdb")
+        track_queries(qcdb_engine, "qcdb")
+    session_factory = sessionmaker(engine)
+    async_session_factory = async_sessionmaker(async_engine)
+
+
+async def dispose_engines():
+    """Closes all pooled connections of the LangQC database engines"""
+
+    global engine, session_factory, async_engine, async_session_factory
+
+    if engine is not None:
+        engine.dispose()
+        await async_engine.dispose()
+    engine = session_factory = async_engine = async_session_factory = None
 
-    global engine, session_factory
 
-    if engine is None:
-        url = os.environ.get("QCDB_URL")
-        if url is None or url == "":
-            raise Exception("ENV['QCDB_URL'] must be set with a database URL")
-        engine = create_engine(url, pool_recycle=3600)
+def get_qc_db() -> Session:
+    """Get QC DB connection"""
 
     if session_factory is None:
-        session_factory = sessionmaker(engine)
+        init_engines()
 
     db = session_factory()
     try:
         yield db
     finally:
         db.close()
+
+
+def get_qc_db_opener() -> Callable[[], AbstractContextManager[Session]]:
+    """
+    Get a function, which opens a QC DB connection as a context manager.
+    For endpoints, which use the connection after they return, for example,
+    while a streaming response is sent. Dependencies with `yield`, like
+    `get_qc_db`, might be closed before the response is sent.
+    """
+
+    return contextmanager(get_qc_db)
+
+
+async def get_async_qc_db() -> AsyncSession:
+    """Get QC DB connection for asynchronous operations"""
+
+    if async_session_factory is None:
+        init_engines()
+
+    async with async_session_factory() as db:
+        yield db
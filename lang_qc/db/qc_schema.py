@@ -281,6 +281,9 @@ class QcState(Base):
     qc_type = relationship("QcType", back_populates="qc_state")
     seq_product = relationship("SeqProduct", back_populates="qc_state")
     user = relationship("User", back_populates="qc_state", uselist=False)
+    qc_flow_status = relationship(
+        "QcFlowStatus", back_populates="qc_state", uselist=False
+    )
 
 
 class QcStateHist(Base):
@@ -322,3 +325,40 @@ class QcStateHist(Base):
     qc_type = relationship("QcType", back_populates="qc_state_hist")
     seq_product = relationship("SeqProduct", back_populates="qc_state_hist")
     user = relationship("User", back_populates="qc_state_hist")
+
+
+class QcFlowStatus(Base):
+    """
+    A denormalised QC flow status for the current sequencing QC state of
+    a product. The rows of this table are derived from the `qc_state` and
+    `qc_state_dict` tables and should not be edited directly.
+    """
+
+    __tablename__ = "qc_flow_status"
+    __table_args__ = (
+        ForeignKeyConstraint(
+            ["id_qc_state"],
+            ["qc_state.id_qc_state"],
+            name="fk_qc_flow_status_state",
+            ondelete="CASCADE",
+        ),
+        Index(
+            "qc_flow_status_date_index",
+            "qc_flow_status",
+            "date_updated",
+            "id_qc_state",
+        ),
+    )
+
+    id_qc_flow_status = Column(BIGINT, primary_key=True)
+    id_qc_state = Column(BIGINT, nullable=False, unique=True)
+    qc_flow_status = Column(
+        String(20), nullable=False, comment="The value of the QC flow status"
+    )
+    date_updated = Column(
+        DateTime,
+        nullable=False,
+        comment="Datetime the QC state was created or changed",
+    )
+
+    qc_state = relationship("QcState", back_populates="qc_flow_status")
@@ -0,0 +1,215 @@
+# Copyright (c) 2026 Genome Research Ltd.
+#
+# This file is part of npg_langqc.
+#
+# npg_langqc is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation; either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program. If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+import threading
+import time
+from enum import Enum
+
+from pydantic import Field
+from sqlalchemy import Engine, event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+
+from lang_qc.db.pool import ConnectionSettings
+from lang_qc.db.timing import add_statement_consumer
+
+"""
+Routing of read-only sessions between the primary database and its
+replicas.
+
+Each new session is bound to one of the healthy replicas or, if none
+of the replicas is available, to the primary database. The session does
+not connect to the database until it is used. A replica, to which
+a connection cannot be established or for which a connection is lost,
+is considered unhealthy and is not used for new sessions for
+REPLICA_RETRY_INTERVAL seconds. The statement, which failed, is not
+retried. Stale pooled connections are replaced without an error if
+pre-ping is enabled for the pool, see `ConnectionSettings.pool_pre_ping`.
+
+The routing is only suitable for databases that are not written to by
+this application, i.e. for the ml warehouse.
+"""
+
+REPLICA_RETRY_INTERVAL = 30
+
+"""
+Weight of the latest statement execution time in the moving average of
+the statement execution times of an engine.
+"""
+LATENCY_SMOOTHING = 0.2
+
+
+class ReplicaRouting(str, Enum):
+    """Strategies for choosing a replica for a new session."""
+
+    ROUND_ROBIN = "round_robin"
+    LEAST_LATENCY = "least_latency"
+
+
+class ReplicatedConnectionSettings(ConnectionSettings):
+    """
+    Connection settings for a database, which might have read replicas.
+    Replicas are connected to using the same pool settings as the primary
+    database.
+    """
+
+    replica_urls: str | None = Field(
+        default=None,
+        title="Replica URLs",
+        description="A comma-separated list of URLs of read replicas",
+    )
+    replica_routing: ReplicaRouting = Field(
+        default=ReplicaRouting.ROUND_ROBIN,
+        title="Strategy for choosing a replica for a new session",
+    )
+
+    def replica_url_list(self) -> list[str]:
+        """Returns a list of replica URLs, which might be empty."""
+
+        if self.replica_urls is None:
+            return []
+        return [url.strip() for url in self.replica_urls.split(",") if url.strip()]
+
+
+class EngineRouter:
+    """
+    Chooses an engine for a new session. The engines are given as
+    (name, engine) tuples, where the name is the name under which the
+    metrics for the engine's connection pool are registered, see
+    `lang_qc.db.pool.POOL_METRICS`. Either synchronous or asynchronous
+    engines can be used.
+    """
+
+    def __init__(
+        self,
+        primary: tuple[str, Engine | AsyncEngine],
+        replicas: list[tuple[str, Engine | AsyncEngine]],
+        routing: ReplicaRouting = ReplicaRouting.ROUND_ROBIN,
+    ):
+
+        self.primary = primary
+        self.replicas = replicas
+        self.routing = routing
+
+        self._lock = threading.Lock()
+        self._counter = 0
+        self._latency = {}
+        self._failed_until = {}
+
+        for (name, engine) in replicas:
+            self._track_latency(name, engine)
+            self._track_failures(name, engine)
+
+    def candidates(self) -> list[tuple[str, Engine | AsyncEngine]]:
+        """
+        Returns a list of engines in the order they should be tried. Healthy
+        replicas are ordered according to the routing strategy, the primary
+        engine is always the last.
+
+        For the least latency routing, replicas, which have not executed any
+        statements yet, come first and take turns, so that their latency is
+        measured. They are followed by the rest of the replicas, the replica
+        with the lowest latency first.
+        """
+
+        now = time.monotonic()
+        with self._lock:
+            replicas = [
+                replica
+                for replica in self.replicas
+                if self._failed_until.get(replica[0], 0) <= now
+            ]
+            if self.routing == ReplicaRouting.LEAST_LATENCY:
+                measured = sorted(
+                    [replica for replica in replicas if replica[0] in self._latency],
+                    key=lambda replica: self._latency[replica[0]],
+                )
+                replicas = self._in_turn(
+                    [replica for replica in replicas if replica[0] not in self._latency]
+                )
+                replicas += measured
+            else:
+                replicas = self._in_turn(replicas)
+
+        return replicas + [self.primary]
+
+    def record_failure(self, name: str):
+        """Excludes the replica from routing for REPLICA_RETRY_INTERVAL seconds."""
+
+        with self._lock:
+            self._failed_until[name] = time.monotonic() + REPLICA_RETRY_INTERVAL
+
+    def latency(self) -> dict[str, float]:
+        """
+        Returns moving averages of statement execution times in seconds
+        for the replicas, which have executed statements.
+        """
+
+        with self._lock:
+            return dict(self._latency)
+
+    def _in_turn(
+        self, replicas: list[tuple[str, Engine | AsyncEngine]]
+    ) -> list[tuple[str, Engine | AsyncEngine]]:
+        """
+        Rotates the list of replicas, so that each call starts with the next
+        replica. Should be called with the lock held.
+        """
+
+        if len(replicas) == 0:
+            return replicas
+        start = self._counter % len(replicas)
+        self._counter += 1
+        return replicas[start:] + replicas[:start]
+
+    def _track_latency(self, name: str, engine: Engine | AsyncEngine):
+        def record(statement, parameters, elapsed):
+            with self._lock:
+                # The first execution time is the initial value of the average.
+                average = self._latency.get(name, elapsed)
+                self._latency[name] = average + LATENCY_SMOOTHING * (elapsed - average)
+
+        add_statement_consumer(engine, record)
+
+    def _track_failures(self, name: str, engine: Engine | AsyncEngine):
+
+        engine = getattr(engine, "sync_engine", engine)
+
+        @event.listens_for(engine, "handle_error")
+        def exclude_replica(context):
+            # The connection is not set if it could not be established.
+            if context.connection is None or context.is_disconnect:
+                self.record_failure(name)
+                logging.warning(
+                    f"Replica {name} is not available, excluded from routing: "
+                    f"{context.original_exception}"
+                )
+
+
+def routed_session(
+    router: EngineRouter, session_factory: sessionmaker | async_sessionmaker
+) -> Session | AsyncSession:
+    """
+    Returns a new session, either synchronous or asynchronous depending on
+    the session factory, which is bound to the first engine returned by
+    `EngineRouter.candidates`. A connection is checked out when the session
+    is first used.
+    """
+
+    (_, engine) = router.candidates()[0]
+    return session_factory(bind=engine)
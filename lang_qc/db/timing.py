@@ -0,0 +1,78 @@
+# Copyright (c) 2026 Genome Research Ltd.
+#
+# This file is part of npg_langqc.
+#
+# npg_langqc is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation; either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program. If not, see <http://www.gnu.org/licenses/>.
+
+import threading
+import time
+from typing import Any, Callable
+from weakref import WeakKeyDictionary
+
+from sqlalchemy import Engine, event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+"""
+Timing of SQL statements shared by the metrics, the query log and
+the replica router.
+
+A single pair of cursor execution event listeners is registered for
+an engine. The execution time of each statement is measured once and
+passed to all consumers, which were added for the engine, see
+`add_statement_consumer`.
+"""
+
+"""
+A function, which is called with the SQL statement, its parameters and
+its execution time in seconds after the statement is executed.
+"""
+StatementConsumer = Callable[[str, Any, float], None]
+
+_consumers: WeakKeyDictionary[Engine, list[StatementConsumer]] = WeakKeyDictionary()
+_lock = threading.Lock()
+
+
+def add_statement_consumer(engine: Engine | AsyncEngine, consumer: StatementConsumer):
+    """
+    Calls the consumer for each SQL statement executed by the engine.
+    The consumers are called in the order they were added. For an
+    asynchronous engine the statements executed by its `sync_engine`
+    are timed.
+    """
+
+    engine = getattr(engine, "sync_engine", engine)
+    with _lock:
+        consumers = _consumers.get(engine)
+        if consumers is None:
+            # Listeners iterate over the list, which is therefore replaced,
+            # rather than modified, when a consumer is added.
+            _consumers[engine] = [consumer]
+            _time_statements(engine)
+        else:
+            _consumers[engine] = consumers + [consumer]
+
+
+def _time_statements(engine: Engine):
+    @event.listens_for(engine, "before_cursor_execute")
+    def start_timer(conn, cursor, statement, parameters, context, executemany):
+        conn.info["statement_start"] = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def stop_timer(conn, cursor, statement, parameters, context, executemany):
+        start = conn.info.pop("statement_start", None)
+        if start is None:
+            return
+        elapsed = time.perf_counter() - start
+        for consumer in _consumers.get(engine, ()):
+            consumer(statement, parameters, elapsed)
@@ -19,12 +19,19 @@
 
 from typing import Dict, List
 
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Header, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from lang_qc.db.helper.aio import run_sync
+from lang_qc.db.helper.dictionary import cached_value
 from lang_qc.db.helper.qc import qc_state_dict
-from lang_qc.db.qc_connection import get_qc_db
+from lang_qc.db.qc_connection import get_async_qc_db
 from lang_qc.models.qc_flow_status import QcFlowStatusEnum
+from lang_qc.util.http_cache import etag_matches, not_modified, strong_etag
+
+CONFIG_CACHE_CONTROL = "no-cache"
 
 router = APIRouter(
     prefix="/config",
@@ -47,17 +54,44 @@ router = APIRouter(
     possible to assign via the UI. Each QC state is a dictionary with two entries,
     a `description` and a boolean flag `only_prelim`. This flag is set to `True`
     for those QC dictionary states that cannot be final.
+
+    The response is cached by the server together with the QC dictionaries
+    and has a strong `ETag` header. If the value of the `If-None-Match`
+    request header matches the current entity tag, an empty response with
+    the 304 status code is returned.
     """,
+    responses={
+        304: {"description": "The client's copy of the configuration is current."}
+    },
     response_model=Dict,
 )
-def get_config(
-    session: Session = Depends(get_qc_db),
-):
-
-    return {
-        "qc_flow_statuses": QcFlowStatusEnum.qc_flow_statuses(),
-        "qc_states": _states_for_update(session),
-    }
+async def get_config(
+    if_none_match: str | None = Header(default=None),
+    session: AsyncSession = Depends(get_async_qc_db),
+) -> Response:
+
+    (etag, body) = await run_sync(
+        lambda session: cached_value(session, "config", _config_response), session
+    )
+    headers = {"ETag": etag, "Cache-Control": CONFIG_CACHE_CONTROL}
+    if etag_matches(if_none_match, etag):
+        return not_modified(headers)
+
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _config_response(session) -> tuple[str, bytes]:
+
+    body = JSONResponse(
+        content=jsonable_encoder(
+            {
+                "qc_flow_statuses": QcFlowStatusEnum.qc_flow_statuses(),
+                "qc_states": _states_for_update(session),
+            }
+        )
+    ).body
+
+    return (strong_etag(body), body)
 
 
 def _states_for_update(session) -> List:
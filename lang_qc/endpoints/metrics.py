@@ -0,0 +1,45 @@
+# Copyright (c) 2026 Genome Research Ltd.
+#
+# This file is part of npg_langqc.
+#
+# npg_langqc is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation; either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program. If not, see <http://www.gnu.org/licenses/>.
+
+from fastapi import APIRouter, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+from lang_qc.util.metrics import metrics_registry
+
+router = APIRouter(
+    prefix="/metrics",
+    tags=["metrics"],
+)
+
+
+@router.get(
+    "",
+    summary="Server metrics in the Prometheus text format",
+    description="""
+    Returns request latency and response size histograms per route,
+    SQL statement timing histograms per database and calling function,
+    and the state of database connection pools. If the server runs several
+    worker processes, the metrics of all of them are returned provided
+    that `PROMETHEUS_MULTIPROC_DIR` is set. See `lang_qc.util.metrics`.
+    """,
+    response_class=Response,
+)
+def get_metrics() -> Response:
+
+    return Response(
+        content=generate_latest(metrics_registry()), media_type=CONTENT_TYPE_LATEST
+    )
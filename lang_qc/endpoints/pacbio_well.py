@@ -20,22 +20,30 @@
 # You should have received a copy of the GNU General Public License along with
 # this program. If not, see <http://www.gnu.org/licenses/>.
 
-from typing import Annotated
+from typing import Annotated, Callable
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from starlette import status
 
+from lang_qc.db.helper.aio import gather, run_sync
 from lang_qc.db.helper.qc import (
     assign_qc_state_to_product,
+    assign_qc_states_to_products,
     claim_qc_for_product,
     get_qc_state_for_product,
+    get_qc_state_version,
+    get_qc_states_by_id_product_list,
     product_has_qc_state,
 )
-from lang_qc.db.helper.well import well_seq_product_find_or_create
-from lang_qc.db.helper.wells import PacBioPagedWellsFactory, WellWh
-from lang_qc.db.mlwh_connection import get_mlwh_db
-from lang_qc.db.qc_connection import get_qc_db
+from lang_qc.db.helper.well import (
+    well_seq_product_find_or_create,
+    wells_seq_products_find_or_create,
+)
+from lang_qc.db.helper.wells import PacBioPagedWellsFactory, WellWh, well_version
+from lang_qc.db.mlwh_connection import get_async_mlwh_db, get_mlwh_db
+from lang_qc.db.qc_connection import get_async_qc_db, get_qc_db
 from lang_qc.db.qc_schema import User
 from lang_qc.models.pacbio.qc_data import QCPoolMetrics
 from lang_qc.models.pacbio.well import (
@@ -46,12 +54,15 @@ from lang_qc.models.pacbio.well import (
 from lang_qc.models.qc_flow_status import QcFlowStatusEnum
 from lang_qc.models.qc_state import QcState, QcStateBasic
 from lang_qc.util.auth import check_user
+from lang_qc.util.cache import cached_models, well_cache
 from lang_qc.util.errors import (
     InconsistentInputError,
+    InvalidCursorError,
     InvalidDictValueError,
     MissingLimsDataError,
     RunNotFoundError,
 )
+from lang_qc.util.http_cache import etag_matches, not_modified, weak_etag
 from lang_qc.util.type_checksum import ChecksumSHA256, PacBioWellSHA256
 
 """
@@ -92,6 +103,20 @@ router = APIRouter(
     },
 )
 
+"""
+Responses for a single well have a weak `ETag` header and should be
+revalidated by clients.
+"""
+CACHE_CONTROL = "no-cache"
+CONDITIONAL_REQUEST_DESCRIPTION = """
+    The response has a weak `ETag` header, which is derived from the versions
+    of the well data in the ml warehouse and, where relevant, of the QC state.
+    If the value of the `If-None-Match` request header matches the current
+    entity tag, an empty response with the 304 status code is returned.
+    The versions are retrieved by lightweight queries before the response
+    is built.
+"""
+
 OptionalPositiveInt = Annotated[int | None, Query(gt=0)]
 # We cannot get this from pydantic as of v2, so we use Python 3.9 annotated type support
 # and FastAPI query constraints on URL query chunks.
@@ -106,7 +131,10 @@ OptionalPositiveInt = Annotated[int | None, Query(gt=0)]
          Possible values for this parameter are defined in QcFlowStatusEnum.
 
          The list is paged according to non-optional parameters `page_size` and
-         `page_number`.
+         `page_number`. If an optional `cursor` parameter, a value of the
+         `next_cursor` attribute of the previous page, is given, the page
+         immediately following the previous page is returned regardless
+         of the value of `page_number`.
     """,
     responses={
         status.HTTP_422_UNPROCESSABLE_ENTITY: {
@@ -115,21 +143,32 @@ OptionalPositiveInt = Annotated[int | None, Query(gt=0)]
     },
     response_model=PacBioPagedWells,
 )
-def get_wells_filtered_by_status(
+async def get_wells_filtered_by_status(
     page_size: OptionalPositiveInt,
     page_number: OptionalPositiveInt,
     qc_status: QcFlowStatusEnum = QcFlowStatusEnum.INBOX,
-    qcdb_session: Session = Depends(get_qc_db),
-    mlwh_session: Session = Depends(get_mlwh_db),
+    cursor: str | None = None,
+    qcdb_session: AsyncSession = Depends(get_async_qc_db),
+    mlwh_session: AsyncSession = Depends(get_async_mlwh_db),
 ):
 
     # Page size and number values will be validated by the constructor.
-    return PacBioPagedWellsFactory(
-        qcdb_session=qcdb_session,
-        mlwh_session=mlwh_session,
-        page_size=page_size,
-        page_number=page_number,
-    ).create_for_qc_status(qc_status)
+    try:
+        response = await run_sync(
+            lambda qcdb_session, mlwh_session: PacBioPagedWellsFactory(
+                qcdb_session=qcdb_session,
+                mlwh_session=mlwh_session,
+                page_size=page_size,
+                page_number=page_number,
+                cursor=cursor,
+                cache=well_cache(),
+            ).create_for_qc_status(qc_status),
+            qcdb_session,
+            mlwh_session,
+        )
+    except InvalidCursorError as err:
+        raise HTTPException(422, detail=f"{err}")
+    return response
 
 
 @router.get(
@@ -141,104 +180,188 @@ def get_wells_filtered_by_status(
     The list is paged according to optional parameters `page_size` and
     `page_number`, which default to 20 and 1 respectively. For the
     majority of runs all wells will fit into the first page of the
-    default size.
+    default size. An optional `cursor` parameter can be used in the same
+    way as for the /pacbio/wells URL.
     """,
     responses={
         status.HTTP_404_NOT_FOUND: {"description": "Run not found"},
+        status.HTTP_422_UNPROCESSABLE_ENTITY: {
+            "description": "Invalid query parameter value"
+        },
     },
     response_model=PacBioPagedWells,
 )
-def get_wells_in_run(
+async def get_wells_in_run(
     run_name: str,
     page_size: OptionalPositiveInt = 20,
     page_number: OptionalPositiveInt = 1,
-    qcdb_session: Session = Depends(get_qc_db),
-    mlwh_session: Session = Depends(get_mlwh_db),
+    cursor: str | None = None,
+    qcdb_session: AsyncSession = Depends(get_async_qc_db),
+    mlwh_session: AsyncSession = Depends(get_async_mlwh_db),
 ):
 
     response = None
     try:
-        response = PacBioPagedWellsFactory(
-            qcdb_session=qcdb_session,
-            mlwh_session=mlwh_session,
-            page_size=page_size,
-            page_number=page_number,
-        ).create_for_run(run_name)
+        response = await run_sync(
+            lambda qcdb_session, mlwh_session: PacBioPagedWellsFactory(
+                qcdb_session=qcdb_session,
+                mlwh_session=mlwh_session,
+                page_size=page_size,
+                page_number=page_number,
+                cursor=cursor,
+                cache=well_cache(),
+            ).create_for_run(run_name),
+            qcdb_session,
+            mlwh_session,
+        )
     except RunNotFoundError as err:
         raise HTTPException(404, detail=f"{err}")
+    except InvalidCursorError as err:
+        raise HTTPException(422, detail=f"{err}")
     return response
 
 
 @router.get(
     "/wells/{id_product}/libraries",
     summary="Get well summary and LIMS data for all libraries",
+    description=f"""
+    Returns the well summary and LIMS data for all libraries in the well.
+    {CONDITIONAL_REQUEST_DESCRIPTION}
+    """,
     responses={
+        status.HTTP_304_NOT_MODIFIED: {"description": "The client's copy is current"},
         status.HTTP_404_NOT_FOUND: {"description": "Well product does not exist"},
         status.HTTP_422_UNPROCESSABLE_ENTITY: {"description": "Invalid product ID"},
         status.HTTP_409_CONFLICT: {"description": "Missing or incomplete LIMS data"},
     },
     response_model=PacBioWellLibraries,
 )
-def get_well_lims_info(
+async def get_well_lims_info(
     id_product: ChecksumSHA256,
-    mlwhdb_session: Session = Depends(get_mlwh_db),
+    response: Response,
+    if_none_match: str | None = Header(default=None),
+    mlwhdb_session: AsyncSession = Depends(get_async_mlwh_db),
 ) -> PacBioWellLibraries:
 
-    db_well = _find_well_product_or_error(id_product, mlwhdb_session)
-    well_libraries: PacBioWellLibraries
-    try:
-        well_libraries = PacBioWellLibraries(db_well=db_well)
-    except MissingLimsDataError as err:
-        # 409 - Request conflicts with the current state of the server.
-        raise HTTPException(409, detail=str(err))
-
-    return well_libraries
+    mlwh_version = await run_sync(
+        lambda session: _mlwh_well_version(id_product, session), mlwhdb_session
+    )
+    headers = _etag_headers(PacBioWellLibraries, mlwh_version)
+    if etag_matches(if_none_match, headers["ETag"]):
+        return not_modified(headers)
+    response.headers.update(headers)
+
+    return await run_sync(
+        _well_libraries,
+        mlwhdb_session,
+        id_product=id_product,
+        mlwh_version=mlwh_version,
+    )
 
 
 @router.get(
     "/products/{id_product}/seq_level",
     summary="Get full sequencing QC metrics and state for a product",
+    description=f"""
+    Returns the well data, QC metrics and the current sequencing QC state
+    for the well product. {CONDITIONAL_REQUEST_DESCRIPTION}
+    """,
     responses={
+        status.HTTP_304_NOT_MODIFIED: {"description": "The client's copy is current"},
         status.HTTP_404_NOT_FOUND: {"description": "Well product does not exist"},
         status.HTTP_422_UNPROCESSABLE_ENTITY: {"description": "Invalid product ID"},
     },
     response_model=PacBioWellFull,
 )
-def get_seq_metrics(
+async def get_seq_metrics(
     id_product: PacBioWellSHA256,
-    mlwhdb_session: Session = Depends(get_mlwh_db),
-    qcdb_session: Session = Depends(get_qc_db),
+    response: Response,
+    if_none_match: str | None = Header(default=None),
+    mlwhdb_session: AsyncSession = Depends(get_async_mlwh_db),
+    qcdb_session: AsyncSession = Depends(get_async_qc_db),
 ) -> PacBioWellFull:
 
-    mlwh_well = _find_well_product_or_error(id_product, mlwhdb_session)
+    # The versions of the well data and of the QC state are retrieved
+    # concurrently.
+    (mlwh_version, qc_version) = await gather(
+        (lambda session: _mlwh_well_version(id_product, session), mlwhdb_session),
+        (lambda session: get_qc_state_version(session, id_product), qcdb_session),
+    )
+    headers = _etag_headers(PacBioWellFull, mlwh_version, qc_version)
+    if etag_matches(if_none_match, headers["ETag"]):
+        return not_modified(headers)
+    response.headers.update(headers)
+
+    # The well and its QC state are retrieved concurrently.
+    if well_cache() is None:
+        (mlwh_well, qc_state) = await gather(
+            (
+                lambda session: _find_well_product_or_error(
+                    id_product, session, with_lims_data=True
+                ),
+                mlwhdb_session,
+            ),
+            (lambda session: _qc_state(session, id_product), qcdb_session),
+        )
+        return await run_sync(
+            lambda session: PacBioWellFull(db_well=mlwh_well, qc_state=qc_state),
+            mlwhdb_session,
+        )
 
-    qc_state_db = get_qc_state_for_product(session=qcdb_session, id_product=id_product)
-    qc_state = None if qc_state_db is None else QcState.from_orm(qc_state_db)
-    return PacBioWellFull(db_well=mlwh_well, qc_state=qc_state)
+    # If well models are cached, the well data are retrieved only when
+    # the cached model is out of date.
+    qc_state = await run_sync(
+        lambda session: _qc_state(session, id_product), qcdb_session
+    )
+    return await run_sync(
+        lambda session: _cached_well_model(
+            session,
+            PacBioWellFull,
+            id_product,
+            lambda db_well: PacBioWellFull(db_well=db_well, qc_state=qc_state),
+            mlwh_version=mlwh_version,
+            qc_state=qc_state,
+        ),
+        mlwhdb_session,
+    )
 
 
 @router.get(
     "/products/{id_product}/seq_level/pool",
     summary="Get sample (deplexing) metrics for a multiplexed well product by the well ID",
+    description=f"""
+    Returns the deplexing metrics for the libraries in the well, null if
+    the metrics are not available. {CONDITIONAL_REQUEST_DESCRIPTION}
+    """,
     responses={
+        status.HTTP_304_NOT_MODIFIED: {"description": "The client's copy is current"},
         status.HTTP_404_NOT_FOUND: {"description": "Product not found"},
         status.HTTP_409_CONFLICT: {"description": "Missing or incomplete LIMS data"},
         status.HTTP_422_UNPROCESSABLE_ENTITY: {"description": "Invalid product ID"},
     },
     response_model=QCPoolMetrics | None,
 )
-def get_product_metrics(
-    id_product: PacBioWellSHA256, mlwhdb_session: Session = Depends(get_mlwh_db)
+async def get_product_metrics(
+    id_product: PacBioWellSHA256,
+    response: Response,
+    if_none_match: str | None = Header(default=None),
+    mlwhdb_session: AsyncSession = Depends(get_async_mlwh_db),
 ) -> QCPoolMetrics | None:
 
-    mlwh_well = _find_well_product_or_error(id_product, mlwhdb_session)
-    try:
-        metrics = QCPoolMetrics(db_well=mlwh_well)
-    except MissingLimsDataError:
-        return
-    if len(metrics.products) == 0:
-        return
-    return metrics
+    mlwh_version = await run_sync(
+        lambda session: _mlwh_well_version(id_product, session), mlwhdb_session
+    )
+    headers = _etag_headers(QCPoolMetrics, mlwh_version)
+    if etag_matches(if_none_match, headers["ETag"]):
+        return not_modified(headers)
+    response.headers.update(headers)
+
+    return await run_sync(
+        _pool_metrics,
+        mlwhdb_session,
+        id_product=id_product,
+        mlwh_version=mlwh_version,
+    )
 
 
 @router.post(
@@ -345,10 +468,212 @@ def assign_qc_state(
     return QcState.from_orm(new_qc_state)
 
 
-def _find_well_product_or_error(id_product, mlwhdb_session):
+@router.put(
+    "/products/qc_assign",
+    summary="Assign QC states to a number of wells",
+    description="""
+    Enables the user to assign new QC states to a number of wells at once,
+    for example, to all wells of a run. The request body is an object whose
+    keys are well product IDs and the values are the QC states to assign.
+    The response is an object whose keys are the same product IDs and the
+    values are the QC states of the wells.
+
+    The rules are the same as for assigning a QC state to a single well.
+    QC of all wells should have been already claimed. The request is either
+    fulfilled for all wells or fails for all wells.
+    """,
+    responses={
+        status.HTTP_200_OK: {"description": "Wells QC states updated"},
+        status.HTTP_400_BAD_REQUEST: {"description": "Request details are incorrect"},
+        status.HTTP_403_FORBIDDEN: {"description": "User cannot perform QC"},
+        status.HTTP_404_NOT_FOUND: {"description": "Some of the wells do not exist"},
+        status.HTTP_422_UNPROCESSABLE_ENTITY: {"description": "Invalid product ID"},
+        status.HTTP_409_CONFLICT: {"description": "Requested operation is not allowed"},
+    },
+    response_model=dict[ChecksumSHA256, QcState],
+)
+def assign_qc_states(
+    request_body: dict[PacBioWellSHA256, QcStateBasic],
+    user: User = Depends(check_user),
+    qcdb_session: Session = Depends(get_qc_db),
+    mlwhdb_session: Session = Depends(get_mlwh_db),
+) -> dict[ChecksumSHA256, QcState]:
+
+    ids = list(request_body.keys())
+    mlwh_wells = WellWh(session=mlwhdb_session).get_mlwh_wells_by_product_ids(
+        ids, with_lims_data=False
+    )
+    missing_ids = [id for id in ids if id not in mlwh_wells]
+    if len(missing_ids) != 0:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"PacBio well for product ID {', '.join(missing_ids)} not found.",
+        )
+
+    current_qc_types = {
+        id: {qc_state.qc_type for qc_state in qc_states}
+        for (id, qc_states) in get_qc_states_by_id_product_list(
+            session=qcdb_session, ids=ids
+        ).items()
+    }
+    unclaimed_ids = [
+        id
+        for (id, qc_state) in request_body.items()
+        if len(current_qc_types.get(id, set())) == 0
+        or (
+            qc_state.qc_type is not None
+            and qc_state.qc_type not in current_qc_types[id]
+        )
+    ]
+    if len(unclaimed_ids) != 0:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="QC state of an unclaimed well cannot be updated, product ID "
+            + ", ".join(unclaimed_ids),
+        )
+
+    seq_products = wells_seq_products_find_or_create(
+        session=qcdb_session, mlwh_wells=list(mlwh_wells.values())
+    )
+    try:
+        new_qc_states = assign_qc_states_to_products(
+            session=qcdb_session,
+            qc_states=[
+                (seq_products[id], qc_state) for (id, qc_state) in request_body.items()
+            ],
+            user=user,
+        )
+    except (InvalidDictValueError, InconsistentInputError) as err:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(err),
+        )
+
+    return {
+        qc_state.seq_product.id_product: QcState.from_orm(qc_state)
+        for qc_state in new_qc_states
+    }
+
+
+"""
+Synchronous parts of the asynchronous endpoints. Response models are built
+from ORM objects, which might need lazy loading of related objects. These
+functions are run by `lang_qc.db.helper.aio.run_sync`.
+"""
+
+
+def _well_libraries(
+    mlwhdb_session: Session, id_product, mlwh_version: str | None = None
+) -> PacBioWellLibraries:
+    def build(db_well) -> PacBioWellLibraries:
+        try:
+            return PacBioWellLibraries(db_well=db_well)
+        except MissingLimsDataError as err:
+            # 409 - Request conflicts with the current state of the server.
+            raise HTTPException(409, detail=str(err))
+
+    return _cached_well_model(
+        mlwhdb_session,
+        PacBioWellLibraries,
+        id_product,
+        build,
+        mlwh_version=mlwh_version,
+    )
+
+
+def _qc_state(qcdb_session: Session, id_product) -> QcState | None:
+
+    qc_state_db = get_qc_state_for_product(session=qcdb_session, id_product=id_product)
+    return None if qc_state_db is None else QcState.from_orm(qc_state_db)
+
+
+def _pool_metrics(
+    mlwhdb_session: Session, id_product, mlwh_version: str | None = None
+) -> QCPoolMetrics | None:
+    def build(db_well) -> QCPoolMetrics | None:
+        try:
+            metrics = QCPoolMetrics(db_well=db_well)
+        except MissingLimsDataError:
+            return
+        if len(metrics.products) == 0:
+            return
+        return metrics
+
+    return _cached_well_model(
+        mlwhdb_session,
+        QCPoolMetrics,
+        id_product,
+        build,
+        mlwh_version=mlwh_version,
+    )
+
+
+def _cached_well_model(
+    mlwhdb_session: Session,
+    model_class: type,
+    id_product,
+    build: Callable,
+    mlwh_version: str | None = None,
+    qc_state: QcState | None = None,
+):
+    """
+    Returns a model of the `model_class` class for the well. The model is
+    built by the `build` function from the well row with LIMS data.
+
+    If well models are cached, see `lang_qc.util.cache`, the cached model is
+    returned if it is up to date. The `mlwh_version` token of the well data
+    is retrieved unless given. The `qc_state` argument should be given if
+    the model includes the QC state of the well.
+    """
+
+    def build_models(ids) -> dict:
+        db_well = _find_well_product_or_error(
+            id_product, mlwhdb_session, with_lims_data=True
+        )
+        return {id_product: build(db_well)}
+
+    cache = well_cache()
+    if cache is None:
+        return build_models([id_product])[id_product]
+
+    if mlwh_version is None:
+        mlwh_version = _mlwh_well_version(id_product, mlwhdb_session)
+    models = cached_models(
+        cache,
+        model_class,
+        {id_product: well_version(mlwh_version, qc_state)},
+        build_models,
+    )
+    return models[id_product]
+
+
+def _etag_headers(model_class: type, *versions: str | None) -> dict[str, str]:
+    """
+    Returns the `ETag` and `Cache-Control` headers for a response with
+    a model of the `model_class` class, which is built from the data with
+    the given versions.
+    """
+
+    return {
+        "ETag": weak_etag(model_class.__name__, *versions),
+        "Cache-Control": CACHE_CONTROL,
+    }
+
+
+def _mlwh_well_version(id_product, mlwhdb_session) -> str:
+
+    versions = WellWh(session=mlwhdb_session).get_mlwh_well_versions([id_product])
+    if id_product not in versions:
+        raise HTTPException(
+            404, detail=f"PacBio well for product ID {id_product} not found."
+        )
+    return versions[id_product]
+
+
+def _find_well_product_or_error(id_product, mlwhdb_session, with_lims_data=False):
 
     mlwh_well = WellWh(session=mlwhdb_session).get_mlwh_well_by_product_id(
-        id_product=id_product
+        id_product=id_product, with_lims_data=with_lims_data
     )
     if mlwh_well is None:
         raise HTTPException(
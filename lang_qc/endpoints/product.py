@@ -18,14 +18,22 @@
 # You should have received a copy of the GNU General Public License along with
 # this program. If not, see <http://www.gnu.org/licenses/>.
 
-from typing import Annotated
+from contextlib import AbstractContextManager
+from typing import Annotated, Callable
 
 from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from starlette import status
 
-from lang_qc.db.helper.qc import get_qc_states, get_qc_states_by_id_product_list
-from lang_qc.db.qc_connection import get_qc_db
+from lang_qc.db.helper.aio import run_sync
+from lang_qc.db.helper.qc import (
+    get_qc_states,
+    get_qc_states_by_id_product_list,
+    stream_qc_states_by_id_product_list,
+)
+from lang_qc.db.qc_connection import get_async_qc_db, get_qc_db_opener
 from lang_qc.models.qc_state import QcState
 from lang_qc.util.type_checksum import ChecksumSHA256
 
@@ -61,11 +69,59 @@ router = APIRouter(
     },
     response_model=dict[ChecksumSHA256, list[QcState]],
 )
-def bulk_qc_fetch(
-    request_body: list[ChecksumSHA256], qcdb_session: Session = Depends(get_qc_db)
+async def bulk_qc_fetch(
+    request_body: list[ChecksumSHA256],
+    qcdb_session: AsyncSession = Depends(get_async_qc_db),
 ):
 
-    return get_qc_states_by_id_product_list(session=qcdb_session, ids=request_body)
+    return await run_sync(
+        get_qc_states_by_id_product_list, qcdb_session, ids=request_body
+    )
+
+
+@router.post(
+    "/qc/stream",
+    summary="Streams product QC states for a list of product IDs",
+    description="""
+    A streaming variant of the `POST /products/qc` endpoint, which is suitable
+    for long lists of product IDs.
+
+    The response is newline-delimited JSON (NDJSON). Each line is a QcState
+    record of any type for one of the given product IDs. QC states for the
+    same product are not guaranteed to be on consecutive lines. Product IDs
+    for which no QC states are available are absent from the response.
+    The response may be empty.
+
+    An invalid product ID, which should be a hexadecimal of length 64,
+    triggers an error response.
+    """,
+    responses={
+        status.HTTP_200_OK: {
+            "content": {"application/x-ndjson": {}},
+            "description": "One JSON QcState object per line",
+        },
+        status.HTTP_422_UNPROCESSABLE_ENTITY: {"description": "Invalid product ID"},
+    },
+    response_class=StreamingResponse,
+)
+def bulk_qc_stream(
+    request_body: list[ChecksumSHA256],
+    open_qcdb_session: Callable[[], AbstractContextManager[Session]] = Depends(
+        get_qc_db_opener
+    ),
+):
+
+    # The QC states are retrieved while the response is streamed, after
+    # this function returns. The session is opened and closed by the
+    # generator.
+    def ndjson_lines():
+        with open_qcdb_session() as qcdb_session:
+            for qc_state in stream_qc_states_by_id_product_list(
+                session=qcdb_session, ids=request_body
+            ):
+                yield qc_state.model_dump_json() + "\n"
+
+    return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
 
 
 @router.get(
@@ -90,14 +146,15 @@ def bulk_qc_fetch(
     },
     response_model=dict[ChecksumSHA256, list[QcState]],
 )
-def qc_fetch(
+async def qc_fetch(
     weeks: Annotated[int, Query(gt=0)] = RECENTLY_QCED_NUM_WEEKS,
     seq_level: bool = False,
     final: bool = False,
-    qcdb_session: Session = Depends(get_qc_db),
+    qcdb_session: AsyncSession = Depends(get_async_qc_db),
 ) -> dict[ChecksumSHA256, list[QcState]]:
-    return get_qc_states(
-        session=qcdb_session,
+    return await run_sync(
+        get_qc_states,
+        qcdb_session,
         num_weeks=weeks,
         sequencing_outcomes_only=seq_level,
         final_only=final,
@@ -22,13 +22,17 @@
 
 import logging
 import os
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
 from pydantic_settings import BaseSettings
 
-from lang_qc.endpoints import config, pacbio_well, product
+from lang_qc.db import mlwh_connection, qc_connection
+from lang_qc.endpoints import config, metrics, pacbio_well, product
+from lang_qc.util.metrics import MetricsMiddleware, register_pool_collector
+from lang_qc.util.query_log import QueryLogMiddleware
 
 
 class Settings(BaseSettings):
@@ -46,10 +50,24 @@ origins = []
 if origins_env is not None:
     origins = origins_env.split(",")
 
-app = FastAPI(title="LangQC", openapi_url=settings.openapi_url)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Create database engines and their connection pools at startup so
+    # that misconfiguration is detected early.
+    mlwh_connection.init_engines()
+    qc_connection.init_engines()
+    register_pool_collector()
+    yield
+    await mlwh_connection.dispose_engines()
+    await qc_connection.dispose_engines()
+
+
+app = FastAPI(title="LangQC", openapi_url=settings.openapi_url, lifespan=lifespan)
 app.include_router(pacbio_well.router)
 app.include_router(product.router)
 app.include_router(config.router)
+app.include_router(metrics.router)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
@@ -58,3 +76,6 @@ app.add_middleware(
     allow_headers=["*"],
 )
 app.add_middleware(GZipMiddleware)
+app.add_middleware(QueryLogMiddleware)
+# Added last to measure the size of compressed responses.
+app.add_middleware(MetricsMiddleware)
@@ -23,6 +23,7 @@ from typing import Any
 
 from pydantic import Field, model_validator
 from pydantic.dataclasses import dataclass
+from pydantic_core import ArgsKwargs
 
 from lang_qc.db.mlwh_schema import PacBioRun
 
@@ -82,6 +83,8 @@ class PacBioLibrary:
         set via the constructor.
         """
 
+        if not isinstance(values, ArgsKwargs):
+            return values
         # https://github.com/pydantic/pydantic-core/blob/main/python/pydantic_core/_pydantic_core.pyi
         if "db_library" not in values.kwargs:
             return values.kwargs
@@ -194,6 +197,9 @@ class PacBioExperiment:
         Errors if the `db_libraries` attribute is not set via the constructor.
         """
 
+        if not isinstance(values, ArgsKwargs):
+            return values
+
         lims_db_rows: list[PacBioRun] = values.kwargs["db_libraries"]
         num_samples = len(lims_db_rows)
         if num_samples == 0:
@@ -20,11 +20,13 @@
 # You should have received a copy of the GNU General Public License along with
 # this program. If not, see <http://www.gnu.org/licenses/>
 
+import functools
 from statistics import mean, pstdev
-from typing import Any
+from typing import Any, Callable, NamedTuple
 
 from pydantic import BaseModel, ConfigDict, Field, model_validator
 from pydantic.dataclasses import dataclass
+from pydantic_core import ArgsKwargs
 
 from lang_qc.db.mlwh_schema import PacBioRunWellMetrics
 from lang_qc.util.errors import MissingLimsDataError
@@ -66,6 +68,10 @@ def rounding(obj, key):
     return round(getattr(obj, key), 2)
 
 
+def column_value(obj, key):
+    return getattr(obj, key, None)
+
+
 def demux_reads(obj, _):
     if getattr(obj, "demultiplex_mode") == "OnInstrument":
         return round(
@@ -105,6 +111,20 @@ dispatch = {
 }
 
 
+class FieldPlan(NamedTuple):
+    """
+    A recipe for computing a value of a field of `QCDataWell` from a well
+    row: the name of the field, its label, a callable, which takes the well
+    row and the field name and returns the value, and the names of the
+    columns, which should all have values for the callable to be called.
+    """
+
+    name: str
+    label: str
+    compute: Callable
+    columns: tuple[str, ...]
+
+
 class QCDataWell(BaseModel):
 
     smrt_link: dict = Field(title="URL components for a SMRT Link page")
@@ -133,34 +153,51 @@ class QCDataWell(BaseModel):
     )
     model_config = ConfigDict(from_attributes=True)
 
+    @classmethod
+    @functools.cache
+    def field_plan(cls) -> tuple[FieldPlan, ...]:
+        """
+        Returns a tuple of `FieldPlan` objects for all fields of this class
+        apart from `smrt_link`, which is populated differently. The plan is
+        computed once per class.
+        """
+
+        plan = []
+        for (name, field) in cls.model_fields.items():
+            if name == "smrt_link":
+                continue
+            (compute, columns) = dispatch.get(name, (column_value, []))
+            plan.append(
+                FieldPlan(
+                    name=name,
+                    label=field.title,
+                    compute=compute,
+                    columns=tuple(columns),
+                )
+            )
+
+        return tuple(plan)
+
     @classmethod
     def from_orm(cls, obj: PacBioRunWellMetrics):
 
-        # Introspect the class definition, get a dictionary of specs
-        # for properties with property names as the keys.
-        attrs = cls.model_json_schema()["properties"]
-        qc_data = {}
+        # This one is special
+        qc_data = {"smrt_link": get_ids_for_smrtlink_url(obj)}
 
-        for name in attrs:
-            if name == "smrt_link":
-                # This one is special
-                qc_data[name] = get_ids_for_smrtlink_url(obj)
-            else:
-                qc_data[name] = {}
-                qc_data[name]["value"] = None
-                qc_data[name]["label"] = attrs[name]["title"]
-
-                if name in dispatch:
-                    callable, obj_keys = dispatch[name]
-                    # Check all keys required for dispatch have values
-                    if all(getattr(obj, key, None) for key in obj_keys):
-                        qc_data[name]["value"] = callable(obj, name)
-                else:
-                    qc_data[name]["value"] = getattr(obj, name, None)
+        for (name, label, compute, columns) in cls.field_plan():
+            value = None
+            # Check all columns required for computing the value have values
+            if all(getattr(obj, column, None) for column in columns):
+                value = compute(obj, name)
+            qc_data[name] = {"value": value, "label": label}
 
         return cls.model_validate(qc_data)
 
 
+# Compute the plan when the module is loaded.
+QCDataWell.field_plan()
+
+
 class SampleDeplexingStats(BaseModel):
     """
     A representation of metrics for one product, some direct from the DB and others inferred
@@ -200,6 +237,8 @@ class QCPoolMetrics:
         from a database row that is passed as an argument.
         """
 
+        if not isinstance(values, ArgsKwargs):
+            return values
         db_well_key_name = "db_well"
         # https://github.com/pydantic/pydantic-core/blob/main/python/pydantic_core/_pydantic_core.pyi
         if db_well_key_name not in values.kwargs:
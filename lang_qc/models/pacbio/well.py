@@ -20,11 +20,13 @@
 # You should have received a copy of the GNU General Public License along with
 # this program. If not, see <http://www.gnu.org/licenses/>.
 
+import functools
 from datetime import datetime
 from typing import Any, Optional
 
-from pydantic import Field, model_validator
+from pydantic import ConfigDict, Field, model_validator
 from pydantic.dataclasses import dataclass
+from pydantic_core import ArgsKwargs
 
 from lang_qc.db.mlwh_schema import PacBioRunWellMetrics
 from lang_qc.models.pacbio.experiment import PacBioExperiment, PacBioLibrary
@@ -54,6 +56,27 @@ def get_field_names(cls):
     return field_names
 
 
+@functools.cache
+def get_column_mapping(cls) -> tuple[tuple[str, str], ...]:
+    """Returns a mapping plan for populating a class given as an argument
+    from a well metrics table row.
+
+    The plan is a tuple of (field, attribute) pairs, where the field is the
+    name under which the value is passed to the constructor, see
+    `get_field_names`, and the attribute is the name of the attribute of
+    the `PacBioRunWellMetrics` object that holds the value. Only the fields
+    that correspond to the columns of the well metrics table are included.
+    The plan is computed once per class.
+    """
+
+    column_names = {column.key for column in PacBioRunWellMetrics.__table__.columns}
+    return tuple(
+        (field_name, field_name)
+        for field_name in get_field_names(cls)
+        if field_name in column_names
+    )
+
+
 @dataclass(kw_only=True, frozen=True)
 class PacBioWell:
     """A basic response model for a single PacBio well.
@@ -76,6 +99,9 @@ class PacBioWell:
     model have `validation_alias` set.
     """
 
+    # Fields can also be populated by their names, which are used in JSON.
+    __pydantic_config__ = ConfigDict(populate_by_name=True)
+
     db_well: PacBioRunWellMetrics = Field(init_var=True)
 
     # Well identifies.
@@ -132,17 +158,20 @@ class PacBioWell:
         from a database row that is passed as an argument.
         """
 
+        # Field values, for example, of a model serialised to JSON.
+        if not isinstance(values, ArgsKwargs):
+            return values
+
         # https://github.com/pydantic/pydantic-core/blob/main/python/pydantic_core/_pydantic_core.pyi
         if "db_well" not in values.kwargs:
             raise ValueError("None db_well value is not allowed.")
 
         mlwh_db_row: PacBioRunWellMetrics = values.kwargs["db_well"]
-        column_names = [column.key for column in PacBioRunWellMetrics.__table__.columns]
 
-        assigned = dict()
-        for field_name in get_field_names(cls):
-            if field_name in column_names:
-                assigned[field_name] = getattr(mlwh_db_row, field_name)
+        assigned = {
+            field_name: getattr(mlwh_db_row, attribute)
+            for (field_name, attribute) in get_column_mapping(cls)
+        }
 
         if "qc_state" in values.kwargs:
             assigned["qc_state"] = values.kwargs["qc_state"]
@@ -168,6 +197,8 @@ class PacBioWellSummary(PacBioWell):
     @model_validator(mode="before")
     def pre_root(cls, values: dict[str, Any]) -> dict[str, Any]:
 
+        if not isinstance(values, ArgsKwargs):
+            return values
         assigned = super().pre_root(values)
         mlwh_db_row: PacBioRunWellMetrics = values.kwargs["db_well"]
         assigned["study_names"] = sorted(
@@ -196,6 +227,8 @@ class PacBioWellLibraries(PacBioWell):
     @model_validator(mode="before")
     def pre_root(cls, values: dict[str, Any]) -> dict[str, Any]:
 
+        if not isinstance(values, ArgsKwargs):
+            return values
         assigned = super().pre_root(values)
         mlwh_db_row: PacBioRunWellMetrics = values.kwargs["db_well"]
         lims_data = mlwh_db_row.get_experiment_info()
@@ -213,12 +246,23 @@ class PacBioWellLibraries(PacBioWell):
 class PacBioPagedWells(PagedResponse, extra="forbid"):
     """A response model for paged data about PacBio wells."""
 
+    page_number: int | None = Field(
+        default=None,
+        gt=0,
+        title="Page sequential number",
+        description="""
+        The sequential number of the page that is requested by the client.
+        The pages are numbered starting from one. Is not set if the page is
+        located by the `cursor`.
+        """,
+    )
     wells: list[PacBioWellSummary] = Field(
         default=[],
         title="A list of PacBioWellSummary objects",
         description="""
-        A list of `PacBioWellSummary` objects that corresponds to the page number
-        and size specified by the `page_size` and `page_number` attributes.
+        A list of `PacBioWellSummary` objects that corresponds to the page
+        specified by the `page_size` and either `page_number` or `cursor`
+        attributes.
         """,
     )
 
@@ -253,6 +297,8 @@ class PacBioWellFull(PacBioWell):
     @model_validator(mode="before")
     def pre_root(cls, values: dict[str, Any]) -> dict[str, Any]:
 
+        if not isinstance(values, ArgsKwargs):
+            return values
         assigned = super().pre_root(values)
         mlwh_db_row: PacBioRunWellMetrics = values.kwargs["db_well"]
         assigned["metrics"] = QCDataWell.from_orm(mlwh_db_row)
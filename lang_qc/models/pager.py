@@ -17,8 +17,49 @@
 # You should have received a copy of the GNU General Public License along with
 # this program. If not, see <http://www.gnu.org/licenses/>.
 
+import base64
+import binascii
+import json
+from datetime import datetime
+
 from pydantic import BaseModel, Field
 
+from lang_qc.util.errors import InvalidCursorError
+
+
+def encode_cursor(values: list) -> str:
+    """
+    Encodes a list of values into an opaque URL-safe string, a cursor.
+
+    The values should be either JSON-serializable or `datetime` objects.
+    The latter are encoded as ISO 8601 strings, see `decode_cursor`.
+    """
+
+    values = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    data = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list:
+    """
+    Decodes a cursor, which was generated by the `encode_cursor` function,
+    into a list of values. Values that were `datetime` objects are returned
+    as ISO 8601 strings, conversion back to `datetime` is the responsibility
+    of the caller.
+
+    `InvalidCursorError` is raised if the cursor cannot be decoded.
+    """
+
+    try:
+        data = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(data)
+    except (binascii.Error, ValueError):
+        raise InvalidCursorError(f"Invalid cursor '{cursor}'")
+    if not isinstance(values, list):
+        raise InvalidCursorError(f"Invalid cursor '{cursor}'")
+
+    return values
+
 
 class PagedResponse(BaseModel):
     """
@@ -51,6 +92,34 @@ class PagedResponse(BaseModel):
         """,
     )
 
+    cursor: str | None = Field(
+        default=None,
+        title="Position of the page",
+        description="""
+        An opaque token, which has been returned to the client as the value
+        of `next_cursor`. If set, the page starts immediately after the last
+        item of the page that returned this token and the `page_number` is
+        not used to locate the page. Unlike pages located by their numbers,
+        such pages do not shift when the data are changed concurrently.
+        """,
+    )
+    next_cursor: str | None = Field(
+        default=None,
+        title="Position of the next page",
+        description="""
+        An opaque token, which can be used as the `cursor` value to retrieve
+        the next page. Is not set if there are no items after this page.
+        """,
+    )
+
+    def offset(self) -> int:
+        """
+        Returns the number of items that precede the page specified by
+        this object's attributes. This value can be used directly in the
+        OFFSET clause of a database query.
+        """
+        return self.page_size * (self.page_number - 1)
+
     def slice_data(self, data: list) -> list:
         """
         A helper method to enable child classes to select pages in a uniform
@@ -60,6 +129,6 @@ class PagedResponse(BaseModel):
         to the page specified by this object's attributes. If the argument
         list is empty or shorter that expected, an empty list is returned.
         """
-        from_number = self.page_size * (self.page_number - 1)
+        from_number = self.offset()
         to_number = from_number + self.page_size
         return data[from_number:to_number]
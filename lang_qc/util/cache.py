@@ -0,0 +1,260 @@
+"""
+A cache for response models, which can be shared by server processes.
+
+Building well models requires retrieving the well, its product metrics,
+LIMS, study and sample data from the ml warehouse. The data for completed
+runs rarely change, so the models are cached. Each model is stored under
+a key, which consists of the model class name, the product ID and a version
+string. The version is computed from the data the model is built from, see
+`lang_qc.db.helper.wells.well_version`. When the data change, the version
+changes and a new model is built and cached. Stale entries are evicted in
+due course.
+
+The cache backend is configured by environment variables:
+
+    WELL_CACHE_BACKEND - "none" (default, no caching), "memory" or "redis"
+    WELL_CACHE_URL - the Redis server URL for the "redis" backend,
+        for example, redis://localhost:6379/0
+    WELL_CACHE_SIZE - the maximum number of entries in the "memory" cache,
+        defaults to 10000
+    WELL_CACHE_TTL - the number of seconds an entry is kept for, defaults
+        to 86400
+
+The "memory" cache belongs to a single server process. The "redis" cache
+can be used with any server, which supports the Redis protocol, and is
+shared by all server processes. The `redis` package is an optional
+dependency, which is only needed for this backend.
+
+The models are serialised as JSON and validated when they are read from
+the cache. An entry, which does not validate, for example, because the
+model class has changed, is treated as a cache miss.
+"""
+
+import functools
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Callable, Literal
+
+from pydantic import Field, TypeAdapter, ValidationError
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class CacheSettings(BaseSettings):
+
+    model_config = SettingsConfigDict(env_prefix="WELL_CACHE_")
+
+    backend: Literal["none", "memory", "redis"] = Field(
+        default="none", title="Cache backend"
+    )
+    url: str | None = Field(default=None, title="Redis server URL")
+    size: int = Field(
+        default=10000, gt=0, title="Maximum number of entries in the memory cache"
+    )
+    ttl: int = Field(
+        default=86400, gt=0, title="Number of seconds an entry is kept for"
+    )
+
+
+class Cache(ABC):
+    """
+    A base class for key-value caches. Keys are strings, values are bytes.
+    Subclasses implement `get_many` and `set_many`.
+    """
+
+    @abstractmethod
+    def get_many(self, keys: list[str]) -> dict[str, bytes]:
+        """
+        Returns a dictionary of the cached values for the keys. Keys, which
+        are not in the cache, are omitted.
+        """
+
+    @abstractmethod
+    def set_many(self, items: dict[str, bytes]):
+        """Stores the values under the keys of the dictionary."""
+
+    def get(self, key: str) -> bytes | None:
+        return self.get_many([key]).get(key)
+
+    def set(self, key: str, value: bytes):
+        self.set_many({key: value})
+
+
+class MemoryCache(Cache):
+    """
+    An in-process cache with a limited number of entries. The least
+    recently used entries are evicted first. Entries expire `ttl`
+    seconds after they were stored.
+    """
+
+    def __init__(self, max_size: int = 10000, ttl: float = 86400):
+
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, keys: list[str]) -> dict[str, bytes]:
+
+        now = time.monotonic()
+        found = {}
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is None:
+                    continue
+                (expires, value) = entry
+                if expires <= now:
+                    del self._entries[key]
+                    continue
+                self._entries.move_to_end(key)
+                found[key] = value
+
+        return found
+
+    def set_many(self, items: dict[str, bytes]):
+
+        expires = time.monotonic() + self.ttl
+        with self._lock:
+            for (key, value) in items.items():
+                self._entries[key] = (expires, value)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+
+class RedisCache(Cache):
+    """
+    A cache, which is kept by a server supporting the Redis protocol.
+    The `client` argument is an object with the interface of `redis.Redis`.
+    Keys are prefixed by the `prefix` argument. Entries expire `ttl`
+    seconds after they were stored.
+
+    The cache is not essential for serving requests. Errors talking to
+    the server are logged, failed lookups are reported as cache misses.
+    """
+
+    def __init__(self, client, ttl: int = 86400, prefix: str = "langqc:"):
+
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs) -> "RedisCache":
+        """
+        Creates a cache for the Redis server URL. The `redis` package
+        should be installed.
+        """
+
+        try:
+            import redis
+        except ImportError as err:
+            raise ImportError(
+                "The redis package is required for the redis cache backend"
+            ) from err
+
+        return cls(redis.Redis.from_url(url), **kwargs)
+
+    def get_many(self, keys: list[str]) -> dict[str, bytes]:
+
+        if len(keys) == 0:
+            return {}
+        try:
+            values = self.client.mget([self.prefix + key for key in keys])
+        except Exception as err:
+            logging.warning(f"Failed to get values from the cache: {err}")
+            return {}
+
+        return {key: value for (key, value) in zip(keys, values) if value is not None}
+
+    def set_many(self, items: dict[str, bytes]):
+
+        if len(items) == 0:
+            return
+        try:
+            pipeline = self.client.pipeline(transaction=False)
+            for (key, value) in items.items():
+                pipeline.set(self.prefix + key, value, ex=self.ttl)
+            pipeline.execute()
+        except Exception as err:
+            logging.warning(f"Failed to store values in the cache: {err}")
+
+
+@functools.cache
+def well_cache() -> Cache | None:
+    """
+    Returns the cache for well models as configured by the environment
+    variables, None if caching is disabled. The cache is created once
+    per process.
+    """
+
+    settings = CacheSettings()
+    if settings.backend == "memory":
+        return MemoryCache(max_size=settings.size, ttl=settings.ttl)
+    if settings.backend == "redis":
+        if settings.url is None:
+            raise ValueError("WELL_CACHE_URL should be set for the redis backend")
+        return RedisCache.from_url(settings.url, ttl=settings.ttl)
+
+    return None
+
+
+def cached_models(
+    cache: Cache | None,
+    model_class: type,
+    versions: dict[str, str],
+    build: Callable[[list[str]], dict],
+) -> dict:
+    """
+    Returns a dictionary of models of the `model_class` class keyed by
+    product IDs. The `versions` argument is a dictionary of version strings
+    for the models keyed by product IDs. The models, which are found in
+    the cache under the same product ID and version, are not rebuilt.
+
+    The `build` function is called with a list of product IDs, for which
+    the models are not cached, and should return a dictionary of new
+    models keyed by product IDs. It is not called if all models are cached.
+    The new models are stored in the cache. If the `cache` argument is None,
+    all models are built. The `build` function might return None in place
+    of a model.
+    """
+
+    if cache is None:
+        return build(list(versions))
+
+    keys = {
+        id_product: f"{model_class.__name__}:{id_product}:{version}"
+        for (id_product, version) in versions.items()
+    }
+    cached = cache.get_many(list(keys.values()))
+    adapter = _type_adapter(model_class)
+
+    models = {}
+    for (id_product, key) in keys.items():
+        if key in cached:
+            try:
+                models[id_product] = adapter.validate_json(cached[key])
+            except ValidationError as err:
+                logging.warning(f"Failed to load cached {key}: {err}")
+
+    missing = [id_product for id_product in keys if id_product not in models]
+    if len(missing) != 0:
+        new_models = build(missing)
+        cache.set_many(
+            {
+                keys[id_product]: adapter.dump_json(model)
+                for (id_product, model) in new_models.items()
+            }
+        )
+        models.update(new_models)
+
+    return models
+
+
+@functools.cache
+def _type_adapter(model_class: type) -> TypeAdapter:
+
+    return TypeAdapter(model_class | None)
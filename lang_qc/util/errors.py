@@ -32,3 +32,10 @@ class MissingLimsDataError(Exception):
     Exception to be used when product LIMS data is not available
     or partially missing.
     """
+
+
+class InvalidCursorError(Exception):
+    """
+    Exception to be used when a cursor, which defines the position of
+    a page of data, cannot be decoded or does not match the data.
+    """
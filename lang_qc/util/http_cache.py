@@ -0,0 +1,52 @@
+"""
+Helpers for HTTP caching and conditional requests.
+"""
+
+import hashlib
+
+from fastapi import Response
+
+
+def strong_etag(content: bytes) -> str:
+    """
+    Returns a quoted strong entity tag, which is derived from the content
+    of the response body.
+    """
+
+    return f'"{hashlib.sha256(content).hexdigest()}"'
+
+
+def weak_etag(*versions: str | None) -> str:
+    """
+    Returns a quoted weak entity tag, which is derived from the versions of
+    the data the response is built from rather than from the response body.
+    """
+
+    return f'W/"{hashlib.sha256(repr(versions).encode()).hexdigest()[:32]}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    Returns True if the value of the `If-None-Match` request header matches
+    the entity tag, False otherwise. As required for this header, the weak
+    comparison is used, i.e. the `W/` prefix of the tags is disregarded.
+    """
+
+    if if_none_match is None:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+
+    etag = etag.removeprefix("W/")
+    return any(
+        tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(",")
+    )
+
+
+def not_modified(headers: dict[str, str]) -> Response:
+    """
+    Returns an empty response with the 304 (Not Modified) status code and
+    the given headers.
+    """
+
+    return Response(status_code=304, headers=headers)
@@ -0,0 +1,275 @@
+"""
+Prometheus metrics for the LangQC server.
+
+HTTP requests are timed by `MetricsMiddleware`, which is added to the
+application. Latency and response size are recorded per route template,
+for example, /pacbio/products/{id_product}/seq_level, so that the
+number of time series does not depend on the values of path parameters.
+
+SQL statements are timed for each instrumented database engine, see
+`instrument_engine`. The timings of all statements are labelled by the
+database name. Finding the LangQC functions, which executed a statement,
+requires walking the call stack, see `calling_functions`. This is only
+done for every n-th statement, where n is set by the
+`STATEMENT_SAMPLING_INTERVAL` environment variable (defaults to 100,
+0 disables sampling). The timings of the sampled statements are recorded
+separately, labelled by the database name and the calling functions.
+
+Metrics for database connection pools, see `lang_qc.db.pool`, are
+collected when the metrics are scraped. The collector is registered when
+the application starts, see `register_pool_collector`.
+
+The metrics are kept in the memory of each server process. If the server
+runs several worker processes, set the `PROMETHEUS_MULTIPROC_DIR`
+environment variable to an empty directory, which is writable by all
+workers, before the server starts. The workers then write the metrics to
+files in this directory and a scrape of any of the workers returns the
+metrics of all of them, see `metrics_registry`.
+"""
+
+import functools
+import itertools
+import os
+import sys
+import time
+
+from prometheus_client import REGISTRY, CollectorRegistry, Histogram
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from prometheus_client.multiprocess import MultiProcessCollector
+from pydantic import Field
+from pydantic_settings import BaseSettings
+from sqlalchemy import Engine
+
+from lang_qc.db.pool import pool_status
+from lang_qc.db.timing import add_statement_consumer
+
+
+class MetricsSettings(BaseSettings):
+
+    statement_sampling_interval: int = Field(
+        default=100,
+        ge=0,
+        title="Interval, at which statements are attributed to calling functions",
+    )
+    prometheus_multiproc_dir: str | None = Field(
+        default=None,
+        title="Directory for the metrics of multiple server processes",
+    )
+
+
+REQUEST_DURATION = Histogram(
+    "langqc_http_request_duration_seconds",
+    "Time spent processing HTTP requests",
+    ["method", "route", "status"],
+)
+RESPONSE_SIZE = Histogram(
+    "langqc_http_response_size_bytes",
+    "Size of HTTP response bodies as sent to the client",
+    ["method", "route", "status"],
+    buckets=(100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000, float("inf")),
+)
+STATEMENT_DURATION_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+    float("inf"),
+)
+STATEMENT_DURATION = Histogram(
+    "langqc_db_statement_duration_seconds",
+    "Time spent executing SQL statements",
+    ["database"],
+    buckets=STATEMENT_DURATION_BUCKETS,
+)
+SAMPLED_STATEMENT_DURATION = Histogram(
+    "langqc_db_sampled_statement_duration_seconds",
+    "Time spent executing a sample of SQL statements by calling function",
+    ["database", "helper", "caller"],
+    buckets=STATEMENT_DURATION_BUCKETS,
+)
+
+"""
+A route label for requests, which do not match any route.
+"""
+UNMATCHED_ROUTE = "unmatched"
+
+settings = MetricsSettings()
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware, which records the latency, status code and response
+    size of HTTP requests.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        # If the response is not started, the server error middleware
+        # sends a response with the 500 status code.
+        response = {"status": 500, "size": 0}
+
+        async def send_and_measure(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+            elif message["type"] == "http.response.body":
+                response["size"] += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_and_measure)
+        finally:
+            # FastAPI records the matched route in the request scope.
+            route = scope.get("route")
+            labels = (
+                scope["method"],
+                UNMATCHED_ROUTE if route is None else route.path,
+                str(response["status"]),
+            )
+            REQUEST_DURATION.labels(*labels).observe(time.perf_counter() - start)
+            RESPONSE_SIZE.labels(*labels).observe(response["size"])
+
+
+def instrument_engine(engine: Engine, database: str):
+    """
+    Records the execution time of SQL statements, which are executed by the
+    engine. For an asynchronous engine its `sync_engine` attribute should
+    be given.
+    """
+
+    duration = STATEMENT_DURATION.labels(database)
+    counter = itertools.count()
+
+    def record(statement, parameters, elapsed):
+        duration.observe(elapsed)
+        interval = settings.statement_sampling_interval
+        if interval and next(counter) % interval == 0:
+            (helper, caller) = calling_functions()
+            SAMPLED_STATEMENT_DURATION.labels(database, helper, caller).observe(elapsed)
+
+    add_statement_consumer(engine, record)
+
+
+def calling_functions() -> tuple[str, str]:
+    """
+    Returns the names of the innermost function of the lang_qc package in
+    the current call stack and of the lang_qc function, which called it.
+    Anonymous functions and comprehensions are skipped. The names are
+    prefixed by the last component of the module name, for example,
+    `wells._upcoming_wells`. An empty string is returned in place of
+    a function, which is not found.
+    """
+
+    names = []
+    frame = sys._getframe(1)
+    while frame is not None and len(names) < 2:
+        module = frame.f_globals.get("__name__", "")
+        function = frame.f_code.co_name
+        if (
+            module.startswith("lang_qc.")
+            and module not in (__name__, "lang_qc.db.timing")
+            and not function.startswith("<")
+        ):
+            names.append(f"{module.rsplit('.', 1)[-1]}.{function}")
+        frame = frame.f_back
+
+    return tuple(names + [""] * (2 - len(names)))
+
+
+class PoolCollector:
+    """
+    Collects the state and checkout metrics of database connection pools,
+    see `lang_qc.db.pool.pool_status`. If the `pid` argument is given,
+    the metrics are also labelled by this process ID.
+    """
+
+    GAUGES = {
+        "size": "Configured pool size",
+        "checkedin": "Idle connections in the pool",
+        "checkedout": "Connections in use",
+        "overflow": "Connections above the pool size",
+        "wait_seconds_max": "Longest connection checkout time",
+    }
+    COUNTERS = {
+        "checkouts": "Connection checkouts",
+        "connections": "New connections",
+        "invalidations": "Invalidated connections",
+        "timeouts": "Checkouts that timed out because the pool was exhausted",
+        "wait_seconds": "Time spent checking out connections",
+    }
+
+    def __init__(self, pid: int | None = None):
+
+        self.labels = ["pool"]
+        self.label_values = []
+        if pid is not None:
+            self.labels.append("pid")
+            self.label_values.append(str(pid))
+
+    def collect(self):
+
+        status = pool_status()
+        for (key, documentation) in self.GAUGES.items():
+            family = GaugeMetricFamily(
+                f"langqc_db_pool_{key}", documentation, labels=self.labels
+            )
+            for (pool, values) in status.items():
+                if key in values:
+                    family.add_metric([pool] + self.label_values, values[key])
+            yield family
+        for (key, documentation) in self.COUNTERS.items():
+            family = CounterMetricFamily(
+                f"langqc_db_pool_{key}", documentation, labels=self.labels
+            )
+            value_key = "wait_seconds_total" if key == "wait_seconds" else key
+            for (pool, values) in status.items():
+                family.add_metric([pool] + self.label_values, values[value_key])
+            yield family
+
+
+@functools.cache
+def register_pool_collector():
+    """
+    Registers the collector of the connection pool metrics in the default
+    registry. Is called when the application starts, further calls have
+    no effect.
+    """
+
+    REGISTRY.register(PoolCollector())
+
+
+def metrics_registry() -> CollectorRegistry:
+    """
+    Returns the registry, which holds the metrics to be exported.
+
+    This is the default registry unless `PROMETHEUS_MULTIPROC_DIR` is set.
+    Otherwise, a new registry is returned, which aggregates the metrics of
+    all server processes from the files in that directory. The state of
+    connection pools cannot be aggregated, the pool metrics of the process,
+    which serves the scrape, are added and labelled by its process ID.
+    """
+
+    if settings.prometheus_multiproc_dir is None:
+        return REGISTRY
+
+    registry = CollectorRegistry()
+    MultiProcessCollector(registry, path=settings.prometheus_multiproc_dir)
+    registry.register(PoolCollector(pid=os.getpid()))
+
+    return registry
@@ -0,0 +1,207 @@
+"""
+Per-request accounting of SQL statements and a slow query log.
+
+`QueryLogMiddleware` creates a `RequestQueries` object for each HTTP
+request. The statements, which are executed by the instrumented database
+engines (see `track_queries`) while the request is processed, are counted
+and timed. The totals are reported to the client in the `Server-Timing`
+response header, for example:
+
+    Server-Timing: db;dur=12.5;desc="7 queries", mlwh;dur=9.1;desc="3 queries",
+        qcdb;dur=3.4;desc="4 queries"
+
+The durations are in milliseconds. Statements, which are executed after
+the response headers have been sent, for example, by streaming responses,
+are counted, but not reported.
+
+Statements, which take longer than the threshold set by the
+`SLOW_QUERY_THRESHOLD` environment variable (in seconds, defaults to 1),
+are logged together with the endpoint. The slow query log is disabled if
+the threshold is set to 0. Parameter values might contain sensitive data,
+therefore, by default, only the types of the parameters and the lengths of
+string values are logged. The values are logged if the
+`LOG_QUERY_PARAMETERS` environment variable is set to true.
+"""
+
+import logging
+import threading
+from contextvars import ContextVar
+
+from pydantic import Field
+from pydantic_settings import BaseSettings
+from sqlalchemy import Engine
+
+from lang_qc.db.timing import add_statement_consumer
+
+"""
+Maximum length of the logged string representation of statement parameters.
+"""
+MAX_LOGGED_PARAMETERS_LENGTH = 1000
+
+
+class QueryLogSettings(BaseSettings):
+
+    slow_query_threshold: float = Field(
+        default=1,
+        ge=0,
+        title="Statement execution time in seconds, above which it is logged",
+    )
+    log_query_parameters: bool = Field(
+        default=False,
+        title="Log the values of the parameters of slow statements",
+    )
+
+
+class RequestQueries:
+    """
+    Number and cumulative execution time of SQL statements per database
+    for a single HTTP request.
+    """
+
+    def __init__(self, scope: dict):
+
+        self.scope = scope
+        self.counts: dict[str, int] = {}
+        self.durations: dict[str, float] = {}
+        # Statements might be executed concurrently by different threads
+        # or tasks.
+        self._lock = threading.Lock()
+
+    def add(self, database: str, duration: float):
+
+        with self._lock:
+            self.counts[database] = self.counts.get(database, 0) + 1
+            self.durations[database] = self.durations.get(database, 0) + duration
+
+    def endpoint(self) -> str:
+        """
+        Returns the request method and the route template, or the URL path
+        if the request has not been matched to a route.
+        """
+
+        route = self.scope.get("route")
+        path = self.scope["path"] if route is None else route.path
+        return f"{self.scope['method']} {path}"
+
+    def server_timing(self) -> str:
+        """Returns a value for the `Server-Timing` header."""
+
+        with self._lock:
+            counts = dict(self.counts)
+            durations = dict(self.durations)
+
+        metrics = [("db", sum(counts.values()), sum(durations.values()))] + [
+            (database, counts[database], durations[database])
+            for database in sorted(counts)
+        ]
+        return ", ".join(
+            f"{name};dur={duration * 1000:.1f};"
+            f'desc="{count} {"query" if count == 1 else "queries"}"'
+            for (name, count, duration) in metrics
+        )
+
+
+_request_queries: ContextVar[RequestQueries | None] = ContextVar(
+    "request_queries", default=None
+)
+
+settings = QueryLogSettings()
+
+
+class QueryLogMiddleware:
+    """
+    ASGI middleware, which counts and times SQL statements executed while
+    processing an HTTP request and adds the `Server-Timing` header to the
+    response.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        queries = RequestQueries(scope)
+        token = _request_queries.set(queries)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"server-timing", queries.server_timing().encode("latin-1"))
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_queries.reset(token)
+
+
+def current_request_queries() -> RequestQueries | None:
+    """
+    Returns statement accounting for the HTTP request that is being
+    processed, None if the code is not run by the request.
+    """
+
+    return _request_queries.get()
+
+
+def track_queries(engine: Engine, database: str):
+    """
+    Counts and times SQL statements, which are executed by the engine, and
+    logs slow statements. For an asynchronous engine its `sync_engine`
+    attribute should be given.
+    """
+
+    def record(statement, parameters, duration):
+
+        queries = _request_queries.get()
+        if queries is not None:
+            queries.add(database, duration)
+
+        threshold = settings.slow_query_threshold
+        if threshold and duration > threshold:
+            endpoint = "no request" if queries is None else queries.endpoint()
+            if settings.log_query_parameters:
+                logged_parameters = repr(parameters)
+            else:
+                logged_parameters = describe_parameters(parameters)
+            if len(logged_parameters) > MAX_LOGGED_PARAMETERS_LENGTH:
+                logged_parameters = (
+                    logged_parameters[:MAX_LOGGED_PARAMETERS_LENGTH] + "..."
+                )
+            logging.warning(
+                f"Slow query on {database} ({duration:.3f} seconds, {endpoint}): "
+                f"{statement} Parameters: {logged_parameters}"
+            )
+
+    add_statement_consumer(engine, record)
+
+
+def describe_parameters(parameters) -> str:
+    """
+    Returns a description of statement parameters, which does not disclose
+    their values. Each value is represented by the name of its type, the
+    length of strings and bytes is given in square brackets. Dictionaries,
+    lists and tuples, for example, multiple sets of parameters of a single
+    statement, are described element by element.
+    """
+
+    def _describe(value):
+        if isinstance(value, dict):
+            return (
+                "{"
+                + ", ".join(f"{key}: {_describe(v)}" for (key, v) in value.items())
+                + "}"
+            )
+        if isinstance(value, (list, tuple)):
+            brackets = "[]" if isinstance(value, list) else "()"
+            return brackets[0] + ", ".join(_describe(v) for v in value) + brackets[1]
+        if isinstance(value, (str, bytes)):
+            return f"{type(value).__name__}[{len(value)}]"
+        return type(value).__name__
+
+    return _describe(parameters)
@@ -0,0 +1,16 @@
+#!/usr/bin/env python3
+
+# Brings the qc_flow_status table of the LangQC database in line with
+# the current sequencing QC states. Populates the table after it has been
+# created by the 2.5.0 database migration, which does not copy the existing
+# QC states. Should also be run after any changes to QC states or the
+# dictionary of QC states, which bypass the LangQC API.
+#
+# The database is defined by the QCDB_URL environment variable.
+
+from lang_qc.db.helper.qc import reconcile_qc_flow_statuses
+from lang_qc.db.qc_connection import get_qc_db
+
+session = next(get_qc_db())
+num_changed = reconcile_qc_flow_statuses(session)
+print(f"Deleted or created {num_changed} QC flow status rows")
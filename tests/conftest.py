@@ -4,16 +4,20 @@ import os
 import os.path
 import pathlib
 import re
+from contextlib import contextmanager
 
 import pytest
 import yaml
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine, insert, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import NullPool
 
-from lang_qc.db.mlwh_connection import get_mlwh_db
+from lang_qc.db.async_connection import create_async_db_engine
+from lang_qc.db.mlwh_connection import get_async_mlwh_db, get_mlwh_db
 from lang_qc.db.mlwh_schema import Base as MlwhBase
-from lang_qc.db.qc_connection import get_qc_db
+from lang_qc.db.qc_connection import get_async_qc_db, get_qc_db, get_qc_db_opener
 from lang_qc.db.qc_schema import Base as QcBase
 from lang_qc.main import app
 
@@ -186,8 +190,37 @@ def create_test_client(
         finally:
             db.close()
 
+    # The test client might run each request in a new event loop.
+    # Asynchronous database connections cannot be shared between
+    # event loops, therefore connections are not pooled.
+    async_mlwhdb_sessionfactory = async_sessionmaker(
+        create_async_db_engine(
+            mlwhdb_test_sessionfactory.kw["bind"].url, poolclass=NullPool
+        )
+    )
+    async_qcdb_sessionfactory = async_sessionmaker(
+        create_async_db_engine(
+            qcdb_test_sessionfactory.kw["bind"].url, poolclass=NullPool
+        )
+    )
+
+    async def override_get_async_mlwh_db():
+        db: AsyncSession
+        async with async_mlwhdb_sessionfactory() as db:
+            yield db
+
+    async def override_get_async_qc_db():
+        db: AsyncSession
+        async with async_qcdb_sessionfactory() as db:
+            yield db
+
     app.dependency_overrides[get_mlwh_db] = override_get_mlwh_db
     app.dependency_overrides[get_qc_db] = override_get_qc_db
+    app.dependency_overrides[get_qc_db_opener] = lambda: contextmanager(
+        override_get_qc_db
+    )
+    app.dependency_overrides[get_async_mlwh_db] = override_get_async_mlwh_db
+    app.dependency_overrides[get_async_qc_db] = override_get_async_qc_db
     client = TestClient(app)
 
     return client
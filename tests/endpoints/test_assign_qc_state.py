@@ -243,3 +243,93 @@ def test_permutations_of_plates(test_client: TestClient, load_data4well_retrieva
                 response.json()["detail"]
                 == "QC state of an unclaimed well cannot be updated"
             )
+
+
+def test_assign_states_bulk(test_client: TestClient, load_data4well_retrieval):
+    """Assign QC states to a number of wells"""
+
+    headers = {"OIDC_CLAIM_EMAIL": "zx80@example.com"}
+    id_product_1A1 = PacBioEntity(
+        run_name="TRACTION_RUN_1", well_label="A1"
+    ).hash_product_id()
+    id_product_15A1 = PacBioEntity(
+        run_name="TRACTION_RUN_15", well_label="A1", plate_number=1
+    ).hash_product_id()
+    id_product_unknown = PacBioEntity(
+        run_name="TRACTION_RUN_1", well_label="H1"
+    ).hash_product_id()
+    failed = {"qc_type": "sequencing", "qc_state": "Failed", "is_preliminary": True}
+    request_body = {id_product_2A1: failed, id_product_1A1: failed}
+
+    response = test_client.put(
+        "/pacbio/products/qc_assign", json={"12345q": failed}, headers=headers
+    )
+    assert response.status_code == 422
+
+    response = test_client.put("/pacbio/products/qc_assign", json=request_body)
+    assert response.status_code == 401
+
+    response = test_client.put(
+        "/pacbio/products/qc_assign",
+        json=request_body | {id_product_unknown: failed},
+        headers=headers,
+    )
+    assert response.status_code == 404
+    assert response.json()["detail"] == (
+        f"PacBio well for product ID {id_product_unknown} not found."
+    )
+
+    response = test_client.put(
+        "/pacbio/products/qc_assign",
+        json=request_body | {id_product_15A1: failed},
+        headers=headers,
+    )
+    assert response.status_code == 409
+    assert response.json()["detail"] == (
+        "QC state of an unclaimed well cannot be updated, "
+        f"product ID {id_product_15A1}"
+    )
+
+    response = test_client.put(
+        "/pacbio/products/qc_assign",
+        json={
+            id_product_2A1: failed,
+            id_product_1A1: {
+                "qc_type": "sequencing",
+                "qc_state": "On hold",
+                "is_preliminary": False,
+            },
+        },
+        headers=headers,
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"] == "QC state 'On hold' cannot be final"
+    # None of the QC states has changed.
+    for id_product in request_body:
+        response = test_client.get(f"/pacbio/products/{id_product}/seq_level")
+        assert response.json()["qc_state"]["qc_state"] != "Failed"
+
+    response = test_client.put(
+        "/pacbio/products/qc_assign", json=request_body, headers=headers
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert set(content.keys()) == set(request_body.keys())
+    for (id_product, qc_state) in content.items():
+        expected = {
+            "id_product": id_product,
+            "user": "zx80@example.com",
+            "qc_type": "sequencing",
+            "qc_state": "Failed",
+            "is_preliminary": True,
+            "created_by": "LangQC",
+            "outcome": False,
+        }
+        for key, value in expected.items():
+            assert qc_state[key] == value
+        response = test_client.get(f"/pacbio/products/{id_product}/seq_level")
+        assert response.json()["qc_state"] == qc_state
+
+    response = test_client.put("/pacbio/products/qc_assign", json={}, headers=headers)
+    assert response.status_code == 200
+    assert response.json() == {}
@@ -28,3 +28,28 @@ def test_get_config(test_client: TestClient, load_dicts_and_users):
         ],
     }
     assert response.json() == expected
+
+
+def test_get_config_conditional(test_client: TestClient, load_dicts_and_users):
+
+    response = test_client.get("/config")
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+    assert etag.startswith('"')
+    assert response.headers["Cache-Control"] == "no-cache"
+    body = response.json()
+
+    response = test_client.get("/config", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+
+    response = test_client.get(
+        "/config", headers={"If-None-Match": f'"other", W/{etag}'}
+    )
+    assert response.status_code == 304
+
+    response = test_client.get("/config", headers={"If-None-Match": '"other"'})
+    assert response.status_code == 200
+    assert response.headers["ETag"] == etag
+    assert response.json() == body
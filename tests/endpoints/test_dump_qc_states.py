@@ -1,8 +1,10 @@
+import json
 from datetime import datetime
 
 import pytest
 from fastapi.testclient import TestClient
 
+import lang_qc.db.helper.qc as qc_helper
 from tests.fixtures.well_data import load_data4well_retrieval, load_dicts_and_users
 
 
@@ -62,6 +64,69 @@ def test_get_qc_by_product_id(test_client: TestClient, load_data4well_retrieval)
     assert FIRST_GOOD_CHECKSUM in response_data
 
 
+def test_stream_qc_by_product_id(test_client: TestClient, load_data4well_retrieval):
+
+    # "TRACTION_RUN_1", "D1", "On hold", Final
+    FIRST_GOOD_CHECKSUM = (
+        "6657a34aa6159d7e2426f4732a84c51fa2d9186a4578e61ec21de4cb028fc800"
+    )
+    # "TRACTION_RUN_2", "B1", "Failed, Instrument", Preliminary
+    SECOND_GOOD_CHECKSUM = (
+        "e47765a207c810c2c281d5847e18c3015f3753b18bd92e8a2bea1219ba3127ea"
+    )
+    MISSING_CHECKSUM = "A" * 64
+
+    response = test_client.post("/products/qc/stream", json=[MISSING_CHECKSUM])
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert response.text == ""
+
+    response = test_client.post("/products/qc/stream", json=["AAAAAAAAAAAAAAAAAAA"])
+    assert response.status_code == 422
+
+    ids = [FIRST_GOOD_CHECKSUM, MISSING_CHECKSUM, SECOND_GOOD_CHECKSUM]
+    response = test_client.post("/products/qc/stream", json=ids)
+    assert response.status_code == 200
+    assert response.text.endswith("\n")
+    streamed = {}
+    for line in response.text.splitlines():
+        qc_state = json.loads(line)
+        streamed.setdefault(qc_state["id_product"], []).append(qc_state)
+
+    expected = test_client.post("/products/qc", json=ids).json()
+    assert len(streamed) == 2
+    assert streamed.keys() == expected.keys()
+    for id_product, qc_states in streamed.items():
+        assert sorted(qc_states, key=lambda o: o["qc_type"]) == sorted(
+            expected[id_product], key=lambda o: o["qc_type"]
+        )
+
+
+def test_stream_qc_in_batches(
+    test_client: TestClient, load_data4well_retrieval, monkeypatch
+):
+
+    # The rows are fetched one by one, the session should stay open
+    # until all of them are streamed.
+    monkeypatch.setattr(qc_helper, "QC_STATE_STREAM_BATCH_SIZE", 1)
+
+    ids = [
+        "6657a34aa6159d7e2426f4732a84c51fa2d9186a4578e61ec21de4cb028fc800",
+        "e47765a207c810c2c281d5847e18c3015f3753b18bd92e8a2bea1219ba3127ea",
+    ]
+    response = test_client.post("/products/qc/stream", json=ids)
+    assert response.status_code == 200
+    streamed = [json.loads(line) for line in response.text.splitlines()]
+
+    expected = [
+        qc_state
+        for qc_states in test_client.post("/products/qc", json=ids).json().values()
+        for qc_state in qc_states
+    ]
+    assert len(streamed) > 1
+    assert sorted(streamed, key=json.dumps) == sorted(expected, key=json.dumps)
+
+
 def test_get_qc(test_client: TestClient, load_data4well_retrieval):
 
     response = test_client.get("/products/qc")
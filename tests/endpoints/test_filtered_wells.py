@@ -26,6 +26,9 @@ def test_incorrect_filter(test_client: TestClient):
     response = test_client.get("/pacbio/wells?page_size=1")
     assert response.status_code == 422  # page number should be given
 
+    response = test_client.get("/pacbio/wells?page_size=1&page_number=1&cursor=xyz")
+    assert response.status_code == 422  # the cursor cannot be decoded
+
 
 def test_qc_complete_filter(test_client: TestClient, load_data4well_retrieval):
     """Test passing `qc_complete` filter."""
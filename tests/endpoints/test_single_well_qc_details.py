@@ -1,6 +1,8 @@
 from fastapi.testclient import TestClient
 from npg_id_generation.pac_bio import PacBioEntity
 
+from lang_qc.db.helper.wells import WellWh
+
 from tests.fixtures.well_data import load_data4well_retrieval, load_dicts_and_users
 
 
@@ -183,3 +185,87 @@ def test_get_pool_info(test_client: TestClient, mlwhdb_load_runs):
         "bc2054",
         "bc2063",
     }, "Correct products present"
+
+
+def test_conditional_requests(
+    test_client: TestClient,
+    mlwhdb_test_session,
+    load_dicts_and_users,
+    mlwhdb_load_runs,
+):
+    id_product = PacBioEntity(
+        run_name="TRACTION-RUN-1140", well_label="D1", plate_number=1
+    ).hash_product_id()
+    urls = [
+        f"/pacbio/products/{id_product}/seq_level",
+        f"/pacbio/products/{id_product}/seq_level/pool",
+        f"/pacbio/wells/{id_product}/libraries",
+    ]
+
+    etags = {}
+    for url in urls:
+        response = test_client.get(url)
+        assert response.status_code == 200
+        etag = response.headers["ETag"]
+        assert etag.startswith('W/"')
+        assert response.headers["Cache-Control"] == "no-cache"
+        body = response.json()
+        etags[url] = etag
+
+        response = test_client.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["ETag"] == etag
+
+        response = test_client.get(url, headers={"If-None-Match": f'"other", {etag}'})
+        assert response.status_code == 304
+
+        response = test_client.get(url, headers={"If-None-Match": '"other"'})
+        assert response.status_code == 200
+        assert response.headers["ETag"] == etag
+        assert response.json() == body
+    assert len(set(etags.values())) == 3
+
+    # A change of the QC state changes the entity tag for the sequencing
+    # QC data only.
+    response = test_client.post(
+        f"/pacbio/products/{id_product}/qc_claim",
+        headers={"OIDC_CLAIM_EMAIL": "zx80@example.com"},
+    )
+    assert response.status_code == 201
+    for url in urls:
+        response = test_client.get(url, headers={"If-None-Match": etags[url]})
+        if url.endswith("seq_level"):
+            assert response.status_code == 200
+            assert response.headers["ETag"] != etags[url]
+            assert response.json()["qc_state"]["qc_state"] == "Claimed"
+        else:
+            assert response.status_code == 304
+
+    # Renaming a sample of the well changes the entity tag for the library
+    # data.
+    url = f"/pacbio/wells/{id_product}/libraries"
+    well = WellWh(session=mlwhdb_test_session).get_mlwh_well_by_product_id(
+        id_product, with_lims_data=True
+    )
+    sample = well.pac_bio_product_metrics[0].pac_bio_run.sample
+    sample_name = sample.name
+    sample.name = "Renamed sample"
+    mlwhdb_test_session.commit()
+    try:
+        response = test_client.get(url, headers={"If-None-Match": etags[url]})
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etags[url]
+        assert "Renamed sample" in [
+            library["sample_name"] for library in response.json()["libraries"]
+        ]
+    finally:
+        sample.name = sample_name
+        mlwhdb_test_session.commit()
+
+    unknown_id = PacBioEntity(run_name="UNKNOWN", well_label="A1").hash_product_id()
+    for url in urls:
+        response = test_client.get(
+            url.replace(id_product, unknown_id), headers={"If-None-Match": "*"}
+        )
+        assert response.status_code == 404
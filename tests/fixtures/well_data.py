@@ -4,6 +4,7 @@ import pytest
 from npg_id_generation.pac_bio import PacBioEntity
 from sqlalchemy import insert, select
 
+from lang_qc.db.helper.qc import reconcile_qc_flow_statuses
 from lang_qc.db.mlwh_schema import PacBioRunWellMetrics
 from lang_qc.db.qc_schema import (
     QcState,
@@ -893,6 +894,9 @@ def load_data4well_retrieval(
             qcdb_test_session.add(qc_state)
 
     qcdb_test_session.commit()
+    # QC states were created directly, the QC flow statuses have to be
+    # brought up to date.
+    reconcile_qc_flow_statuses(qcdb_test_session)
 
     # We want some wells to be in the inbox. For that their run_complete dates
     # should be within, for example, last four weeks. Therefore, we need to
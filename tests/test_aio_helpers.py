@@ -0,0 +1,38 @@
+import asyncio
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from lang_qc.db.helper.aio import gather
+
+
+def test_gather():
+
+    session1 = AsyncSession()
+    session2 = AsyncSession()
+    session3 = AsyncSession()
+
+    results = asyncio.run(
+        gather(
+            (lambda session: ("one", session), session1),
+            (lambda s2, s3: ("two", s2, s3), session2, session3),
+        )
+    )
+    assert results == [
+        ("one", session1.sync_session),
+        ("two", session2.sync_session, session3.sync_session),
+    ]
+
+    with pytest.raises(ValueError, match=r"Concurrent calls cannot share a session"):
+        asyncio.run(
+            gather(
+                (lambda session: 1, session1),
+                (lambda session: 2, session1),
+            )
+        )
+
+    def fail(session):
+        raise KeyError("some key")
+
+    with pytest.raises(KeyError, match=r"some key"):
+        asyncio.run(gather((lambda session: 1, session1), (fail, session2)))
@@ -0,0 +1,163 @@
+import pytest
+
+from lang_qc.util.cache import (
+    Cache,
+    MemoryCache,
+    RedisCache,
+    cached_models,
+    well_cache,
+)
+
+
+class LocalRedis:
+    """A stand-in for a Redis client, which keeps data in memory."""
+
+    def __init__(self):
+        self.data = {}
+        self.expiry = {}
+        self.available = True
+
+    def mget(self, keys):
+        self._check()
+        return [self.data.get(key) for key in keys]
+
+    def pipeline(self, transaction=True):
+        return LocalPipeline(self)
+
+    def _check(self):
+        if not self.available:
+            raise ConnectionError("Server is not available")
+
+
+class LocalPipeline:
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def set(self, key, value, ex=None):
+        self.commands.append((key, value, ex))
+
+    def execute(self):
+        self.client._check()
+        for (key, value, ex) in self.commands:
+            self.client.data[key] = value
+            self.client.expiry[key] = ex
+
+
+def test_cache_interface():
+    class IncompleteCache(Cache):
+        def get_many(self, keys):
+            return {}
+
+    with pytest.raises(TypeError):
+        IncompleteCache()
+
+
+def test_memory_cache(monkeypatch):
+
+    cache = MemoryCache(max_size=2, ttl=10)
+    assert cache.get("one") is None
+    cache.set("one", b"1")
+    cache.set_many({"two": b"2", "three": b"3"})
+    # The least recently used entry is evicted.
+    assert cache.get_many(["one", "two", "three"]) == {"two": b"2", "three": b"3"}
+
+    cache.get("two")
+    cache.set("four", b"4")
+    assert cache.get_many(["two", "three", "four"]) == {"two": b"2", "four": b"4"}
+
+    now = 1000
+    monkeypatch.setattr("lang_qc.util.cache.time.monotonic", lambda: now)
+    cache.set("five", b"5")
+    now = 1009
+    assert cache.get("five") == b"5"
+    now = 1010
+    assert cache.get("five") is None
+
+
+def test_redis_cache():
+
+    client = LocalRedis()
+    cache = RedisCache(client, ttl=60, prefix="test:")
+    assert cache.get_many([]) == {}
+    assert cache.get("one") is None
+    cache.set_many({"one": b"1", "two": b"2"})
+    assert client.data == {"test:one": b"1", "test:two": b"2"}
+    assert client.expiry == {"test:one": 60, "test:two": 60}
+    assert cache.get_many(["one", "two", "three"]) == {"one": b"1", "two": b"2"}
+
+    # Errors are not propagated.
+    client.available = False
+    assert cache.get("one") is None
+    cache.set("three", b"3")
+    client.available = True
+    assert cache.get("three") is None
+
+
+def test_cached_models():
+
+    built = []
+
+    def build(ids):
+        built.append(ids)
+        return {id: {"id": id, "version": len(built)} for id in ids}
+
+    versions = {"a": "1", "b": "1"}
+    expected = {"a": {"id": "a", "version": 1}, "b": {"id": "b", "version": 1}}
+    assert cached_models(None, dict, versions, build) == expected
+    assert built == [["a", "b"]]
+
+    for cache in [MemoryCache(), RedisCache(LocalRedis())]:
+        built.clear()
+        assert cached_models(cache, dict, versions, build) == expected
+        assert cached_models(cache, dict, versions, build) == expected
+        assert built == [["a", "b"]]
+        # A new version of a model is built.
+        models = cached_models(cache, dict, {"a": "1", "b": "2", "c": "1"}, build)
+        assert built == [["a", "b"], ["b", "c"]]
+        assert models == {
+            "a": {"id": "a", "version": 1},
+            "b": {"id": "b", "version": 2},
+            "c": {"id": "c", "version": 2},
+        }
+
+
+def test_invalid_cached_model_is_rebuilt():
+
+    built = []
+
+    def build(ids):
+        built.append(ids)
+        return {id: {"id": id} for id in ids}
+
+    cache = MemoryCache()
+    cache.set_many({"dict:a:1": b"{not json", "dict:b:1": b"[1, 2]"})
+    versions = {"a": "1", "b": "1"}
+    expected = {"a": {"id": "a"}, "b": {"id": "b"}}
+    assert cached_models(cache, dict, versions, build) == expected
+    assert built == [["a", "b"]]
+    # The rebuilt models replace the invalid entries.
+    assert cached_models(cache, dict, versions, build) == expected
+    assert built == [["a", "b"]]
+
+
+def test_cache_configuration(monkeypatch):
+
+    monkeypatch.delenv("WELL_CACHE_BACKEND", raising=False)
+    well_cache.cache_clear()
+    assert well_cache() is None
+
+    monkeypatch.setenv("WELL_CACHE_BACKEND", "memory")
+    monkeypatch.setenv("WELL_CACHE_SIZE", "5")
+    well_cache.cache_clear()
+    cache = well_cache()
+    assert isinstance(cache, MemoryCache)
+    assert cache.max_size == 5
+    assert well_cache() is cache
+
+    monkeypatch.setenv("WELL_CACHE_BACKEND", "redis")
+    well_cache.cache_clear()
+    with pytest.raises(ValueError, match=r"WELL_CACHE_URL should be set"):
+        well_cache()
+
+    well_cache.cache_clear()
@@ -0,0 +1,74 @@
+import asyncio
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import TimeoutError
+
+from lang_qc.db import qc_connection
+from lang_qc.db.pool import ConnectionSettings, engine_options, pool_status
+
+
+def test_connection_settings(monkeypatch):
+
+    settings = ConnectionSettings(_env_prefix="QCDB_")
+    assert engine_options(settings) == {
+        "pool_size": 5,
+        "max_overflow": 10,
+        "pool_timeout": 30,
+        "pool_recycle": 3600,
+        "pool_pre_ping": False,
+    }
+    assert settings.statement_timeout is None
+
+    monkeypatch.setenv("QCDB_URL", "mysql+pymysql://user@host/db")
+    monkeypatch.setenv("QCDB_POOL_SIZE", "20")
+    monkeypatch.setenv("QCDB_POOL_PRE_PING", "true")
+    monkeypatch.setenv("QCDB_STATEMENT_TIMEOUT", "5000")
+    monkeypatch.setenv("DB_POOL_SIZE", "2")
+    settings = ConnectionSettings(_env_prefix="QCDB_")
+    assert settings.url == "mysql+pymysql://user@host/db"
+    assert settings.pool_size == 20
+    assert settings.pool_pre_ping is True
+    assert settings.statement_timeout == 5000
+    assert ConnectionSettings(_env_prefix="DB_").pool_size == 2
+
+
+def test_pool_metrics_and_exhaustion(monkeypatch, qcdb_test_sessionfactory):
+
+    url = qcdb_test_sessionfactory.kw["bind"].url
+    monkeypatch.setenv("QCDB_URL", url.render_as_string(hide_password=False))
+    monkeypatch.setenv("QCDB_POOL_SIZE", "1")
+    monkeypatch.setenv("QCDB_POOL_MAX_OVERFLOW", "0")
+    monkeypatch.setenv("QCDB_POOL_TIMEOUT", "0.1")
+    monkeypatch.setenv("QCDB_STATEMENT_TIMEOUT", "2000")
+
+    qc_connection.init_engines()
+    try:
+        sessions = qc_connection.get_qc_db()
+        session = next(sessions)
+        # A connection is checked out when the session is first used.
+        assert pool_status()["qcdb"]["checkouts"] == 0
+        assert (
+            session.execute(text("SELECT @@SESSION.max_execution_time")).scalar_one()
+            == 2000
+        )
+
+        # The only connection in the pool is in use.
+        other_session = next(qc_connection.get_qc_db())
+        with pytest.raises(TimeoutError):
+            other_session.execute(text("SELECT 1"))
+        status = pool_status()["qcdb"]
+        assert status["size"] == 1
+        assert status["checkedout"] == 1
+        assert status["checkouts"] == 1
+        assert status["connections"] == 1
+        assert status["timeouts"] == 1
+
+        sessions.close()
+        status = pool_status()["qcdb"]
+        assert status["checkedout"] == 0
+        assert status["checkedin"] == 1
+        assert status["wait_seconds_total"] > 0
+    finally:
+        asyncio.run(qc_connection.dispose_engines())
+    assert qc_connection.engine is None
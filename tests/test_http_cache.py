@@ -0,0 +1,29 @@
+from lang_qc.util.http_cache import etag_matches, strong_etag, weak_etag
+
+
+def test_etag_matching():
+
+    etag = strong_etag(b"some content")
+    assert etag.startswith('"') and etag.endswith('"')
+    assert etag == strong_etag(b"some content")
+    assert etag != strong_etag(b"other content")
+
+    assert etag_matches(None, etag) is False
+    assert etag_matches("*", etag) is True
+    assert etag_matches(etag, etag) is True
+    assert etag_matches(f"W/{etag}", etag) is True
+    assert etag_matches(etag, f"W/{etag}") is True
+    assert etag_matches(f'"one", {etag}, "two"', etag) is True
+    assert etag_matches('"one", "two"', etag) is False
+    assert etag_matches(etag[1:-1], etag) is False
+
+
+def test_weak_etag():
+
+    etag = weak_etag("PacBioWellFull", "version", None)
+    assert etag.startswith('W/"') and etag.endswith('"')
+    assert etag == weak_etag("PacBioWellFull", "version", None)
+    assert etag != weak_etag("PacBioWellFull", "version", "QC state version")
+    assert etag != weak_etag("QCPoolMetrics", "version", None)
+    assert etag_matches(etag, etag) is True
+    assert etag_matches(etag.removeprefix("W/"), etag) is True
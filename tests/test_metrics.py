@@ -0,0 +1,158 @@
+import os
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY, Histogram, values
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from lang_qc.db.helper.dictionary import dictionary_ids
+from lang_qc.db.qc_schema import QcType
+from lang_qc.endpoints import metrics
+from lang_qc.util.metrics import (
+    MetricsMiddleware,
+    PoolCollector,
+    instrument_engine,
+    metrics_registry,
+    register_pool_collector,
+)
+from lang_qc.util.metrics import settings as metrics_settings
+
+
+def test_request_metrics():
+
+    app = FastAPI()
+    app.include_router(metrics.router)
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/items/{id}")
+    def get_item(id: int):
+        return {"id": id}
+
+    labels = {"method": "GET", "route": "/items/{id}", "status": "200"}
+    count = REGISTRY.get_sample_value(
+        "langqc_http_request_duration_seconds_count", labels
+    )
+    size = REGISTRY.get_sample_value("langqc_http_response_size_bytes_sum", labels)
+
+    client = TestClient(app)
+    assert client.get("/items/1").json() == {"id": 1}
+    assert client.get("/items/2").status_code == 200
+    assert client.get("/items/three").status_code == 422
+    assert client.get("/other").status_code == 404
+
+    assert (
+        REGISTRY.get_sample_value("langqc_http_request_duration_seconds_count", labels)
+        == (count or 0) + 2
+    )
+    assert (
+        REGISTRY.get_sample_value("langqc_http_response_size_bytes_sum", labels)
+        == (size or 0) + 16
+    )
+    assert REGISTRY.get_sample_value(
+        "langqc_http_request_duration_seconds_count",
+        {"method": "GET", "route": "/items/{id}", "status": "422"},
+    )
+    assert REGISTRY.get_sample_value(
+        "langqc_http_request_duration_seconds_count",
+        {"method": "GET", "route": "unmatched", "status": "404"},
+    )
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'route="/items/{id}"' in response.text
+
+
+def test_statement_metrics(monkeypatch):
+
+    engine = create_engine("sqlite://")
+    with engine.begin() as connection:
+        connection.execute(
+            text("CREATE TABLE qc_type (id_qc_type INTEGER PRIMARY KEY, qc_type TEXT)")
+        )
+    # Attribute every statement to the calling functions.
+    monkeypatch.setattr(metrics_settings, "statement_sampling_interval", 1)
+    instrument_engine(engine, "testdb")
+
+    labels = {
+        "database": "testdb",
+        "helper": "dictionary._load",
+        "caller": "dictionary.cached_value",
+    }
+    with Session(engine) as session:
+        assert dictionary_ids(session, QcType) == {}
+    assert (
+        REGISTRY.get_sample_value(
+            "langqc_db_statement_duration_seconds_count", {"database": "testdb"}
+        )
+        == 1
+    )
+    assert (
+        REGISTRY.get_sample_value(
+            "langqc_db_sampled_statement_duration_seconds_count", labels
+        )
+        == 1
+    )
+
+    # Sampling is disabled, the statements are still timed.
+    monkeypatch.setattr(metrics_settings, "statement_sampling_interval", 0)
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+    assert (
+        REGISTRY.get_sample_value(
+            "langqc_db_statement_duration_seconds_count", {"database": "testdb"}
+        )
+        == 2
+    )
+    assert (
+        REGISTRY.get_sample_value(
+            "langqc_db_sampled_statement_duration_seconds_count", labels
+        )
+        == 1
+    )
+
+
+def test_metrics_registry(monkeypatch, tmp_path):
+
+    status = {
+        "testpool": {
+            "size": 2,
+            "checkedin": 1,
+            "checkedout": 1,
+            "overflow": 0,
+            "wait_seconds_max": 0.5,
+            "checkouts": 3,
+            "connections": 1,
+            "invalidations": 0,
+            "timeouts": 0,
+            "wait_seconds_total": 0.75,
+        }
+    }
+    monkeypatch.setattr("lang_qc.util.metrics.pool_status", lambda: status)
+
+    # The pool collector is registered once.
+    register_pool_collector()
+    register_pool_collector()
+    assert metrics_registry() is REGISTRY
+    assert (
+        REGISTRY.get_sample_value(
+            "langqc_db_pool_checkouts_total", {"pool": "testpool"}
+        )
+        == 3
+    )
+
+    # Metrics of multiple processes. A metric of another process is
+    # written to the directory.
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+    monkeypatch.setattr(values, "ValueClass", values.MultiProcessValue(lambda: 1))
+    Histogram("langqc_test_seconds", "Test histogram", registry=None).observe(0.5)
+    monkeypatch.setattr(metrics_settings, "prometheus_multiproc_dir", str(tmp_path))
+
+    registry = metrics_registry()
+    assert registry is not REGISTRY
+    assert registry.get_sample_value("langqc_test_seconds_count") == 1
+    labels = {"pool": "testpool", "pid": str(os.getpid())}
+    assert registry.get_sample_value("langqc_db_pool_checkouts_total", labels) == 3
+    assert registry.get_sample_value("langqc_db_pool_size", labels) == 2
+    assert list(PoolCollector().collect())[0].samples[0].labels == {"pool": "testpool"}
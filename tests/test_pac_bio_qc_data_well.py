@@ -1,5 +1,6 @@
 import pytest
 from npg_id_generation.pac_bio import PacBioEntity
+from pydantic import TypeAdapter
 
 from lang_qc.db.helper.wells import WellWh
 from lang_qc.models.pacbio.qc_data import QCDataWell, QCPoolMetrics
@@ -103,6 +104,23 @@ def test_creating_qc_data_well(mlwhdb_test_session, mlwhdb_load_runs):
     ), "Absent metrics mean this is set to none"
 
 
+def test_qc_data_well_field_plan():
+
+    plan = QCDataWell.field_plan()
+    assert QCDataWell.field_plan() is plan
+    properties = QCDataWell.model_json_schema()["properties"]
+    assert [field.name for field in plan] == [
+        name for name in properties if name != "smrt_link"
+    ]
+    for field in plan:
+        assert field.label == properties[field.name]["title"]
+    assert {field.name: field.columns for field in plan}["p1_num"] == (
+        "p0_num",
+        "p1_num",
+        "p2_num",
+    )
+
+
 def test_pool_metrics_from_single_sample_well(mlwhdb_test_session, simplex_run):
     """
     Applies to samples where deplexing was left as an exercise for the user.
@@ -157,6 +175,9 @@ def test_pool_metrics_from_well(mlwhdb_test_session, multiplexed_run):
         metrics.products[1].sample_name == "It's a test"
     ), "Sample name added to products when present"
 
+    adapter = TypeAdapter(QCPoolMetrics)
+    assert adapter.validate_json(adapter.dump_json(metrics_via_db)) == metrics_via_db
+
 
 def test_errors_instantiating_pool_metrics(mlwhdb_test_session):
 
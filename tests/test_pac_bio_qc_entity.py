@@ -1,7 +1,10 @@
 from npg_id_generation.pac_bio import PacBioEntity
 from sqlalchemy import select
 
-from lang_qc.db.helper.well import well_seq_product_find_or_create
+from lang_qc.db.helper.well import (
+    well_seq_product_find_or_create,
+    wells_seq_products_find_or_create,
+)
 from lang_qc.db.mlwh_schema import PacBioRunWellMetrics
 from lang_qc.db.qc_schema import SeqProduct
 from tests.fixtures.well_data import load_data4well_retrieval, load_dicts_and_users
@@ -88,3 +91,62 @@ def test_create_well_record(
     assert sub_product.value_attr_two == "B1"
     assert sub_product.sub_product_attr__.attr_name == "plate_number"
     assert sub_product.value_attr_three is None
+
+
+def test_find_or_create_well_records(
+    mlwhdb_test_session, qcdb_test_session, load_data4well_retrieval
+):
+
+    ids = [
+        PacBioEntity(
+            run_name="TRACTION_RUN_2", well_label="A1", plate_number=1
+        ).hash_product_id(),
+        PacBioEntity(
+            run_name="TRACTION_RUN_3", well_label="A1", plate_number=1
+        ).hash_product_id(),
+    ]
+    mlwh_rows = (
+        mlwhdb_test_session.execute(
+            select(PacBioRunWellMetrics).where(
+                PacBioRunWellMetrics.id_pac_bio_product.in_(ids)
+            )
+        )
+        .scalars()
+        .all()
+    )
+    assert len(mlwh_rows) == 2
+    existing = qcdb_test_session.execute(
+        select(SeqProduct).where(SeqProduct.id_product == ids[0])
+    ).scalar_one()
+    assert (
+        qcdb_test_session.execute(
+            select(SeqProduct).where(SeqProduct.id_product == ids[1])
+        )
+        .scalars()
+        .one_or_none()
+        is None
+    )
+
+    assert wells_seq_products_find_or_create(qcdb_test_session, []) == {}
+
+    seq_products = wells_seq_products_find_or_create(qcdb_test_session, mlwh_rows)
+    assert set(seq_products.keys()) == set(ids)
+    assert seq_products[ids[0]].id_seq_product == existing.id_seq_product
+    seq_product = seq_products[ids[1]]
+    assert seq_product.id_seq_product is not None
+    assert seq_product.seq_platform.name == "PacBio"
+    sub_product = seq_product.sub_products[0]
+    assert sub_product.value_attr_one == "TRACTION_RUN_3"
+    assert sub_product.value_attr_two == "A1"
+    assert sub_product.value_attr_three == "1"
+
+    # New records are not committed.
+    qcdb_test_session.rollback()
+    assert (
+        qcdb_test_session.execute(
+            select(SeqProduct).where(SeqProduct.id_product == ids[1])
+        )
+        .scalars()
+        .one_or_none()
+        is None
+    )
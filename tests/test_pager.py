@@ -1,4 +1,9 @@
-from lang_qc.models.pager import PagedResponse
+from datetime import datetime
+
+import pytest
+
+from lang_qc.models.pager import PagedResponse, decode_cursor, encode_cursor
+from lang_qc.util.errors import InvalidCursorError
 
 
 def test_slicing():
@@ -23,3 +28,30 @@ def test_slicing():
 
     pager = PagedResponse(page_size=25, page_number=1)
     assert pager.slice_data(input_list) == input_list
+
+
+def test_offset():
+
+    assert PagedResponse(page_size=5, page_number=1).offset() == 0
+    assert PagedResponse(page_size=5, page_number=3).offset() == 10
+    assert PagedResponse(page_size=1, page_number=7).offset() == 6
+
+
+def test_cursor_encoding():
+
+    values = ["IN_PROGRESS", datetime(2022, 12, 8, 9, 15, 19), 5, None, "A1"]
+    cursor = encode_cursor(values)
+    assert isinstance(cursor, str)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == [
+        "IN_PROGRESS",
+        "2022-12-08T09:15:19",
+        5,
+        None,
+        "A1",
+    ]
+    assert decode_cursor(encode_cursor([])) == []
+
+    for cursor in ["!!!", "e30", "bm90IGpzb24"]:  # invalid, a dict, not json
+        with pytest.raises(InvalidCursorError, match=r"Invalid cursor"):
+            decode_cursor(cursor)
@@ -1,5 +1,6 @@
 import pytest
 from npg_id_generation.pac_bio import PacBioEntity
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
 
 from lang_qc.db.helper.qc import get_qc_states_by_id_product_list
@@ -7,9 +8,11 @@ from lang_qc.db.helper.wells import WellWh
 from lang_qc.db.mlwh_schema import PacBioRunWellMetrics
 from lang_qc.models.pacbio.experiment import PacBioLibrary
 from lang_qc.models.pacbio.well import (
+    PacBioWell,
     PacBioWellFull,
     PacBioWellLibraries,
     PacBioWellSummary,
+    get_column_mapping,
 )
 from lang_qc.util.errors import MissingLimsDataError
 from tests.conftest import compare_dates
@@ -90,6 +93,22 @@ def _examine_well_model_c1(pb_well: PacBioRunWellMetrics, id_product: str):
     assert pb_well.instrument_type == "Revio"
 
 
+def test_column_mapping():
+
+    mapping = get_column_mapping(PacBioWell)
+    assert get_column_mapping(PacBioWell) is mapping
+    assert ("well_label", "well_label") in mapping
+    assert ("pac_bio_run_name", "pac_bio_run_name") in mapping
+    assert ("plate_number", "plate_number") in mapping
+    fields = {field for (field, _) in mapping}
+    assert "db_well" not in fields
+    assert "qc_state" not in fields
+    assert "label" not in fields
+    # Fields, which are not populated from the well row, are not included.
+    for model_class in [PacBioWellSummary, PacBioWellLibraries, PacBioWellFull]:
+        assert get_column_mapping(model_class) == mapping
+
+
 def test_create_full_model(
     mlwhdb_test_session, qcdb_test_session, load_data4well_retrieval, mlwhdb_load_runs
 ):
@@ -154,6 +173,24 @@ def test_create_summary_and_library_models(
     _examine_well_model_c1(pb_well, well_row.id_pac_bio_product)
 
 
+def test_json_round_trip(
+    mlwhdb_test_session, qcdb_test_session, load_data4well_retrieval, mlwhdb_load_runs
+):
+    """Models, which are cached as JSON, are restored from it unchanged."""
+
+    for (run_name, well_label) in [("TRACTION-RUN-92", "A1"), ("TRACTION_RUN_1", "B1")]:
+        (well_row, qc_state) = _prepare_data(
+            mlwhdb_test_session, qcdb_test_session, run_name, well_label
+        )
+        model_classes = [PacBioWellSummary, PacBioWellFull]
+        if well_row.get_experiment_info():
+            model_classes.append(PacBioWellLibraries)
+        for model_class in model_classes:
+            pb_well = model_class(db_well=well_row, qc_state=qc_state)
+            adapter = TypeAdapter(model_class)
+            assert adapter.validate_json(adapter.dump_json(pb_well)) == pb_well
+
+
 def test_create_summary_and_library_models_lims_info(
     mlwhdb_test_session, qcdb_test_session, load_data4well_retrieval, mlwhdb_load_runs
 ):
@@ -2,11 +2,18 @@ import pytest
 from npg_id_generation.pac_bio import PacBioEntity
 from sqlalchemy import select
 
-from lang_qc.db.helper.wells import PacBioPagedWellsFactory, RunNotFoundError
+from lang_qc.db.helper.wells import (
+    InvalidCursorError,
+    PacBioPagedWellsFactory,
+    RunNotFoundError,
+    WellWh,
+)
 from lang_qc.db.qc_schema import QcState, QcType, SeqProduct
 from lang_qc.models.pacbio.well import PacBioPagedWells, PacBioWellSummary
+from lang_qc.models.pager import encode_cursor
 from lang_qc.models.qc_flow_status import QcFlowStatusEnum
 from lang_qc.models.qc_state import QcState as QcStateModel
+from lang_qc.util.cache import MemoryCache
 from tests.conftest import compare_dates
 from tests.fixtures.well_data import load_data4well_retrieval, load_dicts_and_users
 
@@ -504,3 +511,153 @@ def test_retrieval_for_unknown_status(
         paged_wells.total_number_of_items == 1
     ), """assigning sequencing qc state to a well removes it
           from the selection for the unknown status"""
+
+
+def test_cursor_paged_retrieval(
+    qcdb_test_session, mlwhdb_test_session, load_data4well_retrieval
+):
+    def _retrieve(status, page_size, page_number=1, cursor=None):
+        factory = PacBioPagedWellsFactory(
+            qcdb_session=qcdb_test_session,
+            mlwh_session=mlwhdb_test_session,
+            page_size=page_size,
+            page_number=page_number,
+            cursor=cursor,
+        )
+        if status is None:
+            return factory.create_for_run("TRACTION_RUN_1")
+        return factory.create_for_qc_status(status)
+
+    def _well_ids(paged_wells):
+        return [(w.run_name, w.label, w.plate_number) for w in paged_wells.wells]
+
+    for status in [s for s in QcFlowStatusEnum] + [None]:
+        # Retrieve all wells in one go.
+        paged_wells = _retrieve(status, 100)
+        assert paged_wells.next_cursor is None
+        expected = _well_ids(paged_wells)
+        total_number_of_items = paged_wells.total_number_of_items
+
+        # Retrieve the same wells page by page, following the cursor.
+        retrieved = []
+        cursor = None
+        num_pages = 0
+        while True:
+            paged_wells = _retrieve(status, 2, cursor=cursor)
+            assert isinstance(paged_wells, PacBioPagedWells)
+            assert paged_wells.cursor == cursor
+            assert paged_wells.page_number == (1 if cursor is None else None)
+            assert paged_wells.total_number_of_items == total_number_of_items
+            retrieved.extend(_well_ids(paged_wells))
+            num_pages += 1
+            cursor = paged_wells.next_cursor
+            if cursor is None:
+                break
+        assert retrieved == expected
+        assert num_pages <= max(1, (total_number_of_items + 1) // 2)
+
+        # The cursor from the first page leads to the second page.
+        cursor = _retrieve(status, 1).next_cursor
+        if total_number_of_items > 1:
+            assert _well_ids(_retrieve(status, 1, cursor=cursor)) == _well_ids(
+                _retrieve(status, 1, page_number=2)
+            )
+
+    with pytest.raises(InvalidCursorError, match=r"Invalid cursor 'bad cursor'"):
+        _retrieve(QcFlowStatusEnum.INBOX, 2, cursor="bad cursor")
+
+    cursor = _retrieve(QcFlowStatusEnum.IN_PROGRESS, 2).next_cursor
+    with pytest.raises(InvalidCursorError, match=r"does not match the data"):
+        _retrieve(QcFlowStatusEnum.ON_HOLD, 2, cursor=cursor)
+    with pytest.raises(InvalidCursorError, match=r"does not match the data"):
+        _retrieve(None, 2, cursor=cursor)
+
+    # Values, which do not match the types of the sort key columns.
+    # The sort key is the run name, plate number, well label and row ID.
+    name = "run:TRACTION_RUN_1"
+    for values in [
+        [1, None, "A1", 1],
+        ["TRACTION_RUN_1", "1", "A1", 1],
+        ["TRACTION_RUN_1", None, "A1", True],
+        ["TRACTION_RUN_1", None, "A1", None],
+        ["TRACTION_RUN_1", None, ["A1"], 1],
+    ]:
+        with pytest.raises(InvalidCursorError, match=r"does not match the data"):
+            _retrieve(None, 2, cursor=encode_cursor([name] + values))
+    # The plate number is nullable.
+    paged_wells = _retrieve(
+        None, 2, cursor=encode_cursor([name, "TRACTION_RUN_1", None, "A1", 0])
+    )
+    assert paged_wells.page_number is None
+    assert len(paged_wells.wells) != 0
+
+
+def test_batched_qc_state_lookup(
+    qcdb_test_session, mlwhdb_test_session, load_data4well_retrieval, monkeypatch
+):
+    def _retrieve(status):
+        paged_wells = PacBioPagedWellsFactory(
+            qcdb_session=qcdb_test_session,
+            mlwh_session=mlwhdb_test_session,
+            page_size=100,
+            page_number=1,
+        ).create_for_qc_status(status)
+        return (
+            paged_wells.total_number_of_items,
+            [(w.run_name, w.label, w.plate_number) for w in paged_wells.wells],
+        )
+
+    statuses = [
+        QcFlowStatusEnum.INBOX,
+        QcFlowStatusEnum.UPCOMING,
+        QcFlowStatusEnum.UNKNOWN,
+    ]
+    expected = {status: _retrieve(status) for status in statuses}
+    # Query the LangQC database for one or two products at a time.
+    for batch_size in (1, 2):
+        monkeypatch.setattr("lang_qc.db.helper.qc.ID_LIST_BATCH_SIZE", batch_size)
+        for status in statuses:
+            assert _retrieve(status) == expected[status]
+
+
+def test_cached_well_summaries(
+    qcdb_test_session, mlwhdb_test_session, load_data4well_retrieval
+):
+    def _retrieve(status, cache):
+        factory = PacBioPagedWellsFactory(
+            qcdb_session=qcdb_test_session,
+            mlwh_session=mlwhdb_test_session,
+            page_size=100,
+            page_number=1,
+            cache=cache,
+        )
+        if status is None:
+            return factory.create_for_run("TRACTION_RUN_1").wells
+        return factory.create_for_qc_status(status).wells
+
+    cache = MemoryCache()
+    statuses = [s for s in QcFlowStatusEnum] + [None]
+    for status in statuses:
+        expected = _retrieve(status, None)
+        # The first time the summaries are built and cached, the second time
+        # they are retrieved from the cache.
+        assert _retrieve(status, cache) == expected
+        num_entries = len(cache._entries)
+        assert _retrieve(status, cache) == expected
+        assert len(cache._entries) == num_entries
+    assert num_entries != 0
+
+    # A change to the well row invalidates the cached summary.
+    well = _retrieve(None, cache)[0]
+    db_well = WellWh(mlwh_session=mlwhdb_test_session).get_mlwh_well_by_product_id(
+        well.id_product
+    )
+    db_well.well_status = "Failed"
+    try:
+        summaries = _retrieve(None, cache)
+        assert summaries[0].id_product == well.id_product
+        assert summaries[0].well_status == "Failed"
+        assert summaries[0].study_names == well.study_names
+    finally:
+        mlwhdb_test_session.rollback()
+    assert _retrieve(None, cache)[0] == well
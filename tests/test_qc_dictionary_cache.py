@@ -0,0 +1,71 @@
+from sqlalchemy import delete, insert, select
+
+import lang_qc.db.helper.dictionary as dictionary_module
+from lang_qc.db.helper.dictionary import (
+    dictionary_id,
+    dictionary_ids,
+    invalidate_dictionary_cache,
+)
+from lang_qc.db.qc_schema import QcStateDict, QcType, SeqPlatform, SubProductAttr
+from tests.fixtures.well_data import load_dicts_and_users
+
+
+def test_dictionary_retrieval(qcdb_test_session, load_dicts_and_users):
+
+    invalidate_dictionary_cache()
+
+    for (dictionary, key_column, id_column) in (
+        (QcType, QcType.qc_type, QcType.id_qc_type),
+        (QcStateDict, QcStateDict.state, QcStateDict.id_qc_state_dict),
+        (SeqPlatform, SeqPlatform.name, SeqPlatform.id_seq_platform),
+        (SubProductAttr, SubProductAttr.attr_name, SubProductAttr.id_attr),
+    ):
+        expected = {
+            row[0]: row[1]
+            for row in qcdb_test_session.execute(select(key_column, id_column))
+        }
+        assert len(expected) != 0
+        assert dictionary_ids(qcdb_test_session, dictionary) == expected
+        for (key, id) in expected.items():
+            assert dictionary_id(qcdb_test_session, dictionary, key) == id
+        assert dictionary_id(qcdb_test_session, dictionary, "some value") is None
+
+
+def test_dictionary_caching(qcdb_test_session, load_dicts_and_users, monkeypatch):
+
+    invalidate_dictionary_cache()
+    ids = dictionary_ids(qcdb_test_session, QcType)
+    assert "test_type" not in ids
+
+    qcdb_test_session.execute(
+        insert(QcType), [{"qc_type": "test_type", "description": "Test type"}]
+    )
+    qcdb_test_session.commit()
+
+    # Cached value is returned.
+    assert dictionary_ids(qcdb_test_session, QcType) == ids
+    # If the value is not cached, the dictionary is reloaded.
+    id = dictionary_id(qcdb_test_session, QcType, "test_type")
+    assert id is not None
+    assert dictionary_ids(qcdb_test_session, QcType)["test_type"] == id
+
+    qcdb_test_session.execute(delete(QcType).where(QcType.qc_type == "test_type"))
+    qcdb_test_session.commit()
+    assert dictionary_id(qcdb_test_session, QcType, "test_type") == id
+
+    invalidate_dictionary_cache(qcdb_test_session.get_bind())
+    assert dictionary_id(qcdb_test_session, QcType, "test_type") is None
+
+    # Values loaded with zero time to live expire immediately.
+    monkeypatch.setattr(dictionary_module, "DICTIONARY_CACHE_TTL", 0)
+    invalidate_dictionary_cache()
+    assert "test_type" not in dictionary_ids(qcdb_test_session, QcType)
+    qcdb_test_session.execute(
+        insert(QcType), [{"qc_type": "test_type", "description": "Test type"}]
+    )
+    qcdb_test_session.commit()
+    assert "test_type" in dictionary_ids(qcdb_test_session, QcType)
+
+    qcdb_test_session.execute(delete(QcType).where(QcType.qc_type == "test_type"))
+    qcdb_test_session.commit()
+    invalidate_dictionary_cache()
@@ -2,10 +2,24 @@ from datetime import datetime
 
 import pytest
 from npg_id_generation.pac_bio import PacBioEntity
-from sqlalchemy import select
-
-from lang_qc.db.helper.qc import assign_qc_state_to_product, claim_qc_for_product
-from lang_qc.db.qc_schema import QcState, QcStateHist, SeqProduct, User
+from sqlalchemy import delete, select
+
+from lang_qc.db.helper.qc import (
+    assign_qc_state_to_product,
+    assign_qc_states_to_products,
+    claim_qc_for_product,
+    qc_flow_status_for_qc_state,
+    reconcile_qc_flow_statuses,
+)
+from lang_qc.db.qc_schema import (
+    QcFlowStatus,
+    QcState,
+    QcStateHist,
+    QcType,
+    SeqProduct,
+    User,
+)
+from lang_qc.models.qc_flow_status import QcFlowStatusEnum
 from lang_qc.models.qc_state import QcStateBasic
 from lang_qc.util.errors import InconsistentInputError
 from tests.fixtures.well_data import (
@@ -44,6 +58,8 @@ def test_claim_qc(qcdb_test_session, load_data4well_retrieval, load_data4qc_assi
     hist_objs = _hist_objects(qcdb_test_session, id_seq_product)
     assert len(hist_objs) == 1
     _test_hist_object(state_obj, hist_objs[0])
+    assert state_obj.qc_flow_status.qc_flow_status == "in_progress"
+    assert state_obj.qc_flow_status.date_updated == state_obj.date_updated
 
     # Call the function again for the same product, but with a different
     # user. New QC state record is not created, the user record is not
@@ -207,6 +223,306 @@ def test_assign_qc_errors(
         assign_qc_state_to_product(session=qcdb_test_session, **args)
 
 
+def test_assign_qc_states_bulk(
+    qcdb_test_session, load_data4well_retrieval, load_data4qc_assign
+):
+
+    users = qcdb_test_session.execute(select(User)).scalars().all()
+    id_seq_platform = (
+        qcdb_test_session.execute(select(SeqProduct)).scalars().first().id_seq_platform
+    )
+    # Products without QC states.
+    ids = [
+        PacBioEntity(run_name="BULK_QC_RUN", well_label=label).hash_product_id()
+        for label in ["A1", "B1"]
+    ]
+    seq_products = [
+        SeqProduct(id_product=id, id_seq_platform=id_seq_platform) for id in ids
+    ]
+    qcdb_test_session.add_all(seq_products)
+    qcdb_test_session.commit()
+    id_seq_products = [p.id_seq_product for p in seq_products]
+
+    assert assign_qc_states_to_products(qcdb_test_session, [], users[0]) == []
+
+    claimed = QcStateBasic(
+        qc_state="Claimed", qc_type="sequencing", is_preliminary=True
+    )
+    passed = QcStateBasic(qc_state="Passed", qc_type="sequencing", is_preliminary=False)
+    failed = QcStateBasic(qc_state="Failed", qc_type="library", is_preliminary=False)
+
+    # None of the QC states is assigned if one of them is invalid.
+    with pytest.raises(
+        InconsistentInputError, match=r"QC state 'Claimed' cannot be final"
+    ):
+        assign_qc_states_to_products(
+            qcdb_test_session,
+            [
+                (seq_products[0], claimed),
+                (
+                    seq_products[1],
+                    QcStateBasic(
+                        qc_state="Claimed", qc_type="sequencing", is_preliminary=False
+                    ),
+                ),
+            ],
+            users[0],
+        )
+    with pytest.raises(
+        InconsistentInputError,
+        match=r"Multiple QC states of type 'sequencing' for product",
+    ):
+        assign_qc_states_to_products(
+            qcdb_test_session,
+            [(seq_products[0], claimed), (seq_products[0], passed)],
+            users[0],
+        )
+    for id_seq_product in id_seq_products:
+        assert _num_qc_state_objects(qcdb_test_session, id_seq_product) == 0
+
+    state_objs = assign_qc_states_to_products(
+        qcdb_test_session, [(p, claimed) for p in seq_products], users[0]
+    )
+    assert len(state_objs) == 2
+    for (state_obj, id) in zip(state_objs, ids):
+        assert state_obj.seq_product.id_product == id
+        assert state_obj.qc_state_dict.state == "Claimed"
+        assert state_obj.user == users[0]
+        assert state_obj.created_by == "LangQC"
+        assert state_obj.date_created == state_obj.date_updated
+        assert state_obj.qc_flow_status.qc_flow_status == "in_progress"
+        hist_objs = _hist_objects(qcdb_test_session, state_obj.id_seq_product)
+        assert len(hist_objs) == 1
+        _test_hist_object(state_obj, hist_objs[0])
+
+    # The state of the first product does not change, the second product
+    # gets a new state and a new QC state of a different type.
+    past_date = datetime(year=2021, month=4, day=7, hour=11, minute=56, second=6)
+    new_state_objs = assign_qc_states_to_products(
+        qcdb_test_session,
+        [
+            (seq_products[0], claimed),
+            (seq_products[1], passed),
+            (seq_products[1], failed),
+        ],
+        users[1],
+        application="MyScript",
+        date_updated=past_date,
+    )
+    assert len(new_state_objs) == 3
+    assert new_state_objs[0] == state_objs[0]
+    assert new_state_objs[0].user == users[0]
+    assert len(_hist_objects(qcdb_test_session, id_seq_products[0])) == 1
+
+    state_obj = new_state_objs[1]
+    assert state_obj == state_objs[1]
+    assert state_obj.qc_state_dict.state == "Passed"
+    assert state_obj.is_preliminary == 0
+    assert state_obj.user == users[1]
+    assert state_obj.created_by == "MyScript"
+    assert state_obj.date_updated == past_date
+    assert state_obj.date_created.year == time_now.year
+    assert state_obj.qc_flow_status.qc_flow_status == "qc_complete"
+    assert state_obj.qc_flow_status.date_updated == past_date
+
+    state_obj = new_state_objs[2]
+    assert state_obj.qc_type.qc_type == "library"
+    assert state_obj.qc_state_dict.state == "Failed"
+    assert state_obj.date_created == past_date
+    assert state_obj.qc_flow_status is None
+
+    assert _num_qc_state_objects(qcdb_test_session, id_seq_products[1]) == 2
+    hist_objs = _hist_objects(qcdb_test_session, id_seq_products[1])
+    assert len(hist_objs) == 3
+
+
+def test_update_qc_states_in_place(
+    qcdb_test_session, load_data4well_retrieval, load_data4qc_assign
+):
+    """
+    Existing QC states and their QC flow statuses are updated rather than
+    replaced, each update is recorded in the history.
+    """
+
+    def _flow_statuses(state_objs):
+        return {
+            row.id_qc_state: row
+            for row in qcdb_test_session.execute(
+                select(QcFlowStatus).where(
+                    QcFlowStatus.id_qc_state.in_([s.id_qc_state for s in state_objs])
+                )
+            ).scalars()
+        }
+
+    user = qcdb_test_session.execute(select(User)).scalars().first()
+    id_seq_platform = (
+        qcdb_test_session.execute(select(SeqProduct)).scalars().first().id_seq_platform
+    )
+    seq_products = [
+        SeqProduct(
+            id_product=PacBioEntity(
+                run_name="UPSERT_QC_RUN", well_label=label
+            ).hash_product_id(),
+            id_seq_platform=id_seq_platform,
+        )
+        for label in ["A1", "B1"]
+    ]
+    qcdb_test_session.add_all(seq_products)
+    qcdb_test_session.commit()
+
+    claimed = QcStateBasic(
+        qc_state="Claimed", qc_type="sequencing", is_preliminary=True
+    )
+    state_objs = assign_qc_states_to_products(
+        qcdb_test_session, [(p, claimed) for p in seq_products], user
+    )
+    id_qc_states = [s.id_qc_state for s in state_objs]
+    id_flow_statuses = {
+        id: row.id_qc_flow_status for (id, row) in _flow_statuses(state_objs).items()
+    }
+
+    # The timestamps are set by the database.
+    passed = QcStateBasic(qc_state="Passed", qc_type="sequencing", is_preliminary=False)
+    state_objs = assign_qc_states_to_products(
+        qcdb_test_session, [(p, passed) for p in seq_products], user
+    )
+    assert [s.id_qc_state for s in state_objs] == id_qc_states
+    flow_statuses = _flow_statuses(state_objs)
+    for state_obj in state_objs:
+        assert _num_qc_state_objects(qcdb_test_session, state_obj.id_seq_product) == 1
+        assert state_obj.qc_state_dict.state == "Passed"
+        assert state_obj.is_preliminary == 0
+        hist_objs = _hist_objects(qcdb_test_session, state_obj.id_seq_product)
+        assert len(hist_objs) == 2
+        assert hist_objs[0].id_qc_state_dict != hist_objs[1].id_qc_state_dict
+        _test_hist_object(state_obj, hist_objs[1])
+        flow_status = flow_statuses[state_obj.id_qc_state]
+        assert flow_status.id_qc_flow_status == id_flow_statuses[state_obj.id_qc_state]
+        assert flow_status.qc_flow_status == "qc_complete"
+        assert flow_status.date_updated == state_obj.date_updated
+
+    # A preset timestamp for one of the products.
+    past_date = datetime(year=2021, month=4, day=7, hour=11, minute=56, second=6)
+    on_hold = QcStateBasic(
+        qc_state="On hold", qc_type="sequencing", is_preliminary=True
+    )
+    (state_obj,) = assign_qc_states_to_products(
+        qcdb_test_session, [(seq_products[0], on_hold)], user, date_updated=past_date
+    )
+    assert state_obj.id_qc_state == id_qc_states[0]
+    assert state_obj.date_updated == past_date
+    hist_objs = _hist_objects(qcdb_test_session, state_obj.id_seq_product)
+    assert len(hist_objs) == 3
+    _test_hist_object(state_obj, hist_objs[2])
+    qcdb_test_session.expire_all()
+    flow_statuses = _flow_statuses(state_objs)
+    assert len(flow_statuses) == 2
+    flow_status = flow_statuses[id_qc_states[0]]
+    assert flow_status.id_qc_flow_status == id_flow_statuses[id_qc_states[0]]
+    assert flow_status.qc_flow_status == "on_hold"
+    assert flow_status.date_updated == past_date
+    # The other product is not changed.
+    assert flow_statuses[id_qc_states[1]].qc_flow_status == "qc_complete"
+    assert len(_hist_objects(qcdb_test_session, seq_products[1].id_seq_product)) == 2
+
+
+def test_qc_flow_status_for_qc_state():
+
+    assert qc_flow_status_for_qc_state("Claimed", True) == QcFlowStatusEnum.IN_PROGRESS
+    assert qc_flow_status_for_qc_state("Passed", 1) == QcFlowStatusEnum.IN_PROGRESS
+    assert qc_flow_status_for_qc_state("On hold", 1) == QcFlowStatusEnum.ON_HOLD
+    assert (
+        qc_flow_status_for_qc_state("On hold external", True)
+        == QcFlowStatusEnum.ON_HOLD
+    )
+    assert qc_flow_status_for_qc_state("Passed", False) == QcFlowStatusEnum.QC_COMPLETE
+    assert qc_flow_status_for_qc_state("Failed", 0) == QcFlowStatusEnum.QC_COMPLETE
+
+
+def test_qc_flow_status_maintenance(
+    qcdb_test_session, load_data4well_retrieval, load_data4qc_assign
+):
+    def _check_flow_statuses():
+        qc_states = (
+            qcdb_test_session.execute(
+                select(QcState).join(QcType).where(QcType.qc_type == "sequencing")
+            )
+            .scalars()
+            .all()
+        )
+        num_rows = len(qcdb_test_session.execute(select(QcFlowStatus)).all())
+        assert num_rows == len(qc_states)
+        for qc_state in qc_states:
+            flow_status = qc_state.qc_flow_status
+            assert flow_status.date_updated == qc_state.date_updated
+            assert (
+                flow_status.qc_flow_status
+                == qc_flow_status_for_qc_state(
+                    qc_state.qc_state_dict.state, qc_state.is_preliminary
+                ).value
+            )
+
+    _check_flow_statuses()
+    assert reconcile_qc_flow_statuses(qcdb_test_session) == 0
+
+    id = PacBioEntity(run_name="TRACTION_RUN_1", well_label="A1").hash_product_id()
+    seq_product = qcdb_test_session.execute(
+        select(SeqProduct).where(SeqProduct.id_product == id)
+    ).scalar_one()
+    user = qcdb_test_session.execute(select(User)).scalars().first()
+
+    args = {"session": qcdb_test_session, "seq_product": seq_product, "user": user}
+    for qc_state, is_preliminary, expected_status in (
+        ("On hold", True, "on_hold"),
+        ("Passed", True, "in_progress"),
+        ("Passed", False, "qc_complete"),
+    ):
+        args["qc_state"] = QcStateBasic(
+            qc_state=qc_state, qc_type="sequencing", is_preliminary=is_preliminary
+        )
+        state_obj = assign_qc_state_to_product(**args)
+        assert state_obj.qc_flow_status.qc_flow_status == expected_status
+        assert state_obj.qc_flow_status.date_updated == state_obj.date_updated
+        _check_flow_statuses()
+
+    # Assigning a library QC state does not create a QC flow status.
+    args["qc_state"] = QcStateBasic(
+        qc_state="Failed", qc_type="library", is_preliminary=False
+    )
+    state_obj = assign_qc_state_to_product(**args)
+    assert state_obj.qc_flow_status is None
+    _check_flow_statuses()
+
+    # Change the QC state bypassing the API and delete a QC flow status
+    # for another QC state.
+    state_obj = seq_product.qc_state[0]
+    if state_obj.qc_type.qc_type != "sequencing":
+        state_obj = seq_product.qc_state[1]
+    state_obj.is_preliminary = 1
+    qcdb_test_session.add(state_obj)
+    qcdb_test_session.commit()
+    id_qc_flow_status = (
+        qcdb_test_session.execute(
+            select(QcFlowStatus.id_qc_flow_status).where(
+                QcFlowStatus.id_qc_state != state_obj.id_qc_state
+            )
+        )
+        .scalars()
+        .first()
+    )
+    qcdb_test_session.execute(
+        delete(QcFlowStatus).where(QcFlowStatus.id_qc_flow_status == id_qc_flow_status)
+    )
+    qcdb_test_session.commit()
+
+    # One stale row is deleted, two rows are created.
+    assert reconcile_qc_flow_statuses(qcdb_test_session) == 3
+    qcdb_test_session.expire_all()
+    _check_flow_statuses()
+    assert state_obj.qc_flow_status.qc_flow_status == "in_progress"
+    assert reconcile_qc_flow_statuses(qcdb_test_session) == 0
+
+
 def _test_hist_object(state_obj, hist_obj):
 
     assert state_obj.date_created == hist_obj.date_created
@@ -7,9 +7,11 @@ from lang_qc.db.helper.qc import (
     get_qc_state_for_product,
     get_qc_states,
     get_qc_states_by_id_product_list,
+    in_batches,
     product_has_qc_state,
     products_have_qc_state,
     qc_state_dict,
+    stream_qc_states_by_id_product_list,
 )
 from lang_qc.db.qc_schema import QcState
 from lang_qc.models.qc_state import QcState as QcStateModel
@@ -72,6 +74,89 @@ def test_bulk_retrieval_by_id(qcdb_test_session, load_data4well_retrieval):
     assert MISSING_CHECKSUM not in qc_states
 
 
+def test_streamed_bulk_retrieval_by_id(qcdb_test_session, load_data4well_retrieval):
+    def _key(qc_state):
+        return (qc_state.id_product, qc_state.qc_type)
+
+    def _streamed(ids, **kwargs):
+        qc_states = stream_qc_states_by_id_product_list(
+            qcdb_test_session, ids, **kwargs
+        )
+        return sorted(qc_states, key=_key)
+
+    def _expected(ids, **kwargs):
+        qc_states = get_qc_states_by_id_product_list(qcdb_test_session, ids, **kwargs)
+        return sorted(
+            [qc_state for states in qc_states.values() for state in states],
+            key=_key,
+        )
+
+    assert _streamed(["dodo"]) == []
+    assert _streamed([MISSING_CHECKSUM]) == []
+
+    ids = two_good_ids_list + [MISSING_CHECKSUM, NO_SEQ_QC_CHECKSUM]
+    qc_states = _streamed(ids)
+    assert len(qc_states) == 5
+    assert all(isinstance(qc_state, QcStateModel) for qc_state in qc_states)
+    assert qc_states == _expected(ids)
+
+    qc_states = _streamed(ids, sequencing_outcomes_only=True)
+    assert len(qc_states) == 2
+    assert {qc_state.qc_type for qc_state in qc_states} == {"sequencing"}
+    assert qc_states == _expected(ids, sequencing_outcomes_only=True)
+
+
+def test_in_batches():
+
+    assert list(in_batches([])) == []
+    assert list(in_batches(["a", "b", "c"])) == [["a", "b", "c"]]
+    assert list(in_batches(["a", "b", "c"], 2)) == [["a", "b"], ["c"]]
+    assert list(in_batches(["a", "b", "a", "c", "b"], 1)) == [["a"], ["b"], ["c"]]
+    with pytest.raises(ValueError, match=r"batch_size should be a positive number"):
+        list(in_batches(["a"], 0))
+
+
+def test_batched_retrieval_by_id(
+    qcdb_test_session, load_data4well_retrieval, monkeypatch
+):
+
+    ids = [
+        SECOND_GOOD_CHECKSUM,
+        MISSING_CHECKSUM,
+        FIRST_GOOD_CHECKSUM,
+        NO_LIB_QC_CHECKSUM,
+        NO_SEQ_QC_CHECKSUM,
+        FIRST_GOOD_CHECKSUM,
+    ]
+    expected = {}
+    for seq_only in (True, False):
+        expected[seq_only] = (
+            get_qc_states_by_id_product_list(qcdb_test_session, ids, seq_only),
+            products_have_qc_state(qcdb_test_session, ids, seq_only),
+            sorted(
+                stream_qc_states_by_id_product_list(qcdb_test_session, ids, seq_only),
+                key=lambda o: (o.id_product, o.qc_type),
+            ),
+        )
+    assert len(expected[False][0]) == 4
+    assert len(expected[False][0][FIRST_GOOD_CHECKSUM]) == 2
+    assert len(expected[True][1]) == 3
+
+    for batch_size in (1, 2):
+        monkeypatch.setattr("lang_qc.db.helper.qc.ID_LIST_BATCH_SIZE", batch_size)
+        for seq_only in (True, False):
+            assert expected[seq_only] == (
+                get_qc_states_by_id_product_list(qcdb_test_session, ids, seq_only),
+                products_have_qc_state(qcdb_test_session, ids, seq_only),
+                sorted(
+                    stream_qc_states_by_id_product_list(
+                        qcdb_test_session, ids, seq_only
+                    ),
+                    key=lambda o: (o.id_product, o.qc_type),
+                ),
+            )
+
+
 def test_bulk_retrieval(qcdb_test_session, load_data4well_retrieval):
 
     with pytest.raises(ValueError, match=r"num_weeks should be a positive number"):
@@ -0,0 +1,86 @@
+import logging
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+import lang_qc.util.query_log as query_log_module
+from lang_qc.util.query_log import (
+    QueryLogMiddleware,
+    current_request_queries,
+    describe_parameters,
+    track_queries,
+)
+
+
+def test_query_counting_and_slow_query_log(monkeypatch, caplog):
+
+    engine = create_engine("sqlite://")
+    track_queries(engine, "testdb")
+
+    app = FastAPI()
+    app.add_middleware(QueryLogMiddleware)
+
+    @app.get("/sync/{number}")
+    def run_sync_queries(number: int):
+        with engine.connect() as connection:
+            for i in range(number):
+                connection.execute(text("SELECT :i"), {"i": i})
+        return current_request_queries().counts
+
+    @app.get("/async")
+    async def run_async_queries():
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+        return current_request_queries().counts
+
+    @app.get("/none")
+    def run_no_queries():
+        return {}
+
+    client = TestClient(app)
+
+    response = client.get("/sync/3")
+    assert response.json() == {"testdb": 3}
+    timing = response.headers["server-timing"].split(", ")
+    assert len(timing) == 2
+    assert timing[0].startswith("db;dur=")
+    assert timing[0].endswith(';desc="3 queries"')
+    assert timing[1].startswith("testdb;dur=")
+
+    response = client.get("/async")
+    assert response.json() == {"testdb": 1}
+    assert response.headers["server-timing"].endswith(';desc="1 query"')
+
+    response = client.get("/none")
+    assert response.headers["server-timing"] == 'db;dur=0.0;desc="0 queries"'
+
+    # Statements executed outside of requests are not counted.
+    assert current_request_queries() is None
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+    assert "Slow query" not in caplog.text
+    monkeypatch.setattr(query_log_module.settings, "slow_query_threshold", 1e-9)
+    with caplog.at_level(logging.WARNING):
+        client.get("/sync/1")
+    assert "Slow query on testdb" in caplog.text
+    assert "GET /sync/{number}" in caplog.text
+    # Parameter values are not logged by default.
+    assert "SELECT ? Parameters: (int)" in caplog.text
+
+    caplog.clear()
+    monkeypatch.setattr(query_log_module.settings, "log_query_parameters", True)
+    with caplog.at_level(logging.WARNING):
+        client.get("/sync/1")
+    assert "SELECT ? Parameters: (0,)" in caplog.text
+
+
+def test_describe_parameters():
+
+    assert describe_parameters(()) == "()"
+    assert describe_parameters((1, "secret", None)) == "(int, str[6], NoneType)"
+    assert describe_parameters({"id": 1, "name": b"ab"}) == "{id: int, name: bytes[2]}"
+    assert (
+        describe_parameters([(1, "a"), (2, "bb")]) == "[(int, str[1]), (int, str[2])]"
+    )
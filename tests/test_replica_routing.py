@@ -0,0 +1,121 @@
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from lang_qc.db.pool import POOL_METRICS, ConnectionSettings, PoolMetrics
+from lang_qc.db.replicas import (
+    EngineRouter,
+    ReplicaRouting,
+    ReplicatedConnectionSettings,
+    routed_session,
+)
+
+
+def _engine(monkeypatch, name: str, url: str = "sqlite://"):
+
+    engine = create_engine(url)
+    monkeypatch.setitem(
+        POOL_METRICS, name, PoolMetrics(name, engine, ConnectionSettings())
+    )
+    return (name, engine)
+
+
+def test_replica_settings(monkeypatch):
+
+    assert ReplicatedConnectionSettings(_env_prefix="DB_").replica_url_list() == []
+    monkeypatch.setenv("DB_REPLICA_URLS", "mysql://one/db, mysql://two/db,")
+    monkeypatch.setenv("DB_REPLICA_ROUTING", "least_latency")
+    settings = ReplicatedConnectionSettings(_env_prefix="DB_")
+    assert settings.replica_url_list() == ["mysql://one/db", "mysql://two/db"]
+    assert settings.replica_routing == ReplicaRouting.LEAST_LATENCY
+
+
+def test_round_robin_routing(monkeypatch):
+
+    primary = _engine(monkeypatch, "test_primary")
+    replica1 = _engine(monkeypatch, "test_replica1")
+    replica2 = _engine(monkeypatch, "test_replica2")
+
+    router = EngineRouter(primary, [], ReplicaRouting.ROUND_ROBIN)
+    assert router.candidates() == [primary]
+
+    router = EngineRouter(primary, [replica1, replica2], ReplicaRouting.ROUND_ROBIN)
+    assert router.candidates() == [replica1, replica2, primary]
+    assert router.candidates() == [replica2, replica1, primary]
+    assert router.candidates() == [replica1, replica2, primary]
+
+    router.record_failure("test_replica1")
+    assert router.candidates() == [replica2, primary]
+
+
+def test_least_latency_routing(monkeypatch):
+
+    primary = _engine(monkeypatch, "test_primary")
+    replica1 = _engine(monkeypatch, "test_replica1")
+    replica2 = _engine(monkeypatch, "test_replica2")
+    router = EngineRouter(primary, [replica1, replica2], ReplicaRouting.LEAST_LATENCY)
+
+    with replica1[1].connect() as connection:
+        connection.execute(text("SELECT 1"))
+    latency = router.latency()
+    assert latency["test_replica1"] > 0
+    assert "test_replica2" not in latency
+    # The replica, which has not been measured, is tried first.
+    assert router.candidates() == [replica2, replica1, primary]
+
+    with replica2[1].connect() as connection:
+        connection.execute(text("SELECT 1"))
+    latency = router.latency()
+    expected = [replica1, replica2]
+    if latency["test_replica2"] < latency["test_replica1"]:
+        expected.reverse()
+    assert router.candidates() == expected + [primary]
+
+
+def test_least_latency_routing_for_unmeasured_replicas(monkeypatch):
+
+    primary = _engine(monkeypatch, "test_primary")
+    replicas = [_engine(monkeypatch, f"test_replica{i}") for i in range(1, 4)]
+    router = EngineRouter(primary, replicas, ReplicaRouting.LEAST_LATENCY)
+
+    # Unmeasured replicas take turns.
+    assert router.latency() == {}
+    assert [router.candidates()[0] for _ in range(6)] == replicas * 2
+
+    with replicas[0][1].connect() as connection:
+        connection.execute(text("SELECT 1"))
+    for _ in range(4):
+        candidates = router.candidates()
+        assert candidates[-2:] == [replicas[0], primary]
+    assert {router.candidates()[0] for _ in range(2)} == {replicas[1], replicas[2]}
+
+
+def test_fallback_to_primary(monkeypatch):
+
+    primary = _engine(monkeypatch, "test_primary")
+    broken_replica = _engine(
+        monkeypatch, "test_replica1", "sqlite:////nonexistent/dir/db.sqlite"
+    )
+    router = EngineRouter(primary, [broken_replica], ReplicaRouting.ROUND_ROBIN)
+    factory = sessionmaker()
+
+    # The session does not connect until it is used.
+    session = routed_session(router, factory)
+    assert session.get_bind() is broken_replica[1]
+    assert broken_replica[1].pool.checkedout() == 0
+    with pytest.raises(OperationalError):
+        session.execute(text("SELECT 1"))
+    session.close()
+    # The broken replica is not tried again.
+    assert router.candidates() == [primary]
+    session = routed_session(router, factory)
+    assert session.get_bind() is primary[1]
+    assert session.execute(text("SELECT 1")).scalar_one() == 1
+    session.close()
+
+    # Failures of the primary database are not recorded.
+    router = EngineRouter(broken_replica, [], ReplicaRouting.ROUND_ROBIN)
+    with pytest.raises(OperationalError):
+        routed_session(router, factory).execute(text("SELECT 1"))
+    assert router.candidates() == [broken_replica]
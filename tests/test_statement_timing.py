@@ -0,0 +1,27 @@
+from sqlalchemy import create_engine, text
+
+from lang_qc.db.timing import add_statement_consumer
+
+
+def test_single_timer_for_all_consumers():
+
+    engine = create_engine("sqlite://")
+    first = []
+    second = []
+    add_statement_consumer(engine, lambda *args: first.append(args))
+    add_statement_consumer(engine, lambda *args: second.append(args))
+
+    assert len(engine.dispatch.before_cursor_execute) == 1
+    assert len(engine.dispatch.after_cursor_execute) == 1
+
+    with engine.connect() as connection:
+        connection.execute(text("SELECT :i"), {"i": 1})
+        connection.execute(text("SELECT 2"))
+
+    assert len(first) == 2
+    # Both consumers are given the same measurement.
+    assert first == second
+    (statement, parameters, elapsed) = first[0]
+    assert statement == "SELECT ?"
+    assert parameters == (1,)
+    assert elapsed >= 0
@@ -0,0 +1,73 @@
+from datetime import datetime
+
+from npg_id_generation.pac_bio import PacBioEntity
+from sqlalchemy import select
+
+from benchmarks.synthetic_data import SyntheticData, SyntheticDataScale
+from lang_qc.db.mlwh_schema import PacBioRunWellMetrics
+
+
+def test_product_ids_and_lims_links(mlwhdb_test_session):
+
+    scale = SyntheticDataScale(num_wells=16, num_qc_states=4, plex=4)
+    now = datetime(2024, 6, 1, 12)
+    synthetic_data = SyntheticData(scale, now=now)
+    wells = list(synthetic_data.wells())
+    assert len(wells) == 16
+    # The data depends only on the scale and the reference time.
+    assert wells == list(SyntheticData(scale, now=now).wells())
+
+    pooled_wells = synthetic_data.pooled_wells()
+    assert len(pooled_wells) == 1
+    assert len(pooled_wells[0].libraries) == 4
+
+    counts = synthetic_data.load_mlwh(mlwhdb_test_session)
+    assert counts["pac_bio_run_well_metrics"] == 16
+    assert counts["pac_bio_run"] == 19
+    assert counts["pac_bio_product_metrics"] == 19
+
+    for well in (wells[0], pooled_wells[0], wells[-1]):
+        assert (
+            well.id_product
+            == PacBioEntity(
+                run_name=well.run_name,
+                well_label=well.well_label,
+                plate_number=well.plate_number,
+            ).hash_product_id()
+        )
+        well_row = mlwhdb_test_session.execute(
+            select(PacBioRunWellMetrics).where(
+                PacBioRunWellMetrics.id_pac_bio_product == well.id_product
+            )
+        ).scalar_one()
+        assert well_row.pac_bio_run_name == well.run_name
+        assert well_row.well_label == well.well_label
+        assert well_row.plate_number == well.plate_number
+
+        products = {
+            product_row.id_pac_bio_product: product_row
+            for product_row in well_row.pac_bio_product_metrics
+        }
+        assert sorted(products) == sorted(
+            library.id_product for library in well.libraries
+        )
+        for library in well.libraries:
+            lims_row = products[library.id_product].pac_bio_run
+            assert lims_row.pac_bio_run_name == well.run_name
+            assert lims_row.well_label == well.well_label
+            assert lims_row.plate_number == well.plate_number
+            assert lims_row.tag_sequence == library.tag_sequence
+            assert lims_row.sample is not None
+            assert lims_row.study is not None
+            if well.is_pooled():
+                assert (
+                    library.id_product
+                    == PacBioEntity(
+                        run_name=well.run_name,
+                        well_label=well.well_label,
+                        plate_number=well.plate_number,
+                        tags=library.tag_sequence,
+                    ).hash_product_id()
+                )
+            else:
+                assert library.id_product == well.id_product
@@ -2,7 +2,7 @@ from datetime import datetime, timedelta
 
 import pytest
 from npg_id_generation.pac_bio import PacBioEntity
-from sqlalchemy import select
+from sqlalchemy import inspect, select
 
 from lang_qc.db.helper.wells import EmptyListOfRunNamesError, WellWh
 from lang_qc.db.mlwh_schema import PacBioRunWellMetrics
@@ -74,6 +74,50 @@ def test_well_metrics_retrieval(mlwhdb_test_session, load_data4well_retrieval):
     assert well.ccs_execution_mode == "OffInstrument"
     assert well.polymerase_num_reads == 3339714
     assert well.hifi_num_reads == 2226107
+    assert "pac_bio_product_metrics" in inspect(well).unloaded
+
+    well = wm.get_mlwh_well_by_product_id(id_product, with_lims_data=True)
+    assert well.id_pac_bio_product == id_product
+    assert "pac_bio_product_metrics" not in inspect(well).unloaded
+    for product_metrics in well.pac_bio_product_metrics:
+        assert "pac_bio_run" not in inspect(product_metrics).unloaded
+        if product_metrics.pac_bio_run is not None:
+            lims_row_state = inspect(product_metrics.pac_bio_run)
+            assert "study" not in lims_row_state.unloaded
+            assert "sample" not in lims_row_state.unloaded
+
+
+def test_batch_well_metrics_retrieval(mlwhdb_test_session, load_data4well_retrieval):
+
+    wm = WellWh(session=mlwhdb_test_session)
+    assert wm.get_mlwh_wells_by_product_ids([]) == {}
+
+    unknown_id = PacBioEntity(run_name="UNKNOWN", well_label="A1").hash_product_id()
+    assert wm.get_mlwh_wells_by_product_ids([unknown_id]) == {}
+
+    ids = [
+        PacBioEntity(run_name="TRACTION_RUN_12", well_label="A1").hash_product_id(),
+        PacBioEntity(run_name="TRACTION_RUN_1", well_label="B1").hash_product_id(),
+    ]
+    wells = wm.get_mlwh_wells_by_product_ids(ids + [unknown_id])
+    assert set(wells.keys()) == set(ids)
+    for id_product in ids:
+        well = wells[id_product]
+        assert isinstance(well, PacBioRunWellMetrics)
+        assert well.id_pac_bio_product == id_product
+        # LIMS data are loaded together with the wells.
+        assert "pac_bio_product_metrics" not in inspect(well).unloaded
+        for product_metrics in well.pac_bio_product_metrics:
+            assert "pac_bio_run" not in inspect(product_metrics).unloaded
+    assert wells[ids[0]].pac_bio_run_name == "TRACTION_RUN_12"
+    assert wells[ids[1]].pac_bio_run_name == "TRACTION_RUN_1"
+    assert wells[ids[1]].well_label == "B1"
+
+    mlwhdb_test_session.expire_all()
+    wells = wm.get_mlwh_wells_by_product_ids(ids, with_lims_data=False)
+    assert set(wells.keys()) == set(ids)
+    for id_product in ids:
+        assert "pac_bio_product_metrics" in inspect(wells[id_product]).unloaded
 
 
 def test_wells_in_runs_retrieval_boundary_cases(
@@ -122,3 +166,67 @@ def test_wells_in_runs_retrieval(mlwhdb_test_session, load_data4well_retrieval):
             assert plates_and_labels[i][1] is None
         else:
             assert plates_and_labels[i][1] == expected_plate_numbers[i]
+
+
+def test_well_versions_retrieval(
+    mlwhdb_test_session, load_data4well_retrieval, mlwhdb_load_runs
+):
+
+    wm = WellWh(session=mlwhdb_test_session)
+    assert wm.get_mlwh_well_versions([]) == {}
+
+    unknown_id = PacBioEntity(run_name="UNKNOWN", well_label="A1").hash_product_id()
+    ids = [
+        PacBioEntity(run_name="TRACTION_RUN_12", well_label="A1").hash_product_id(),
+        PacBioEntity(run_name="TRACTION-RUN-92", well_label="A1").hash_product_id(),
+    ]
+    versions = wm.get_mlwh_well_versions(ids + [unknown_id])
+    assert set(versions.keys()) == set(ids)
+    assert len(set(versions.values())) == 2
+    assert {len(v) for v in versions.values()} == {32}
+    assert wm.get_mlwh_well_versions(ids) == versions
+    assert wm.get_mlwh_well_versions(ids[1:]) == {ids[1]: versions[ids[1]]}
+
+    # Changes to the well, its product metrics, LIMS, study and sample data
+    # change the version.
+    well = wm.get_mlwh_well_by_product_id(ids[1], with_lims_data=True)
+    product_metrics = well.pac_bio_product_metrics[0]
+    lims_row = product_metrics.pac_bio_run
+    changes = [
+        (well, "well_status", "Failed"),
+        (product_metrics, "hifi_num_reads", 11),
+        (lims_row, "last_updated", datetime.now()),
+        (lims_row.study, "name", "Renamed study"),
+        (lims_row.study, "id_study_lims", "99999"),
+        (lims_row.sample, "name", "Renamed sample"),
+        (lims_row.sample, "id_sample_lims", "99999"),
+    ]
+    try:
+        for (row, attr, value) in changes:
+            setattr(row, attr, value)
+            new_version = wm.get_mlwh_well_versions(ids)
+            assert new_version[ids[0]] == versions[ids[0]]
+            assert new_version[ids[1]] != versions[ids[1]]
+            versions = new_version
+    finally:
+        mlwhdb_test_session.rollback()
+
+    # Values, which move between the products of the well, change the version.
+    well = mlwhdb_test_session.execute(
+        select(PacBioRunWellMetrics).where(
+            PacBioRunWellMetrics.pac_bio_run_name == "TRACTION-RUN-1140",
+            PacBioRunWellMetrics.well_label == "C1",
+            PacBioRunWellMetrics.plate_number == 2,
+        )
+    ).scalar_one()
+    id_product = well.id_pac_bio_product
+    version = wm.get_mlwh_well_versions([id_product])[id_product]
+    (first, second) = well.pac_bio_product_metrics[0:2]
+    try:
+        (first.id_pac_bio_tmp, second.id_pac_bio_tmp) = (
+            second.id_pac_bio_tmp,
+            first.id_pac_bio_tmp,
+        )
+        assert wm.get_mlwh_well_versions([id_product])[id_product] != version
+    finally:
+        mlwhdb_test_session.rollback()